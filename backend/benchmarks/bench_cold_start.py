@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+バックエンドのコールドスタートの計測
+
+1. config.wsgi の読み込みを python -X importtime で計測し、時間のかかったimportを表示する
+2. サーバーを起動してから最初の応答（GET /api/poker/tables/）が返るまでの時間を
+   --runs 回計測し、中央値が --target-ms を超えたら終了コード1で終わる
+
+サーバーは本番と同じ gunicorn --preload（--server runserver で manage.py runserver --noreload）。
+DBは事前に migrate 済みであること。
+
+使い方:
+  cd backend && python benchmarks/bench_cold_start.py [--runs 5] [--target-ms 1500] [--top 15]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_REQUEST_PATH = '/api/poker/tables/'
+POLL_INTERVAL = 0.01
+START_TIMEOUT = 60
+
+
+def import_profile():
+    """config.wsgi の読み込みを -X importtime で計測し (self μs, 累計 μs, 深さ, モジュール名) の一覧を返す"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import config.wsgi'],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(server, port):
+    if server == 'runserver':
+        return [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+    return [
+        sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', '1',
+        '--worker-class', 'gthread', '--threads', '1', '--keep-alive', '5', '--preload',
+    ]
+
+
+def time_to_first_response(server):
+    """サーバー起動から最初の応答までのミリ秒"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}{FIRST_REQUEST_PATH}'
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        server_command(server, port), cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < START_TIMEOUT:
+            if process.poll() is not None:
+                sys.exit(f'server exited with code {process.returncode}')
+            try:
+                with urllib.request.urlopen(url, timeout=5) as response:
+                    response.read()
+                return (time.perf_counter() - started) * 1000
+            except urllib.error.HTTPError:
+                # エラー応答でもサーバーは応答している
+                return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(POLL_INTERVAL)
+        sys.exit(f'no response within {START_TIMEOUT}s')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='バックエンドのコールドスタートの計測')
+    parser.add_argument('--runs', '-n', type=int, default=5, help='起動から最初の応答までの計測回数')
+    parser.add_argument('--target-ms', type=float, default=1500, help='最初の応答までの目標（中央値、ミリ秒）')
+    parser.add_argument('--top', type=int, default=15, help='表示するimportの数')
+    parser.add_argument('--server', choices=['gunicorn', 'runserver'], default='gunicorn')
+    args = parser.parse_args()
+
+    rows = import_profile()
+    total_us = sum(self_us for self_us, _, _, _ in rows)
+    print(f'import config.wsgi: {len(rows)} modules, {total_us / 1000:.1f} ms')
+    print()
+    print(f"{'top-level import':<40} {'cumulative':>12}")
+    top_level = sorted((r for r in rows if r[2] == 0), key=lambda r: -r[1])
+    for _, cumulative_us, _, name in top_level[:args.top]:
+        print(f'{name:<40} {cumulative_us / 1000:>9.1f} ms')
+    print()
+    print(f"{'module (self time)':<40} {'self':>12}")
+    for self_us, _, _, name in sorted(rows, key=lambda r: -r[0])[:args.top]:
+        print(f'{name:<40} {self_us / 1000:>9.1f} ms')
+    print()
+
+    timings = [time_to_first_response(args.server) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f'time to first response ({args.server}, {args.runs} runs): '
+          f'min {min(timings):.0f} ms / median {median:.0f} ms / max {max(timings):.0f} ms')
+    if median > args.target_ms:
+        print(f'FAILED: median exceeds target {args.target_ms:.0f} ms')
+        sys.exit(1)
+    print(f'OK: within target {args.target_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
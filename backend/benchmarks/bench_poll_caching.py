@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+state ポーリングの転送量とレイテンシの計測
+
+起動中のサーバーにテーブルを作って2人を着席させ、ハンドを始めてから
+観戦（トークンなし）とプレイヤー（X-Player-Token）の state ポーリングを次の方式で比較する。
+
+- identity: 圧縮なし・条件付きリクエストなし（従来のクライアント）
+- gzip: Accept-Encoding: gzip, br
+- conditional: gzip + 前回の ETag を If-None-Match で送る（状態が変わらなければ 304）
+
+1つの接続を使い回す（nginx 経由なら upstream の keep-alive も効く）。
+読み込みのレート制限（既定 5回/秒）にかからないよう --interval ごとに送る。
+
+使い方:
+  cd backend && python benchmarks/bench_poll_caching.py [--url http://localhost] [--polls 40] [--interval 0.25]
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import time
+import urllib.parse
+
+MODES = {
+    'identity': {},
+    'gzip': {'Accept-Encoding': 'gzip, br'},
+    'conditional': {'Accept-Encoding': 'gzip, br'},
+}
+
+
+class Client:
+    """keep-alive で1接続を使い回すHTTPクライアント"""
+
+    def __init__(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parsed.netloc, timeout=10)
+
+    def request(self, method, path, body=None, headers=None):
+        """(ステータス, 応答, 受信したボディのバイト列, ミリ秒) を返す"""
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        self.connection.request(method, path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        elapsed = (time.perf_counter() - started) * 1000
+        return response.status, response, data, elapsed
+
+    def json(self, method, path, body=None, headers=None):
+        status, _, data, _ = self.request(method, path, body, headers)
+        if status >= 400:
+            raise SystemExit(f'{method} {path}: {status} {data[:200]!r}')
+        return json.loads(data)
+
+
+def setup(client):
+    """テーブルを作って2人を着席させ、ハンドを始める（table_id, token）"""
+    table = client.json('POST', '/api/poker/tables/', {'name': f'Poll bench {int(time.time())}'})
+    table_id = table['id']
+    tokens = [
+        client.json('POST', f'/api/poker/tables/{table_id}/join/', {
+            'username': f'poll_{table_id}_{seat}', 'seat_number': seat,
+        })['token']
+        for seat in (1, 2)
+    ]
+    client.json('POST', f'/api/poker/tables/{table_id}/start/', headers={'X-Player-Token': tokens[0]})
+    return table_id, tokens[0]
+
+
+def poll(client, path, mode, extra_headers, polls, interval):
+    """(平均バイト数, 中央値ミリ秒, 304の数, 429の数)"""
+    sizes, timings = [], []
+    not_modified = throttled = 0
+    etag = None
+    for _ in range(polls):
+        headers = dict(MODES[mode], **extra_headers)
+        if mode == 'conditional' and etag:
+            headers['If-None-Match'] = etag
+        status, response, data, elapsed = client.request('GET', path, headers=headers)
+        if status == 429:
+            throttled += 1
+        else:
+            sizes.append(len(data))
+            timings.append(elapsed)
+            etag = response.getheader('ETag') or etag
+            not_modified += status == 304
+        time.sleep(interval)
+    if not sizes:
+        return 0, 0.0, not_modified, throttled
+    return statistics.mean(sizes), statistics.median(timings), not_modified, throttled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='state ポーリングの転送量とレイテンシの計測')
+    parser.add_argument('--url', default='http://localhost')
+    parser.add_argument('--polls', type=int, default=40, help='方式ごとのポーリング回数')
+    parser.add_argument('--interval', type=float, default=0.25, help='ポーリングの間隔（秒）')
+    args = parser.parse_args()
+
+    client = Client(args.url)
+    table_id, token = setup(client)
+    path = f'/api/poker/tables/{table_id}/state/'
+
+    print(f"{'viewer':<10} {'mode':<12} {'body bytes':>12} {'median ms':>10} {'304':>5} {'429':>5}")
+    for viewer, extra in (('spectator', {}), ('player', {'X-Player-Token': token})):
+        baseline = None
+        for mode in MODES:
+            size, median, not_modified, throttled = poll(client, path, mode, extra, args.polls, args.interval)
+            baseline = baseline or size
+            saved = f'({(1 - size / baseline) * 100:.0f}% less)' if baseline and mode != 'identity' else ''
+            print(f'{viewer:<10} {mode:<12} {size:>12.0f} {median:>10.2f} {not_modified:>5} {throttled:>5} {saved}')
+
+
+if __name__ == '__main__':
+    main()
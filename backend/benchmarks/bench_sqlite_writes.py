@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+SQLite 並列書き込みのベンチマーク
+
+並列スレッドからの書き込み（チップ更新 + ログINSERT）について、
+- direct: デフォルトのジャーナル（DELETE）で各スレッドが直接書き込む
+- writer: WAL + 1本のライタースレッドがキューをまとめてコミットする（poker.services.db_writer と同じ方式）
+の書き込み件数/秒と "database is locked" エラー数を比較する。読み込みスレッドも同時に動かす。
+
+使い方:
+  cd backend && python benchmarks/bench_sqlite_writes.py [--threads N] [--writes N] [--readers N]
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+MAX_BATCH = 64
+
+
+def _connect(path, timeout, wal):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    if wal:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def _setup(path):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE player (id INTEGER PRIMARY KEY, chips INTEGER)')
+    conn.execute('CREATE TABLE log (id INTEGER PRIMARY KEY, player_id INTEGER, amount INTEGER)')
+    conn.executemany('INSERT INTO player (id, chips) VALUES (?, 1000)', [(i,) for i in range(100)])
+    conn.commit()
+    conn.close()
+
+
+def _write(conn, player_id, amount):
+    conn.execute('UPDATE player SET chips = chips - ? WHERE id = ?', (amount, player_id))
+    conn.execute('INSERT INTO log (player_id, amount) VALUES (?, ?)', (player_id, amount))
+
+
+def _readers(path, timeout, wal, count, stop, reads, read_errors):
+    def run():
+        conn = _connect(path, timeout, wal)
+        while not stop.is_set():
+            try:
+                conn.execute('SELECT SUM(chips) FROM player').fetchone()
+                reads.append(1)
+            except sqlite3.OperationalError:
+                read_errors.append(1)
+        conn.close()
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run_direct(path, args):
+    """各スレッドが自分の接続で直接書き込む"""
+    errors = []
+
+    def worker(index):
+        conn = _connect(path, args.timeout, wal=False)
+        for i in range(args.writes):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                _write(conn, (index * args.writes + i) % 100, 1)
+                conn.execute('COMMIT')
+            except sqlite3.OperationalError:
+                errors.append(1)
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+        conn.close()
+
+    return _run_workers(path, args, worker, wal=False), errors
+
+
+def run_writer(path, args):
+    """WAL + 1本のライタースレッドにまとめて書き込む"""
+    errors = []
+    writes: queue.Queue = queue.Queue()
+
+    def writer():
+        conn = _connect(path, args.timeout, wal=True)
+        while True:
+            batch = [writes.get()]
+            if batch[0] is None:
+                break
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    writes.put(None)
+                    break
+                batch.append(item)
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                for _, player_id, amount in batch:
+                    _write(conn, player_id, amount)
+                conn.execute('COMMIT')
+                for future, _, _ in batch:
+                    future.set_result(None)
+            except sqlite3.OperationalError as e:
+                errors.append(1)
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                for future, _, _ in batch:
+                    future.set_exception(e)
+        conn.close()
+
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+
+    def worker(index):
+        for i in range(args.writes):
+            future = Future()
+            writes.put((future, (index * args.writes + i) % 100, 1))
+            try:
+                future.result()
+            except sqlite3.OperationalError:
+                pass
+
+    elapsed = _run_workers(path, args, worker, wal=True)
+    writes.put(None)
+    writer_thread.join()
+    return elapsed, errors
+
+
+def _run_workers(path, args, worker, wal):
+    stop = threading.Event()
+    reads, read_errors = [], []
+    reader_threads = _readers(path, args.timeout, wal, args.readers, stop, reads, read_errors)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+    print(f'  reads: {len(reads)} ({len(reads) / elapsed:.0f}/s), read lock errors: {len(read_errors)}')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 並列書き込みのベンチマーク')
+    parser.add_argument('--threads', '-t', type=int, default=8, help='書き込みスレッド数')
+    parser.add_argument('--writes', '-w', type=int, default=200, help='スレッドあたりの書き込み数')
+    parser.add_argument('--readers', '-r', type=int, default=2, help='読み込みスレッド数')
+    parser.add_argument('--timeout', type=float, default=0.05, help='ロック待ちのタイムアウト秒数')
+    args = parser.parse_args()
+
+    total = args.threads * args.writes
+    for name, runner in (('direct', run_direct), ('writer', run_writer)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.sqlite3')
+            _setup(path)
+            print(f'{name}:')
+            elapsed, errors = runner(path, args)
+            committed = sqlite3.connect(path).execute('SELECT COUNT(*) FROM log').fetchone()[0]
+            print(f'  writes: {committed}/{total} in {elapsed:.2f}s ({committed / elapsed:.0f}/s), '
+                  f'write lock errors: {len(errors)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+state 応答形式のベンチマーク
+
+6人卓の state 応答について、通常JSON・コンパクトJSON・MessagePack の
+バイト数とパース時間を比較する。
+
+使い方:
+  cd backend && python benchmarks/bench_state_format.py [--iterations N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from poker.renderers import CompactJSONRenderer, MessagePackRenderer, msgpack  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+
+def _card(display: str) -> dict:
+    return {'rank': display[0], 'suit': display[1], 'display': display}
+
+
+def sample_state() -> dict:
+    """フロップ中・6人着席・自分の番の state 応答"""
+    players = []
+    for seat in range(1, 7):
+        player = {
+            'seat': seat,
+            'username': f'Bot_{1000 + seat}',
+            'chips': 1000 - seat * 20,
+            'current_bet': 40 if seat % 2 else 0,
+            'is_folded': seat == 5,
+            'is_all_in': False,
+            'is_active': True,
+            'hole_cards': [{'hidden': True}, {'hidden': True}],
+        }
+        players.append(player)
+    players[0]['hole_cards'] = [_card('Ah'), _card('Kd')]
+
+    return {
+        'table_id': 1,
+        'name': 'Bot Table',
+        'phase': 'flop',
+        'hand_number': 42,
+        'pot': 360,
+        'current_bet': 40,
+        'community_cards': [_card('Ts'), _card('9h'), _card('2c')],
+        'players': players,
+        'button_seat': 3,
+        'current_player_seat': 1,
+        'settings': {'max_players': 6, 'small_blind': 10, 'big_blind': 20, 'ante': 0},
+        'valid_actions': {
+            'fold': {},
+            'call': {'amount': 0},
+            'raise': {'min': 80, 'max': 880},
+            'all_in': {'amount': 880},
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='state 応答形式のベンチマーク')
+    parser.add_argument('--iterations', '-n', type=int, default=20000)
+    args = parser.parse_args()
+
+    state = sample_state()
+    encoded = {
+        'json': (JSONRenderer().render(state), json.loads),
+        'compact json': (CompactJSONRenderer().render(state), json.loads),
+    }
+    if msgpack is not None:
+        encoded['msgpack'] = (MessagePackRenderer().render(state), msgpack.unpackb)
+
+    base_size = len(encoded['json'][0])
+    print(f"{'format':<14}{'bytes':>8}{'ratio':>8}{'parse us':>10}")
+    for name, (body, parse) in encoded.items():
+        seconds = timeit.timeit(lambda: parse(body), number=args.iterations)
+        print(f'{name:<14}{len(body):>8}{len(body) / base_size:>8.2f}{seconds / args.iterations * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
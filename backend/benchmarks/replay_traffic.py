@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+記録したポーカーAPIトラフィックの再生
+
+POKER_TRAFFIC_LOG（poker.middleware.TrafficRecorderMiddleware）で記録したファイルを
+ローカルサーバーに向けて記録時の間隔どおり（--speed 1）、N倍速（--speed 10）、
+または待ち時間なし（--speed 0）で送り、レイテンシのパーセンタイルを表示する。
+
+- 記録時の参加（join / quick-seat）で発行されたトークンは、再生時に発行されたトークンに置き換える
+- 記録時に作成されたテーブルのIDは、再生時に作成されたテーブルのIDに置き換える
+  （記録前からあったテーブルは --table-map 3=7,4=8 で指定、指定がなければ同じID）
+- 参加より前に記録が始まったプレイヤーのリクエストはトークンなしで送る（unmapped として数える）
+
+使い方:
+  cd backend && python benchmarks/replay_traffic.py traffic.ndjson [--url http://localhost:8000] [--speed 10]
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+TABLE_PATH = re.compile(r'^/api/poker/tables/(\d+)/')
+NUMBER = re.compile(r'/\d+(?=/)')
+# 対応付け待ちの上限（記録時に失敗した参加などで永遠に待たないように）
+MAPPING_TIMEOUT = 10
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def endpoint(entry):
+    """集計用にIDを {id} にまとめたエンドポイント名"""
+    return f"{entry['m']} {NUMBER.sub('/{id}', entry['p'])}"
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Mapping:
+    """記録時の値 -> 再生時の値（確定するまで待てる）"""
+
+    def __init__(self, initial=None):
+        self._values = dict(initial or {})
+        self._events = defaultdict(threading.Event)
+        self._lock = threading.Lock()
+        for key in self._values:
+            self._events[key].set()
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            self._events[key].set()
+
+    def expect(self, key):
+        """この値が後で set されることを登録する"""
+        with self._lock:
+            self._events[key]
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._events:
+                return self._values.get(key, default)
+            event = self._events[key]
+        event.wait(MAPPING_TIMEOUT)
+        with self._lock:
+            return self._values.get(key, default)
+
+
+class Replayer:
+    def __init__(self, base_url, entries, table_map):
+        self.base_url = base_url.rstrip('/')
+        self.entries = entries
+        self.tokens = Mapping()
+        self.tables = Mapping(table_map)
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.unmapped = 0
+        self._lock = threading.Lock()
+
+        # 再生中に発行されるトークン・テーブルIDを先に登録しておく
+        for entry in entries:
+            result = entry.get('r') or {}
+            if 'k' in result:
+                self.tokens.expect(result['k'])
+            if 'id' in result and str(result['id']) not in table_map:
+                self.tables.expect(str(result['id']))
+
+    def _path(self, entry):
+        match = TABLE_PATH.match(entry['p'])
+        if not match:
+            return entry['p']
+        table_id = self.tables.get(match.group(1), match.group(1))
+        return f"/api/poker/tables/{table_id}/" + entry['p'][match.end():]
+
+    def send(self, entry):
+        headers = {'Content-Type': 'application/json'}
+        if entry.get('k'):
+            token = self.tokens.get(entry['k'])
+            if token:
+                headers['X-Player-Token'] = token
+            else:
+                with self._lock:
+                    self.unmapped += 1
+
+        url = self.base_url + self._path(entry)
+        if entry.get('q'):
+            url += '?' + entry['q']
+        data = json.dumps(entry['b']).encode() if entry.get('b') is not None else None
+        request = urllib.request.Request(url, data=data, headers=headers, method=entry['m'])
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status = response.status
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            body = e.read()
+        except urllib.error.URLError:
+            status = 'error'
+            body = b''
+        elapsed = (time.perf_counter() - started) * 1000
+
+        result = entry.get('r') or {}
+        if result and status == 201:
+            data = json.loads(body)
+            if 'k' in result and data.get('token'):
+                self.tokens.set(result['k'], data['token'])
+            new_id = data.get('table_id', data.get('id'))
+            if 'id' in result and new_id is not None:
+                self.tables.set(str(result['id']), new_id)
+
+        with self._lock:
+            self.latencies[endpoint(entry)].append(elapsed)
+            self.statuses[status] += 1
+
+    def run(self, speed, concurrency):
+        if not self.entries:
+            return 0.0
+        t0 = self.entries[0]['t']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for entry in self.entries:
+                if speed > 0:
+                    delay = (entry['t'] - t0) / 1000 / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(self.send, entry)
+        return time.perf_counter() - started
+
+
+def report(replayer, elapsed):
+    all_latencies = sorted(v for values in replayer.latencies.values() for v in values)
+    total = len(all_latencies)
+    print(f'{total} requests in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} req/s)')
+    print('status: ' + ', '.join(f'{k}={v}' for k, v in sorted(replayer.statuses.items(), key=str)))
+    if replayer.unmapped:
+        print(f'unmapped tokens: {replayer.unmapped}')
+    print()
+    print(f"{'endpoint':<48} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)")
+    rows = [('ALL', all_latencies)] + sorted(
+        (name, sorted(values)) for name, values in replayer.latencies.items()
+    )
+    for name, values in rows:
+        print(f'{name:<48} {len(values):>6} {percentile(values, 50):>8.1f} {percentile(values, 90):>8.1f} '
+              f'{percentile(values, 99):>8.1f} {(values[-1] if values else 0):>8.1f}')
+
+
+def parse_table_map(value):
+    if not value:
+        return {}
+    return dict(pair.split('=', 1) for pair in value.split(','))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='記録したポーカーAPIトラフィックの再生')
+    parser.add_argument('traffic', help='POKER_TRAFFIC_LOG で記録したファイル')
+    parser.add_argument('--url', default='http://localhost:8000', help='再生先のサーバー')
+    parser.add_argument('--speed', '-s', type=float, default=1, help='再生速度の倍率（0で待ち時間なし）')
+    parser.add_argument('--concurrency', '-c', type=int, default=32, help='同時に送るリクエスト数の上限')
+    parser.add_argument('--table-map', help='記録前からあったテーブルのID対応（例: 3=7,4=8）')
+    args = parser.parse_args()
+
+    entries = sorted(load(args.traffic), key=lambda e: e['t'])
+    replayer = Replayer(args.url, entries, parse_table_map(args.table_map))
+    elapsed = replayer.run(args.speed, args.concurrency)
+    report(replayer, elapsed)
+
+
+if __name__ == '__main__':
+    main()
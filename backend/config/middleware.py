@@ -0,0 +1,128 @@
+"""API応答の圧縮と条件付きリクエスト
+
+CompressionMiddleware: API_COMPRESS_MIN_BYTES 以上のJSON系の応答を br（brotli がある場合）か gzip で圧縮する。
+すでに Content-Encoding のある応答（state の共有gzip）、application/gzip（ハンド履歴の gzip エクスポート）、
+ストリーミング応答は圧縮しない。
+
+ETag は強いETagのまま、圧縮した応答では "<etag>-gzip" のように符号化方式を付けて区別する。
+not_modified は If-None-Match をこの付加部分を除いて比べるので、どちらの表現を持つクライアントにも 304 を返せる。
+"""
+import gzip
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli は任意
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/vnd.poker.compact+json',
+    'application/x-msgpack',
+    'application/x-ndjson',
+)
+CODINGS = ('br', 'gzip')
+
+
+def make_etag(*parts) -> str:
+    """値を '.' でつないだ強いETag"""
+    return '"' + '.'.join(str(part) for part in parts) + '"'
+
+
+def _strip_coding(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    for coding in CODINGS:
+        suffix = f'-{coding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def not_modified(request, etag: str) -> Optional[str]:
+    """If-None-Match が etag と一致すればクライアントの持つタグを返す（なければ None）"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return None
+    if header.strip() == '*':
+        return etag
+    for tag in header.split(','):
+        if _strip_coding(tag) == etag:
+            return tag.strip()
+    return None
+
+
+def not_modified_response(request, etag: str, vary=()) -> Optional[HttpResponseNotModified]:
+    """If-None-Match が一致すれば 304 を返す（ETag はクライアントが持つ表現のもの）"""
+    matched = not_modified(request, etag)
+    if matched is None:
+        return None
+    response = HttpResponseNotModified()
+    response['ETag'] = matched
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
+
+
+def choose_coding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding から使う符号化方式を選ぶ（q=0 は受け付けないものとして扱う）"""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == 'br':
+        return brotli.compress(body, quality=settings.API_COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.API_COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """一定サイズ以上のJSON系の応答を圧縮する"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if len(response.content) < settings.API_COMPRESS_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = choose_coding(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+        body = compress(response.content, coding)
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Encoding'] = coding
+        response['Content-Length'] = str(len(body))
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/') and etag.endswith('"'):
+            response['ETag'] = f'{etag[:-1]}-{coding}"'
+        return response
@@ -25,6 +25,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.CompressionMiddleware',
+    'poker.middleware.TrafficRecorderMiddleware',
+    'poker.middleware.LoadSheddingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +61,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # 接続を使い回す（WALなどのPRAGMAは poker/db.py で接続時に設定）
+        'CONN_MAX_AGE': None,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
@@ -90,3 +99,63 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# 起動時の所要時間（config.wsgi）をコンソールに出す
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# ワーカー起動時にアクティブなポーカーテーブルをまとめてメモリへ復元する
+POKER_WARMUP_ON_START = bool(int(os.environ.get('POKER_WARMUP', '0')))
+
+# ポーカーアプリのORM書き込みを専用スレッドに直列化する
+POKER_DB_WRITER = bool(int(os.environ.get('POKER_DB_WRITER', '1')))
+
+# 終了済みハンドの列指向アーカイブ（python manage.py archive_hands）
+POKER_ARCHIVE_DIR = Path(os.environ.get('POKER_ARCHIVE_DIR', BASE_DIR / 'archive'))
+POKER_ARCHIVE_AFTER_DAYS = int(os.environ.get('POKER_ARCHIVE_AFTER_DAYS', '30'))
+
+# ポーカーAPIのレート制限（X-Player-Token、なければIPごとのトークンバケット: rate 個/秒、最大 burst 個）
+POKER_RATE_LIMITS = {
+    'read': {
+        'rate': float(os.environ.get('POKER_READ_RATE', '5')),
+        'burst': int(os.environ.get('POKER_READ_BURST', '10')),
+    },
+    'write': {
+        'rate': float(os.environ.get('POKER_WRITE_RATE', '5')),
+        'burst': int(os.environ.get('POKER_WRITE_BURST', '20')),
+    },
+}
+
+# 過負荷時にポーリング（GET）を断る閾値
+POKER_SHED_MAX_INFLIGHT = int(os.environ.get('POKER_SHED_MAX_INFLIGHT', '16'))
+POKER_SHED_QUEUE_MS = int(os.environ.get('POKER_SHED_QUEUE_MS', '1000'))
+
+# 設定するとポーカーAPIへのリクエストをこのファイルに追記記録する（benchmarks/replay_traffic.py で再生）
+POKER_TRAFFIC_LOG = os.environ.get('POKER_TRAFFIC_LOG', '')
+
+# この秒数リクエストのないプレイヤー（AIプレイヤー以外）を退席させる（0で無効）。見回りは POKER_REAP_INTERVAL_SECONDS ごと
+POKER_IDLE_SECONDS = int(os.environ.get('POKER_IDLE_SECONDS', '300'))
+POKER_REAP_INTERVAL_SECONDS = float(os.environ.get('POKER_REAP_INTERVAL_SECONDS', '15'))
+
+# メモリ上の卓がDBで終了・削除されていないかを確かめる間隔（観戦の共有応答。別プロセスでの終了はこの秒数以内に反映）
+POKER_TABLE_RECHECK_SECONDS = float(os.environ.get('POKER_TABLE_RECHECK_SECONDS', '5'))
+
+# /api/poker/debug/（メモリの内訳・tracemalloc）を有効にする（DEBUG=1 なら常に有効）
+POKER_DEBUG_ENDPOINTS = DEBUG or bool(int(os.environ.get('POKER_DEBUG_ENDPOINTS', '0')))
+
+# このバイト数以上のJSON系のAPI応答を圧縮する（brotli があれば br、なければ gzip）
+API_COMPRESS_MIN_BYTES = int(os.environ.get('API_COMPRESS_MIN_BYTES', '512'))
+API_COMPRESS_GZIP_LEVEL = int(os.environ.get('API_COMPRESS_GZIP_LEVEL', '6'))
+API_COMPRESS_BROTLI_QUALITY = int(os.environ.get('API_COMPRESS_BROTLI_QUALITY', '5'))
+
+# Todoの差分同期: この秒数以内の更新は確定待ちとして次回も返す。削除済み（トゥームストーン）はこの日数残す
+TODO_SYNC_SETTLE_SECONDS = float(os.environ.get('TODO_SYNC_SETTLE_SECONDS', '2'))
+TODO_TOMBSTONE_DAYS = int(os.environ.get('TODO_TOMBSTONE_DAYS', '30'))
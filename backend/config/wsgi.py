@@ -1,7 +1,33 @@
+import logging
 import os
+import time
 
-from django.core.wsgi import get_wsgi_application
+_started = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.urls import get_resolver  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# URLconf（ビュー・シリアライザ・poker_domain）を最初のリクエストではなく起動時に読み込む。
+# gunicorn --preload ならマスタープロセスで1回だけ読み込み、fork した worker で共有される
+get_resolver().url_patterns
+
+if settings.POKER_WARMUP_ON_START:
+    # リクエスト受付前にテーブルを復元しておく
+    from poker.services.table_manager import table_manager
+
+    restored, elapsed = table_manager.warm_up()
+    logger.info('[poker] warm-up: %d tables restored in %.1f ms', restored, elapsed * 1000)
+
+# fork 前に開いたDB接続を worker に引き継がない
+connections.close_all()
+
+logger.info('[startup] application loaded in %.1f ms', (time.perf_counter() - _started) * 1000)
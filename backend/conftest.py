@@ -2,4 +2,27 @@ import pytest
 
 @pytest.fixture
 def sample_fixture():
-    return "Hello, World!"
\ No newline at end of file
+    return "Hello, World!"
+
+
+@pytest.fixture(autouse=True)
+def inline_db_writes(settings):
+    """テストではDB書き込みをライタースレッドに回さず即時実行する"""
+    settings.POKER_DB_WRITER = False
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(settings, tmp_path):
+    """ハンドアーカイブの出力先をテストごとの一時ディレクトリにする"""
+    settings.POKER_ARCHIVE_DIR = tmp_path / 'archive'
+    return settings.POKER_ARCHIVE_DIR
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """テストごとにレート制限のバケットと件数を空にする"""
+    from poker.throttles import reset_rate_limits as reset
+
+    reset()
+    yield
+    reset()
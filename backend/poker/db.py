@@ -0,0 +1,24 @@
+from django.db.backends.signals import connection_created
+
+
+# 接続ごとに設定するSQLiteのPRAGMA
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',       # 書き込み中も読み込みをブロックしない
+    'PRAGMA synchronous=NORMAL',     # WALではコミットごとのfsyncを省略しても破損しない
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-8000',       # 8MB
+]
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """SQLite接続にPRAGMAを設定"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+
+
+def connect_signals():
+    connection_created.connect(configure_sqlite, dispatch_uid='poker.configure_sqlite')
@@ -0,0 +1,52 @@
+"""fork 後の再初期化
+
+gunicorn --preload ではマスタープロセスでアプリを読み込んでから worker を fork する。
+fork した子プロセスには呼び出し元のスレッドしか引き継がれず、fork の瞬間に他のスレッドが
+持っていたロックは子プロセスでは誰も解放しないまま残る。
+register したオブジェクト（モジュールでもよい）は、子プロセスで属性のロック・条件変数を
+新しいものに置き換え、_after_fork() があれば呼ぶ（スレッドの作り直しなど）。
+"""
+import os
+import threading
+import weakref
+
+_LOCK = type(threading.Lock())
+_RLOCK = type(threading.RLock())
+
+_registered = weakref.WeakSet()
+
+
+def register(obj):
+    """fork した子プロセスで obj のロックとスレッド状態を作り直す"""
+    _registered.add(obj)
+    return obj
+
+
+def _renew(value):
+    if isinstance(value, threading.Condition):
+        return threading.Condition()
+    if isinstance(value, _RLOCK):
+        return threading.RLock()
+    if isinstance(value, _LOCK):
+        return threading.Lock()
+    return None
+
+
+def reinit(obj):
+    """obj のロック・条件変数を作り直し、_after_fork() を呼ぶ"""
+    for name, value in list(vars(obj).items()):
+        renewed = _renew(value)
+        if renewed is not None:
+            setattr(obj, name, renewed)
+    after_fork = getattr(obj, '_after_fork', None)
+    if after_fork is not None:
+        after_fork()
+
+
+def _after_fork_in_child():
+    for obj in list(_registered):
+        reinit(obj)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from poker.services.archive import archive_hands, archive_root
+
+
+class Command(BaseCommand):
+    help = '古い終了済みハンドを日単位の列指向ファイルに移してDBから削除する'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POKER_ARCHIVE_AFTER_DAYS,
+            help='この日数より前に終了したハンドを対象にする',
+        )
+
+    def handle(self, *args, **options):
+        hands, actions, partitions = archive_hands(options['days'])
+        self.stdout.write(
+            f'archived {hands} hands ({actions} actions) into {partitions} partitions under {archive_root()}'
+        )
@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from poker.services.hand_export import EXPORT_CHUNK_SIZE, export_hands
+
+
+def _datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f'Invalid datetime: {value}')
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'ハンド履歴をアクション付きのNDJSONで書き出す'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', type=int, help='テーブルID（省略時は全テーブル）')
+        parser.add_argument('--since', type=_datetime, help='開始日時（ISO 8601、この時刻以降に始まったハンド）')
+        parser.add_argument('--until', type=_datetime, help='終了日時（ISO 8601、この時刻までに始まったハンド）')
+        parser.add_argument('--hand-from', type=int, help='ハンド番号の下限')
+        parser.add_argument('--hand-to', type=int, help='ハンド番号の上限')
+        parser.add_argument('--gzip', action='store_true', help='gzip圧縮して出力')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('-o', '--output', help='出力ファイル（省略時は標準出力）')
+
+    def handle(self, *args, **options):
+        stream = export_hands(
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+            table_id=options['table'],
+            since=options['since'],
+            until=options['until'],
+            hand_from=options['hand_from'],
+            hand_to=options['hand_to'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                for chunk in stream:
+                    f.write(chunk)
+        else:
+            out = sys.stdout.buffer
+            for chunk in stream:
+                out.write(chunk)
+            out.flush()
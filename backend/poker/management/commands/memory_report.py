@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+
+from poker.services.memory import layout_comparison, memory_report, snapshots
+from poker.services.table_manager import table_manager
+
+
+class Command(BaseCommand):
+    help = 'アクティブな全テーブルをこのプロセスに復元し、メモリの内訳を表示する'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='表示するテーブル・割り当て箇所の数')
+        parser.add_argument(
+            '--tracemalloc', action='store_true',
+            help='復元の前後で tracemalloc のスナップショットを取り、増えた割り当て箇所を表示する',
+        )
+        parser.add_argument(
+            '--layout', action='store_true',
+            help='PlayerInfo（slots）と通常クラスの1個あたりのバイト数を比べる',
+        )
+
+    def handle(self, *args, **options):
+        top = options['top']
+        if options['tracemalloc']:
+            base = snapshots.take()
+        # 見積もるだけなので、復元したテーブルでハンドを進めない
+        restored, elapsed = table_manager.warm_up(resume=False)
+        self.stdout.write(f'restored {restored} tables in {elapsed * 1000:.1f} ms')
+
+        report = memory_report(table_manager)
+        rss = report['process_rss_bytes']
+        self.stdout.write(
+            f"tables: {report['table_count']}, {report['table_bytes_total']} bytes "
+            f"({report['bytes_per_table']} bytes/table), rss: {rss if rss is not None else '-'} bytes"
+        )
+        for name, size in report['subsystems'].items():
+            self.stdout.write(f'  {name:<16} {size:>12} bytes')
+
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'table':>8} {'players':>8} {'table':>10} {'players':>10} {'history':>10} {'cached':>10} {'total':>10}"
+        )
+        for t in report['tables'][:top]:
+            self.stdout.write(
+                f"{t['table_id']:>8} {t['players']:>8} {t['table_bytes']:>10} {t['player_info_bytes']:>10} "
+                f"{t['state_history_bytes']:>10} {t['cached_response_bytes']:>10} {t['total_bytes']:>10}"
+            )
+
+        if options['tracemalloc']:
+            snapshots.take()
+            self.stdout.write('')
+            self.stdout.write('allocations during warm-up:')
+            for stat in snapshots.diff(base['id'], limit=top):
+                self.stdout.write(
+                    f"  {stat['size_diff_bytes']:>+12} bytes {stat['count_diff']:>+8} blocks  {stat['location']}"
+                )
+            snapshots.stop()
+
+        if options['layout']:
+            layout = layout_comparison()
+            self.stdout.write('')
+            self.stdout.write(
+                f"PlayerInfo: slots {layout['slots_bytes']} bytes, __dict__ {layout['dict_bytes']} bytes "
+                f"(saves {layout['saved_bytes']} bytes per player)"
+            )
@@ -0,0 +1,44 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from poker.services.analytics import LOAD_CHUNK_SIZE, compute_stats, load_actions, stats_row
+
+SORT_KEYS = ['hands', 'vpip', 'pfr', 'aggression_factor', 'showdown_win_rate', 'net_chips']
+
+
+class Command(BaseCommand):
+    help = 'プレイヤーごとの VPIP / PFR / AF / ショーダウン勝率 / 収支を集計する'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='このプレイヤーが参加したハンドだけを集計')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='hands')
+        parser.add_argument('--top', type=int, default=50, help='表示件数（0で全員）')
+        parser.add_argument('--chunk-size', type=int, default=LOAD_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        columns = load_actions(username=options['username'], chunk_size=options['chunk_size'])
+        stats = compute_stats(columns)
+        if len(stats['names']) == 0:
+            self.stdout.write('no hand history')
+            return
+
+        # NaN（算出不能）は末尾に回す
+        order = np.argsort(-np.nan_to_num(stats[options['sort']].astype(float), nan=-np.inf), kind='stable')
+        if options['top']:
+            order = order[:options['top']]
+
+        self.stdout.write(
+            f"{'username':<20} {'hands':>7} {'vpip':>6} {'pfr':>6} {'af':>6} {'sd':>6} {'w$sd':>6} {'net':>10}"
+        )
+        for index in order:
+            row = stats_row(stats, int(index))
+            self.stdout.write(
+                f"{row['username'][:20]:<20} {row['hands']:>7} {_fmt(row['vpip'])} {_fmt(row['pfr'])} "
+                f"{_fmt(row['aggression_factor'])} {row['showdowns']:>6} {_fmt(row['showdown_win_rate'])} "
+                f"{row['net_chips']:>10}"
+            )
+        self.stdout.write(f'{len(columns.hand)} actions from {len(stats["names"])} players')
+
+
+def _fmt(value):
+    return f'{value:>6.2f}' if value is not None else f"{'-':>6}"
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from poker.services.provisioning import close_tables, create_tables, purge_tables, select_tables
+
+
+class Command(BaseCommand):
+    help = 'テーブルを一括作成する（--close / --purge で名前の接頭辞が一致する卓を一括終了・削除）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, nargs='?', help='作成する卓数')
+        parser.add_argument(
+            '--prefix', help='卓名の接頭辞（「接頭辞 1」〜「接頭辞 N」、作成時の既定は Table。--close / --purge では必須）',
+        )
+        parser.add_argument('--max-players', type=int, default=6)
+        parser.add_argument('--small-blind', type=int, default=10)
+        parser.add_argument('--big-blind', type=int, default=20)
+        parser.add_argument('--initial-chips', type=int, default=1000)
+        parser.add_argument('--auto-start', action='store_true', help='ハンド終了後に次のハンドを自動で開始する')
+        parser.add_argument('--close', action='store_true', help='作成せず、接頭辞が一致する卓を終了する')
+        parser.add_argument('--purge', action='store_true', help='作成せず、接頭辞が一致する卓を削除する')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['close'] or options['purge']:
+            # 既定の接頭辞で無関係な卓まで巻き込まないよう、終了・削除では明示を必須にする
+            if not prefix:
+                raise CommandError('--prefix is required with --close / --purge')
+            table_ids = list(select_tables(name_prefix=prefix).values_list('id', flat=True))
+            if options['purge']:
+                self.stdout.write(f'purged {purge_tables(table_ids)} tables')
+            else:
+                tables, players = close_tables(table_ids)
+                self.stdout.write(f'closed {tables} tables ({players} players removed)')
+            return
+
+        if not options['count'] or options['count'] < 1:
+            raise CommandError('count must be a positive integer')
+        # サーバーのワーカーとは別プロセスなので、メモリへの登録は各ワーカーの warm_up / 初回アクセスに任せる
+        tables = create_tables(options['count'], prefix or 'Table', {
+            'max_players': options['max_players'],
+            'small_blind': options['small_blind'],
+            'big_blind': options['big_blind'],
+            'initial_chips': options['initial_chips'],
+            'auto_start': options['auto_start'],
+        })
+        self.stdout.write(f'created {len(tables)} tables (ids {tables[0].id}-{tables[-1].id})')
@@ -0,0 +1,152 @@
+"""ポーカーAPI用のミドルウェア
+
+LoadSheddingMiddleware: 過負荷時の負荷制御
+
+ワーカーが詰まっているときはポーリング（/api/poker/ への GET）から先に 503 で断り、
+アクション・参加などの書き込みは常に通す。過負荷の判定は次のどちらか:
+
+- 処理中のリクエスト数が POKER_SHED_MAX_INFLIGHT 以上
+- nginx が付ける X-Request-Start（t=秒.ミリ秒）からの待ち時間が POKER_SHED_QUEUE_MS 以上
+  （同期ワーカー1つでは処理中は常に1件なので、こちらが主な指標になる）
+
+TrafficRecorderMiddleware: 実トラフィックの記録（POKER_TRAFFIC_LOG を設定したときのみ）
+
+/api/poker/ へのリクエストを1行1件のJSONで追記する。トークンはプロセスごとの
+鍵付きハッシュの別名に置き換え、時刻を残して benchmarks/replay_traffic.py で再生できるようにする。
+"""
+import hashlib
+import json
+import secrets
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+from . import forksafe
+from .throttles import metrics
+
+POLL_PREFIX = '/api/poker/'
+RETRY_AFTER_SECONDS = 1
+
+
+def queue_delay_ms(request):
+    """X-Request-Start からの経過ミリ秒（ヘッダーがなければ None）"""
+    header = request.headers.get('X-Request-Start', '')
+    if header.startswith('t='):
+        header = header[2:]
+    try:
+        started = float(header)
+    except ValueError:
+        return None
+    return (time.time() - started) * 1000
+
+
+class LoadSheddingMiddleware:
+    """過負荷時はポーリングを先に断り、書き込みを優先して通す"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def _shed_reason(self, request):
+        if self.in_flight >= settings.POKER_SHED_MAX_INFLIGHT:
+            return 'inflight'
+        delay = queue_delay_ms(request)
+        if delay is not None and delay >= settings.POKER_SHED_QUEUE_MS:
+            return 'queue'
+        return None
+
+    def __call__(self, request):
+        if request.method == 'GET' and request.path.startswith(POLL_PREFIX):
+            reason = self._shed_reason(request)
+            if reason:
+                metrics.record(f'shed.{reason}')
+                response = JsonResponse({'error': 'Server busy, retry later'}, status=503)
+                response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+                return response
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TrafficRecorderMiddleware:
+    """ポーカーAPIへのリクエストを再生用に追記記録する
+
+    1行の形式（キーは省略形）:
+        t: 受信時刻（UNIXミリ秒）  m: メソッド  p: パス  q: クエリ文字列
+        k: トークンの別名  b: JSONボディ  s: ステータス  d: 処理時間（ミリ秒）
+        r: 応答から再生時の対応付けに使う値（k: 発行されたトークンの別名、id: 作成されたテーブルID）
+    """
+
+    def __init__(self, get_response):
+        path = settings.POKER_TRAFFIC_LOG
+        if not path:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+        self._key = secrets.token_bytes(16)
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def alias(self, token: str) -> str:
+        return hashlib.blake2b(token.encode(), key=self._key, digest_size=6).hexdigest()
+
+    def _result(self, request, response):
+        """トークン・テーブルIDを発行した応答なら対応付け用の値を返す"""
+        if request.method != 'POST' or response.status_code != 201:
+            return None
+        if not response.get('Content-Type', '').startswith('application/json'):
+            return None
+        try:
+            data = json.loads(response.content)
+        except ValueError:
+            return None
+        result = {}
+        if data.get('token'):
+            result['k'] = self.alias(data['token'])
+        table_id = data.get('table_id', data.get('id') if request.path == f'{POLL_PREFIX}tables/' else None)
+        if table_id is not None:
+            result['id'] = table_id
+        return result or None
+
+    def __call__(self, request):
+        if not request.path.startswith(POLL_PREFIX):
+            return self.get_response(request)
+
+        received = time.time()
+        body = None
+        if request.body:
+            try:
+                body = json.loads(request.body)
+            except ValueError:
+                pass
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = (time.perf_counter() - started) * 1000
+
+        token = request.headers.get('X-Player-Token')
+        entry = {
+            't': int(received * 1000),
+            'm': request.method,
+            'p': request.path,
+            'q': request.META.get('QUERY_STRING', ''),
+            'k': self.alias(token) if token else None,
+            'b': body,
+            's': response.status_code,
+            'd': round(duration, 2),
+            'r': self._result(request, response),
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokertable',
+            name='auto_start',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='pokertable',
+            name='auto_start_delay_seconds',
+            field=models.IntegerField(default=3),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0002_pokertable_auto_start'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='tableplayer',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='tableplayer',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('table', 'seat_number'), name='unique_active_seat'),
+        ),
+        migrations.AddConstraint(
+            model_name='tableplayer',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('table', 'username'), name='unique_active_username'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0003_tableplayer_active_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tableplayer',
+            name='is_bot',
+            field=models.BooleanField(default=False),
+        ),
+    ]
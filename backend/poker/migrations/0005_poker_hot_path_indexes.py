@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0004_tableplayer_is_bot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['table', 'created_at'], name='poker_al_table_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tableplayer',
+            index=models.Index(fields=['table', 'is_active'], name='poker_tp_table_active_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+CODE_TO_DISPLAY = [rank + suit for rank in RANKS for suit in SUITS]
+DISPLAY_TO_CODE = {display: code for code, display in enumerate(CODE_TO_DISPLAY)}
+
+BATCH_SIZE = 1000
+
+
+def _convert(apps, convert_card):
+    GameHand = apps.get_model('poker', 'GameHand')
+    batch = []
+    for hand in GameHand.objects.only('id', 'community_cards').iterator(chunk_size=BATCH_SIZE):
+        cards = [convert_card(c) for c in hand.community_cards]
+        if cards != hand.community_cards:
+            hand.community_cards = cards
+            batch.append(hand)
+        if len(batch) >= BATCH_SIZE:
+            GameHand.objects.bulk_update(batch, ['community_cards'])
+            batch = []
+    if batch:
+        GameHand.objects.bulk_update(batch, ['community_cards'])
+
+
+def displays_to_codes(apps, schema_editor):
+    _convert(apps, lambda c: DISPLAY_TO_CODE[c] if isinstance(c, str) else c)
+
+
+def codes_to_displays(apps, schema_editor):
+    _convert(apps, lambda c: CODE_TO_DISPLAY[c] if isinstance(c, int) else c)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0006_actionlog_hand_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamehand',
+            name='hole_cards',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(displays_to_codes, codes_to_displays),
+    ]
@@ -16,6 +16,10 @@ class PokerTable(models.Model):
     allow_mid_exit = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
 
+    # ハンド終了後に次のハンドを自動で開始する
+    auto_start = models.BooleanField(default=False)
+    auto_start_delay_seconds = models.IntegerField(default=3)
+
     # ゲーム状態
     STATUS_CHOICES = [
         ('waiting', '待機中'),
@@ -37,10 +41,26 @@ class TablePlayer(models.Model):
     chips = models.IntegerField(default=1000)
     token = models.CharField(max_length=64, unique=True)
     is_active = models.BooleanField(default=True)
+    # サーバー内のAIプレイヤー
+    is_bot = models.BooleanField(default=False)
     joined_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = [['table', 'seat_number'], ['table', 'username']]
+        # 退出済み（is_active=False）の行は席・ユーザー名の重複判定から除外する
+        constraints = [
+            models.UniqueConstraint(
+                fields=['table', 'seat_number'], condition=models.Q(is_active=True),
+                name='unique_active_seat',
+            ),
+            models.UniqueConstraint(
+                fields=['table', 'username'], condition=models.Q(is_active=True),
+                name='unique_active_username',
+            ),
+        ]
+        indexes = [
+            # serializers.py: テーブルごとの参加人数 / warm_up
+            models.Index(fields=['table', 'is_active'], name='poker_tp_table_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} at {self.table.name} (seat {self.seat_number})"
@@ -66,8 +86,10 @@ class GameHand(models.Model):
     # ポット情報
     total_pot = models.IntegerField(default=0)
 
-    # コミュニティカード（JSON形式）
+    # コミュニティカード（カードコード 0〜51 の配列、services.card_codec を参照）
     community_cards = models.JSONField(default=list)
+    # ホールカード（{席番号: カードコードのビットマスク}、終了したハンドのリプレイ・エクスポートにだけ出す）
+    hole_cards = models.JSONField(default=dict)
 
     # 勝者情報
     winner_seats = models.JSONField(default=list)
@@ -108,6 +130,12 @@ class ActionLog(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # views.py logs: テーブルごとの新しい順
+            models.Index(fields=['table', 'created_at'], name='poker_al_table_created_idx'),
+            # replay / export: ハンドごとの時系列
+            models.Index(fields=['hand', 'created_at'], name='poker_al_hand_created_idx'),
+        ]
 
     def __str__(self):
         player_name = self.player.username if self.player else 'System'
@@ -0,0 +1,86 @@
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+
+from .services.card_codec import HIDDEN, display_to_code
+
+try:
+    import msgpack
+except ImportError:  # MessagePack は任意
+    msgpack = None
+
+
+# 通常のキー -> コンパクト形式のキー
+COMPACT_KEYS = {
+    'message': 'm',
+    'state': 'st',
+    'table_id': 'id',
+    'name': 'n',
+    'phase': 'ph',
+    'hand_number': 'h',
+    'epoch': 'ep',
+    'version': 'v',
+    'since_version': 'sv',
+    'patch': 'pt',
+    'pot': 'p',
+    'current_bet': 'b',
+    'community_cards': 'cc',
+    'players': 'pl',
+    'button_seat': 'bt',
+    'current_player_seat': 'cp',
+    'settings': 'cfg',
+    'max_players': 'mp',
+    'small_blind': 'sb',
+    'big_blind': 'bb',
+    'ante': 'an',
+    'valid_actions': 'va',
+    'seat': 's',
+    'username': 'u',
+    'chips': 'c',
+    'is_folded': 'f',
+    'is_all_in': 'ai',
+    'is_active': 'a',
+    'hole_cards': 'hc',
+    'amount': 'am',
+    'min': 'mn',
+    'max': 'mx',
+}
+
+
+def to_compact(data):
+    """API応答をコンパクト形式（短いキー・整数カード）に変換"""
+    if isinstance(data, dict):
+        if data.get('hidden'):
+            return HIDDEN
+        if 'display' in data and 'rank' in data:
+            return display_to_code(data['display'])
+        return {COMPACT_KEYS.get(key, key): to_compact(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [to_compact(value) for value in data]
+    return data
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """短いキーと整数カードコードのJSON"""
+    media_type = 'application/vnd.poker.compact+json'
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_compact(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """コンパクト形式のMessagePack"""
+    media_type = 'application/x-msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(to_compact(data), use_bin_type=True)
+
+
+# state / action エンドポイントで Accept ヘッダーにより選択可能な形式
+STATE_RENDERER_CLASSES = [JSONRenderer, BrowsableAPIRenderer, CompactJSONRenderer]
+if msgpack is not None:
+    STATE_RENDERER_CLASSES.append(MessagePackRenderer)
@@ -1,31 +1,41 @@
 from rest_framework import serializers
 from .models import PokerTable, TablePlayer, GameHand, ActionLog
+from .services.table_manager import table_manager
+from .services.card_codec import codes_to_display
 
 
 class PokerTableSerializer(serializers.ModelSerializer):
     """ポーカーテーブルシリアライザ"""
     player_count = serializers.SerializerMethodField()
+    hands_per_hour = serializers.SerializerMethodField()
 
     class Meta:
         model = PokerTable
         fields = [
             'id', 'name', 'created_at', 'max_players', 'small_blind',
             'big_blind', 'ante', 'initial_chips', 'time_limit_seconds',
-            'allow_mid_entry', 'allow_mid_exit', 'status', 'player_count'
+            'allow_mid_entry', 'allow_mid_exit', 'auto_start',
+            'auto_start_delay_seconds', 'status', 'player_count', 'hands_per_hour'
         ]
-        read_only_fields = ['id', 'created_at', 'status', 'player_count']
+        read_only_fields = ['id', 'created_at', 'status', 'player_count', 'hands_per_hour']
 
     def get_player_count(self, obj):
+        # ViewSet のクエリセットで集計済みならそれを使う
+        if hasattr(obj, 'active_player_count'):
+            return obj.active_player_count
         return obj.table_players.filter(is_active=True).count()
 
+    def get_hands_per_hour(self, obj):
+        return round(table_manager.hands_per_hour(obj.id), 1)
+
 
 class TablePlayerSerializer(serializers.ModelSerializer):
     """テーブルプレイヤーシリアライザ"""
 
     class Meta:
         model = TablePlayer
-        fields = ['id', 'username', 'seat_number', 'chips', 'is_active', 'joined_at']
-        read_only_fields = ['id', 'chips', 'is_active', 'joined_at']
+        fields = ['id', 'username', 'seat_number', 'chips', 'is_active', 'is_bot', 'joined_at']
+        read_only_fields = ['id', 'chips', 'is_active', 'is_bot', 'joined_at']
 
 
 class JoinTableSerializer(serializers.Serializer):
@@ -34,6 +44,18 @@ class JoinTableSerializer(serializers.Serializer):
     seat_number = serializers.IntegerField(min_value=1)
 
 
+class QuickSeatSerializer(serializers.Serializer):
+    """クイックシートシリアライザ"""
+    username = serializers.CharField(max_length=100)
+    big_blind = serializers.IntegerField(min_value=2, required=False, default=20)
+
+
+class AddBotSerializer(serializers.Serializer):
+    """AIプレイヤー追加シリアライザ（省略時は空席・自動命名）"""
+    username = serializers.CharField(max_length=100, required=False)
+    seat_number = serializers.IntegerField(min_value=1, required=False)
+
+
 class ActionSerializer(serializers.Serializer):
     """アクションシリアライザ"""
     action = serializers.ChoiceField(choices=[
@@ -55,7 +77,8 @@ class ActionLogSerializer(serializers.ModelSerializer):
 
 
 class GameHandSerializer(serializers.ModelSerializer):
-    """ゲームハンドシリアライザ"""
+    """ゲームハンドシリアライザ（カードはDB上のコードを 'Ah' 形式で返す）"""
+    community_cards = serializers.SerializerMethodField()
 
     class Meta:
         model = GameHand
@@ -64,3 +87,61 @@ class GameHandSerializer(serializers.ModelSerializer):
             'button_seat', 'total_pot', 'community_cards',
             'winner_seats', 'winning_hand'
         ]
+
+    def get_community_cards(self, obj):
+        return codes_to_display(obj.community_cards)
+
+
+class HandExportQuerySerializer(serializers.Serializer):
+    """ハンド履歴エクスポートの絞り込み条件（範囲は両端を含む）"""
+    table = serializers.IntegerField(required=False, min_value=1)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    hand_from = serializers.IntegerField(required=False, min_value=1)
+    hand_to = serializers.IntegerField(required=False, min_value=1)
+    gzip = serializers.BooleanField(required=False, default=False)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """リーダーボードの取得条件"""
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+    username = serializers.CharField(required=False, max_length=100)
+
+
+class TelemetryQuerySerializer(serializers.Serializer):
+    """全テーブルの計測値の取得条件"""
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+
+class BulkCreateTablesSerializer(serializers.ModelSerializer):
+    """テーブル一括作成の条件（卓の設定はテーブル作成と同じ項目）"""
+    count = serializers.IntegerField(min_value=1, max_value=500)
+    name_prefix = serializers.CharField(required=False, default='Table', max_length=90)
+    register = serializers.BooleanField(required=False, default=True)
+
+    class Meta:
+        model = PokerTable
+        fields = [
+            'count', 'name_prefix', 'register', 'max_players', 'small_blind',
+            'big_blind', 'ante', 'initial_chips', 'time_limit_seconds',
+            'allow_mid_entry', 'allow_mid_exit', 'auto_start', 'auto_start_delay_seconds',
+        ]
+
+
+class BulkCloseTablesSerializer(serializers.Serializer):
+    """テーブル一括終了の対象（ID一覧か名前の接頭辞のどちらか）"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    name_prefix = serializers.CharField(required=False, max_length=90)
+    purge = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        if not data.get('ids') and not data.get('name_prefix'):
+            raise serializers.ValidationError('ids or name_prefix is required')
+        return data
+
+
+class MemorySnapshotQuerySerializer(serializers.Serializer):
+    """tracemalloc スナップショットの差分の条件（base がなければ一覧、to を省略すると最新と比べる）"""
+    base = serializers.IntegerField(required=False, min_value=1)
+    to = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
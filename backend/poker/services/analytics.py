@@ -0,0 +1,206 @@
+"""プレイヤー統計（VPIP / PFR / AF / ショーダウン勝率 / 収支）
+
+アクション履歴（DB + アーカイブ）を列ごとのNumPy配列に読み込み、
+(ハンド, プレイヤー) のキーに対する np.unique / np.bincount で集計する。
+DBからはチャンク単位で読み、アーカイブはメモリマップのまま必要な行だけ取り出す。
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.db.models import Subquery
+
+from ..models import ActionLog
+from .archive import ACTION_TO_CODE, NO_VALUE, PHASE_TO_CODE, HandArchive
+
+LOAD_CHUNK_SIZE = 50000
+
+PREFLOP = PHASE_TO_CODE['preflop']
+VOLUNTARY = np.array([ACTION_TO_CODE[a] for a in ('call', 'bet', 'raise', 'all_in')], dtype=np.uint8)
+AGGRESSIVE = np.array([ACTION_TO_CODE[a] for a in ('bet', 'raise', 'all_in')], dtype=np.uint8)
+COMMITTING = np.array([ACTION_TO_CODE[a] for a in ('post_blind', 'post_ante', 'call', 'bet', 'raise', 'all_in')],
+                      dtype=np.uint8)
+CALL = ACTION_TO_CODE['call']
+FOLD = ACTION_TO_CODE['fold']
+WIN = ACTION_TO_CODE['win']
+
+
+@dataclass
+class ActionColumns:
+    """プレイヤーのアクションを列ごとに持つ（システムログは含まない）"""
+    hand: np.ndarray  # int64 GameHand.id
+    player: np.ndarray  # int32 names の添字
+    action: np.ndarray  # uint8 ACTION_CODES の添字
+    phase: np.ndarray  # int8 PHASE_CODES の添字
+    amount: np.ndarray  # int64
+    names: List[str]
+
+
+class _ColumnBuilder:
+    """チャンクごとの配列を溜めて最後に連結する"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.name_index: Dict[str, int] = {}
+        self.chunks: List[tuple] = []
+
+    def player_index(self, username: str) -> int:
+        index = self.name_index.get(username)
+        if index is None:
+            index = self.name_index[username] = len(self.names)
+            self.names.append(username)
+        return index
+
+    def add_rows(self, rows: List[tuple]):
+        """DBの (hand_id, username, action, amount, details) の行を追加"""
+        self.chunks.append((
+            np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((self.player_index(r[1]) for r in rows), dtype=np.int32, count=len(rows)),
+            np.fromiter((ACTION_TO_CODE[r[2]] for r in rows), dtype=np.uint8, count=len(rows)),
+            np.fromiter((PHASE_TO_CODE.get((r[4] or {}).get('phase'), NO_VALUE) for r in rows),
+                        dtype=np.int8, count=len(rows)),
+            np.fromiter((r[3] for r in rows), dtype=np.int64, count=len(rows)),
+        ))
+
+    def add_partition(self, partition, hand_mask: Optional[np.ndarray] = None):
+        """アーカイブの1パーティションを追加（hand_mask で対象ハンドを絞る）"""
+        hands = partition.hands
+        actions = partition.actions
+        if len(actions) == 0:
+            return
+        hand_ids = np.repeat(hands['id'], hands['action_count'])
+        keep = actions['player'] != NO_VALUE
+        if hand_mask is not None:
+            keep &= np.repeat(hand_mask, hands['action_count'])
+        if not keep.any():
+            return
+        remap = np.array([self.player_index(str(name)) for name in partition.names], dtype=np.int32)
+        selected = actions[keep]
+        self.chunks.append((
+            hand_ids[keep],
+            remap[selected['player']],
+            selected['action'].astype(np.uint8),
+            selected['phase'].astype(np.int8),
+            selected['amount'].astype(np.int64),
+        ))
+
+    def build(self) -> ActionColumns:
+        if not self.chunks:
+            empty = [np.zeros(0, dtype=t) for t in (np.int64, np.int32, np.uint8, np.int8, np.int64)]
+            return ActionColumns(*empty, names=self.names)
+        columns = [np.concatenate(parts) for parts in zip(*self.chunks)]
+        return ActionColumns(*columns, names=self.names)
+
+
+def load_actions(username: Optional[str] = None, chunk_size: int = LOAD_CHUNK_SIZE,
+                 archive: Optional[HandArchive] = None) -> ActionColumns:
+    """アクション履歴を読み込む
+
+    username を指定するとそのプレイヤーが参加したハンドだけを読む
+    （ショーダウン判定に同じハンドの他プレイヤーの行も必要なため）。
+    """
+    builder = _ColumnBuilder()
+
+    for partition in (archive or HandArchive()).partitions():
+        hand_mask = None
+        if username is not None:
+            matches = np.flatnonzero(partition.names == username)
+            if len(matches) == 0:
+                continue
+            in_hand = np.isin(partition.actions['player'], matches)
+            hand_ids = np.repeat(partition.hands['id'], partition.hands['action_count'])
+            hand_mask = np.isin(partition.hands['id'], hand_ids[in_hand])
+        builder.add_partition(partition, hand_mask)
+
+    rows = ActionLog.objects.filter(hand__isnull=False, player__isnull=False)
+    if username is not None:
+        rows = rows.filter(hand_id__in=Subquery(
+            ActionLog.objects.filter(player__username=username).values('hand_id')
+        ))
+    chunk = []
+    for row in rows.values_list('hand_id', 'player__username', 'action', 'amount', 'details').iterator(
+            chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            builder.add_rows(chunk)
+            chunk = []
+    if chunk:
+        builder.add_rows(chunk)
+    return builder.build()
+
+
+def _count_pairs(keys: np.ndarray, n_players: int) -> np.ndarray:
+    """(ハンド, プレイヤー) キーの重複を除いてプレイヤーごとに数える"""
+    return np.bincount(np.unique(keys) % n_players, minlength=n_players)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def compute_stats(columns: ActionColumns) -> Dict[str, np.ndarray]:
+    """プレイヤーごとの統計を names と同じ順の配列で返す"""
+    n_players = len(columns.names)
+    if n_players == 0:
+        return {'names': np.array([], dtype=str)}
+
+    keys = columns.hand * n_players + columns.player
+    preflop = columns.phase == PREFLOP
+    is_aggressive = np.isin(columns.action, AGGRESSIVE)
+
+    hands = _count_pairs(keys, n_players)
+    vpip = _count_pairs(keys[preflop & np.isin(columns.action, VOLUNTARY)], n_players)
+    pfr = _count_pairs(keys[preflop & is_aggressive], n_players)
+    aggressive_actions = np.bincount(columns.player[is_aggressive], minlength=n_players)
+    calls = np.bincount(columns.player[columns.action == CALL], minlength=n_players)
+
+    # 最後までフォールドしなかったプレイヤーが2人以上いるハンドをショーダウンとみなす
+    remaining = np.setdiff1d(np.unique(keys), keys[columns.action == FOLD])
+    remaining_hands, remaining_counts = np.unique(remaining // n_players, return_counts=True)
+    showdown_hands = remaining_hands[remaining_counts >= 2]
+    showdown_pairs = remaining[np.isin(remaining // n_players, showdown_hands)]
+    win_pairs = np.unique(keys[columns.action == WIN])
+    showdowns = np.bincount(showdown_pairs % n_players, minlength=n_players)
+    showdown_wins = np.bincount(win_pairs[np.isin(win_pairs, showdown_pairs)] % n_players, minlength=n_players)
+
+    sign = np.where(columns.action == WIN, 1, np.where(np.isin(columns.action, COMMITTING), -1, 0))
+    net_chips = np.bincount(columns.player, weights=columns.amount * sign, minlength=n_players).astype(np.int64)
+
+    return {
+        'names': np.array(columns.names, dtype=str),
+        'hands': hands,
+        'vpip': _ratio(vpip, hands),
+        'pfr': _ratio(pfr, hands),
+        'aggression_factor': _ratio(aggressive_actions, calls),
+        'showdowns': showdowns,
+        'showdown_win_rate': _ratio(showdown_wins, showdowns),
+        'net_chips': net_chips,
+    }
+
+
+def stats_row(stats: Dict[str, np.ndarray], index: int) -> dict:
+    """compute_stats の1プレイヤー分をJSONにできるdictにする（算出不能な値は None）"""
+    def number(value):
+        value = float(value)
+        return None if np.isnan(value) else round(value, 4)
+
+    return {
+        'username': str(stats['names'][index]),
+        'hands': int(stats['hands'][index]),
+        'vpip': number(stats['vpip'][index]),
+        'pfr': number(stats['pfr'][index]),
+        'aggression_factor': number(stats['aggression_factor'][index]),
+        'showdowns': int(stats['showdowns'][index]),
+        'showdown_win_rate': number(stats['showdown_win_rate'][index]),
+        'net_chips': int(stats['net_chips'][index]),
+    }
+
+
+def player_stats(username: str) -> Optional[dict]:
+    """1プレイヤーの統計（履歴がなければ None）"""
+    stats = compute_stats(load_actions(username=username))
+    matches = np.flatnonzero(stats['names'] == username)
+    if len(matches) == 0:
+        return None
+    return stats_row(stats, int(matches[0]))
@@ -0,0 +1,363 @@
+"""終了済みハンドの列指向アーカイブ
+
+古いハンドを日単位（finished_at の UTC 日付）のディレクトリにまとめ、
+固定長レコードの .npy として保存する。読み出しは np.load(mmap_mode='r') で
+ファイルをメモリマップするため、全件をメモリに載せずに絞り込みできる。
+
+    <POKER_ARCHIVE_DIR>/2026-01-31/hands.npy    ハンド（1行1ハンド）
+    <POKER_ARCHIVE_DIR>/2026-01-31/actions.npy  アクション（ハンド順、hands の action_start/action_count で参照）
+    <POKER_ARCHIVE_DIR>/2026-01-31/hole_cards.npy  ホールカード（ハンド順、hands の hole_start/hole_count で参照）
+    <POKER_ARCHIVE_DIR>/2026-01-31/names.npy    アクションの player が参照するユーザー名
+
+ActionLog.details は phase / seat / hand_number のみ保持する。
+同じハンドを再びアーカイブしても（DBからの削除前に中断した場合など）、ハンドIDで重複を除くので二重には入らない。
+"""
+import os
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import ActionLog, GameHand
+from .card_codec import code_to_display, masks_to_display
+from .db_writer import db_writer
+
+NO_CARD = 255
+NO_VALUE = -1
+
+ACTION_CODES = [code for code, _ in ActionLog.ACTION_CHOICES]
+ACTION_TO_CODE = {action: i for i, action in enumerate(ACTION_CODES)}
+PHASE_CODES = ['waiting', 'preflop', 'flop', 'turn', 'river', 'finished']
+PHASE_TO_CODE = {phase: i for i, phase in enumerate(PHASE_CODES)}
+
+HAND_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('table_id', '<i4'),
+    ('hand_number', '<i4'),
+    ('button_seat', 'i1'),
+    ('total_pot', '<i8'),
+    ('community_cards', 'u1', (5,)),  # NO_CARD で埋める
+    ('winner_mask', '<u4'),  # bit (seat - 1)
+    ('started_at', '<i8'),  # UNIXミリ秒
+    ('finished_at', '<i8'),
+    ('action_start', '<i8'),
+    ('action_count', '<i4'),
+    ('hole_start', '<i8'),
+    ('hole_count', 'u1'),
+])
+
+HOLE_CARD_DTYPE = np.dtype([
+    ('seat', 'i1'),
+    ('cards', '<u8'),  # card_codec のマスク（GameHand.hole_cards の値）
+])
+
+ACTION_DTYPE = np.dtype([
+    ('action', 'u1'),  # ACTION_CODES の添字
+    ('player', '<i4'),  # names の添字（システムログは NO_VALUE）
+    ('seat', 'i1'),
+    ('phase', 'i1'),  # PHASE_CODES の添字
+    ('hand_number', '<i4'),  # deal の details
+    ('amount', '<i8'),
+    ('created_at', '<i8'),
+])
+
+DELETE_BATCH_SIZE = 500
+
+
+def archive_root() -> Path:
+    return Path(settings.POKER_ARCHIVE_DIR)
+
+
+def _to_ms(value: Optional[datetime]) -> int:
+    if value is None:
+        return NO_VALUE
+    return int(value.timestamp()) * 1000 + value.microsecond // 1000
+
+
+def _from_ms(value: int) -> Optional[datetime]:
+    if value == NO_VALUE:
+        return None
+    seconds, millis = divmod(value, 1000)
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc) + timedelta(milliseconds=millis)
+
+
+def _day_range(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, dt_time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+# --- 書き込み ---
+
+def _build_partition(hands: List[dict], actions: List[tuple]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """DBの行からパーティション用の配列を組み立てる（actions はハンド順）"""
+    hand_rows = np.zeros(len(hands), dtype=HAND_DTYPE)
+    action_rows = np.zeros(len(actions), dtype=ACTION_DTYPE)
+    hole_rows = np.zeros(sum(len(hand['hole_cards']) for hand in hands), dtype=HOLE_CARD_DTYPE)
+    names: Dict[str, int] = {}
+
+    for i, (_, action, username, amount, details, created_at) in enumerate(actions):
+        details = details or {}
+        row = action_rows[i]
+        row['action'] = ACTION_TO_CODE[action]
+        row['player'] = names.setdefault(username, len(names)) if username is not None else NO_VALUE
+        row['seat'] = details.get('seat', NO_VALUE)
+        row['phase'] = PHASE_TO_CODE.get(details.get('phase'), NO_VALUE)
+        row['hand_number'] = details.get('hand_number', NO_VALUE)
+        row['amount'] = amount
+        row['created_at'] = _to_ms(created_at)
+
+    cursor = hole_cursor = 0
+    for i, hand in enumerate(hands):
+        row = hand_rows[i]
+        row['id'] = hand['id']
+        row['table_id'] = hand['table_id']
+        row['hand_number'] = hand['hand_number']
+        row['button_seat'] = hand['button_seat']
+        row['total_pot'] = hand['total_pot']
+        cards = hand['community_cards']
+        row['community_cards'] = cards + [NO_CARD] * (5 - len(cards))
+        mask = 0
+        for seat in hand['winner_seats']:
+            mask |= 1 << (seat - 1)
+        row['winner_mask'] = mask
+        row['started_at'] = _to_ms(hand['started_at'])
+        row['finished_at'] = _to_ms(hand['finished_at'])
+
+        start = cursor
+        while cursor < len(actions) and actions[cursor][0] == hand['id']:
+            cursor += 1
+        row['action_start'] = start
+        row['action_count'] = cursor - start
+
+        row['hole_start'] = hole_cursor
+        row['hole_count'] = len(hand['hole_cards'])
+        for seat, cards in sorted(hand['hole_cards'].items(), key=lambda item: int(item[0])):
+            hole_rows[hole_cursor] = (int(seat), cards)
+            hole_cursor += 1
+
+    name_rows = np.array(list(names), dtype=str) if names else np.zeros(0, dtype='<U1')
+    return hand_rows, action_rows, hole_rows, name_rows
+
+
+def _take_ranges(rows, hand_rows, field: str, offset: int):
+    """hand_rows が参照する rows の範囲だけを取り出し、参照先を offset からの連番に付け替える"""
+    starts = hand_rows[f'{field}_start'].astype(np.int64)
+    counts = hand_rows[f'{field}_count'].astype(np.int64)
+    index = np.concatenate([np.zeros(0, dtype=np.int64)] + [
+        np.arange(start, start + count) for start, count in zip(starts, counts)
+    ])
+    hand_rows[f'{field}_start'] = offset + np.cumsum(counts) - counts
+    return rows[index]
+
+
+def _merge_partition(path: Path, hand_rows, action_rows, hole_rows, name_rows):
+    """既存パーティションに追記した配列を返す（アーカイブ済みのハンドIDは追記しない）"""
+    old_hands = np.load(path / 'hands.npy')
+    old_actions = np.load(path / 'actions.npy')
+    old_holes = np.load(path / 'hole_cards.npy')
+    old_names = np.load(path / 'names.npy')
+
+    hand_rows = hand_rows[~np.isin(hand_rows['id'], old_hands['id'])]
+    action_rows = _take_ranges(action_rows, hand_rows, 'action', len(old_actions))
+    hole_rows = _take_ranges(hole_rows, hand_rows, 'hole', len(old_holes))
+    has_player = action_rows['player'] != NO_VALUE
+    action_rows['player'][has_player] += len(old_names)
+    return (
+        np.concatenate([old_hands, hand_rows]),
+        np.concatenate([old_actions, action_rows]),
+        np.concatenate([old_holes, hole_rows]),
+        np.concatenate([old_names, name_rows]),
+    )
+
+
+def _write_partition(path: Path, hand_rows, action_rows, hole_rows, name_rows):
+    """一時ファイルに書いてから置き換える（hands.npy を最後に置き換える）"""
+    path.mkdir(parents=True, exist_ok=True)
+    for name, rows in (('names', name_rows), ('actions', action_rows),
+                       ('hole_cards', hole_rows), ('hands', hand_rows)):
+        tmp = path / f'{name}.tmp.npy'
+        np.save(tmp, rows)
+        os.replace(tmp, path / f'{name}.npy')
+
+
+def archive_day(day: date, cutoff: datetime) -> Tuple[int, int]:
+    """day に終了し cutoff より前のハンドをアーカイブしてDBから削除
+
+    (ハンド数, アクション数) を返す。
+    """
+    start, end = _day_range(day)
+    hands_qs = GameHand.objects.filter(
+        finished_at__gte=start, finished_at__lt=min(end, cutoff),
+    ).order_by('id')
+    hands = list(hands_qs.values(
+        'id', 'table_id', 'hand_number', 'button_seat', 'total_pot',
+        'community_cards', 'hole_cards', 'winner_seats', 'started_at', 'finished_at',
+    ))
+    if not hands:
+        return 0, 0
+    hand_ids = [hand['id'] for hand in hands]
+    actions = list(
+        ActionLog.objects
+        .filter(hand_id__in=hands_qs.values('id'))
+        .order_by('hand_id', 'created_at', 'id')
+        .values_list('hand_id', 'action', 'player__username', 'amount', 'details', 'created_at')
+    )
+
+    rows = _build_partition(hands, actions)
+    path = archive_root() / day.isoformat()
+    if (path / 'hands.npy').exists():
+        rows = _merge_partition(path, *rows)
+    _write_partition(path, *rows)
+
+    # ファイルを書き終えてから削除（ActionLog はカスケード削除）
+    def delete():
+        for i in range(0, len(hand_ids), DELETE_BATCH_SIZE):
+            GameHand.objects.filter(id__in=hand_ids[i:i + DELETE_BATCH_SIZE]).delete()
+
+    db_writer.call(delete)
+    return len(hands), len(actions)
+
+
+def archive_hands(older_than_days: int, now: Optional[datetime] = None) -> Tuple[int, int, int]:
+    """older_than_days 日より前に終了したハンドをアーカイブ
+
+    (ハンド数, アクション数, パーティション数) を返す。
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    oldest = (
+        GameHand.objects.filter(finished_at__lt=cutoff)
+        .order_by('finished_at').values_list('finished_at', flat=True).first()
+    )
+    if oldest is None:
+        return 0, 0, 0
+
+    total_hands = total_actions = partitions = 0
+    day = oldest.astimezone(dt_timezone.utc).date()
+    last_day = cutoff.astimezone(dt_timezone.utc).date()
+    while day <= last_day:
+        hand_count, action_count = archive_day(day, cutoff)
+        if hand_count:
+            total_hands += hand_count
+            total_actions += action_count
+            partitions += 1
+        day += timedelta(days=1)
+    return total_hands, total_actions, partitions
+
+
+# --- 読み出し ---
+
+class ArchivePartition:
+    """1日分のアーカイブ（配列はメモリマップ）"""
+
+    def __init__(self, path: Path):
+        self.day = date.fromisoformat(path.name)
+        self.hands = np.load(path / 'hands.npy', mmap_mode='r')
+        self.actions = np.load(path / 'actions.npy', mmap_mode='r')
+        self.hole_cards = np.load(path / 'hole_cards.npy', mmap_mode='r')
+        self.names = np.load(path / 'names.npy', mmap_mode='r')
+
+    def select(self, table_id: Optional[int] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None,
+               hand_from: Optional[int] = None, hand_to: Optional[int] = None) -> np.ndarray:
+        """条件に合うハンドの添字（範囲は両端を含む、started_at で比較）"""
+        mask = np.ones(len(self.hands), dtype=bool)
+        if table_id is not None:
+            mask &= self.hands['table_id'] == table_id
+        if since is not None:
+            mask &= self.hands['started_at'] >= _to_ms(since)
+        if until is not None:
+            mask &= self.hands['started_at'] <= _to_ms(until)
+        if hand_from is not None:
+            mask &= self.hands['hand_number'] >= hand_from
+        if hand_to is not None:
+            mask &= self.hands['hand_number'] <= hand_to
+        return np.flatnonzero(mask)
+
+    def action_record(self, row) -> dict:
+        details = {}
+        if row['phase'] != NO_VALUE:
+            details['phase'] = PHASE_CODES[row['phase']]
+        if row['seat'] != NO_VALUE:
+            details['seat'] = int(row['seat'])
+        if row['hand_number'] != NO_VALUE:
+            details['hand_number'] = int(row['hand_number'])
+        return {
+            'action': ACTION_CODES[row['action']],
+            'player': str(self.names[row['player']]) if row['player'] != NO_VALUE else None,
+            'amount': int(row['amount']),
+            'details': details,
+            'created_at': _from_ms(int(row['created_at'])),
+        }
+
+    def hole_card_masks(self, index: int) -> Dict[str, int]:
+        """ハンドのホールカード（GameHand.hole_cards と同じ {席番号(文字列): マスク}）"""
+        row = self.hands[index]
+        start = int(row['hole_start'])
+        return {
+            str(int(hole['seat'])): int(hole['cards'])
+            for hole in self.hole_cards[start:start + int(row['hole_count'])]
+        }
+
+    def hand_record(self, index: int) -> dict:
+        """エクスポートと同じ形のdictに戻す"""
+        row = self.hands[index]
+        start = int(row['action_start'])
+        actions = self.actions[start:start + int(row['action_count'])]
+        mask = int(row['winner_mask'])
+        return {
+            'id': int(row['id']),
+            'table_id': int(row['table_id']),
+            'hand_number': int(row['hand_number']),
+            'button_seat': int(row['button_seat']),
+            'total_pot': int(row['total_pot']),
+            'community_cards': [code_to_display(int(c)) for c in row['community_cards'] if c != NO_CARD],
+            'hole_cards': masks_to_display(self.hole_card_masks(index)),
+            'winner_seats': [seat for seat in range(1, 33) if mask & (1 << (seat - 1))],
+            'winning_hand': '',
+            'started_at': _from_ms(int(row['started_at'])),
+            'finished_at': _from_ms(int(row['finished_at'])),
+            'actions': [self.action_record(a) for a in actions],
+        }
+
+
+class HandArchive:
+    """日単位パーティションの読み出し"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else archive_root()
+
+    def days(self) -> List[date]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            date.fromisoformat(path.name)
+            for path in self.root.iterdir()
+            if (path / 'hands.npy').exists()
+        )
+
+    def partition(self, day: date) -> ArchivePartition:
+        return ArchivePartition(self.root / day.isoformat())
+
+    def partitions(self) -> Iterator[ArchivePartition]:
+        for day in self.days():
+            yield self.partition(day)
+
+    def iter_records(self, table_id: Optional[int] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     hand_from: Optional[int] = None, hand_to: Optional[int] = None) -> Iterator[dict]:
+        """条件に合うアーカイブ済みハンドを日付順に返す"""
+        for day in self.days():
+            # 日付はハンドの終了日なので、開始日時の範囲より前の日は読まずに飛ばす
+            if since is not None and _day_range(day)[1] <= since:
+                continue
+            partition = self.partition(day)
+            for index in partition.select(table_id, since, until, hand_from, hand_to):
+                yield partition.hand_record(int(index))
+
+    def find_hand(self, table_id: int, hand_number: int) -> Optional[dict]:
+        for record in self.iter_records(table_id=table_id, hand_from=hand_number, hand_to=hand_number):
+            return record
+        return None
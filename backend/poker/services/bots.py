@@ -0,0 +1,59 @@
+"""サーバー内で動くAIプレイヤーの戦略
+
+poker_bot.py の decide_action と同じシンプルな戦略:
+- 70% コール/チェック
+- 20% レイズ/ベット
+- 10% フォールド（ベットがある場合のみ）
+"""
+import random
+from typing import Optional, Tuple
+
+
+def decide_action(valid_actions: dict, rng: random.Random = random) -> Tuple[Optional[str], int]:
+    """有効なアクション一覧から (アクション, 額) を決定"""
+    if not valid_actions:
+        return None, 0
+
+    roll = rng.random()
+
+    # チェック可能ならチェック優先
+    if 'check' in valid_actions:
+        if roll < 0.7:
+            return 'check', 0
+        elif 'bet' in valid_actions and roll < 0.9:
+            bet_info = valid_actions['bet']
+            min_bet = bet_info.get('min', 20)
+            max_bet = bet_info.get('max', 100)
+            # 小さめのベット
+            return 'bet', min(min_bet * 2, max_bet)
+        else:
+            return 'check', 0
+
+    # コール必要な場合
+    if 'call' in valid_actions:
+        call_amount = valid_actions['call'].get('amount', 0)
+
+        # 10%でフォールド（大きなベットの場合は確率上昇）
+        if roll < 0.1 or (call_amount > 100 and roll < 0.3):
+            return 'fold', 0
+
+        # 20%でレイズ
+        if 'raise' in valid_actions and roll < 0.3:
+            raise_info = valid_actions['raise']
+            min_raise = raise_info.get('min', call_amount * 2)
+            max_raise = raise_info.get('max', call_amount * 3)
+            return 'raise', min(min_raise, max_raise)
+
+        return 'call', 0
+
+    # オールインしか選択肢がない場合
+    if 'all_in' in valid_actions:
+        if roll < 0.5:
+            return 'all_in', 0
+        return 'fold', 0
+
+    # フォールバック
+    if 'fold' in valid_actions:
+        return 'fold', 0
+
+    return None, 0
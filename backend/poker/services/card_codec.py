@@ -0,0 +1,76 @@
+"""カードの整数コード変換
+
+カードは 0〜51 の整数で表す: code = ランク番号 * 4 + スート番号
+（ランク番号は 2→0 ... A→12、スート番号は c, d, h, s の順）
+
+順序に意味のない手札（ホールカードなど）は 1 << code の論理和（52ビットのマスク）で表す。
+表記・API用dictは52枚分を前もって作っておき、変換は添字1回で済ませる。
+"""
+from typing import Dict, Iterable, List
+
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+
+# 非公開カード（{'hidden': True}）を表すコード
+HIDDEN = -1
+
+CODE_TO_DISPLAY: List[str] = [rank + suit for rank in RANKS for suit in SUITS]
+DISPLAY_TO_CODE = {display: code for code, display in enumerate(CODE_TO_DISPLAY)}
+
+# API応答用のカードdict（共有するので変更しないこと）
+CODE_TO_DICT: List[dict] = [
+    {'rank': display[0], 'suit': display[1], 'display': display} for display in CODE_TO_DISPLAY
+]
+
+# poker_domain の Suit.value → スート番号（Rank.value は 2〜14 なので 2 を引けばランク番号）
+DOMAIN_SUIT_INDEX = {'clubs': 0, 'diamonds': 1, 'hearts': 2, 'spades': 3}
+
+
+def display_to_code(display: str) -> int:
+    """'Ah' 形式の表記をカードコードに変換"""
+    return DISPLAY_TO_CODE[display]
+
+
+def code_to_display(code: int) -> str:
+    """カードコードを 'Ah' 形式の表記に変換"""
+    return CODE_TO_DISPLAY[code]
+
+
+def card_code(card) -> int:
+    """poker_domain の Card をカードコードに変換"""
+    return (card.rank.value - 2) * 4 + DOMAIN_SUIT_INDEX[card.suit.value]
+
+
+def codes_to_display(codes: Iterable[int]) -> List[str]:
+    return [CODE_TO_DISPLAY[code] for code in codes]
+
+
+def codes_to_mask(codes: Iterable[int]) -> int:
+    """カードコードの並びを52ビットのマスクにする"""
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+def mask_to_codes(mask: int) -> List[int]:
+    """マスクに含まれるカードコードを小さい順に返す"""
+    codes = []
+    while mask:
+        low = mask & -mask
+        codes.append(low.bit_length() - 1)
+        mask ^= low
+    return codes
+
+
+def masks_to_display(masks: Dict[str, int]) -> Dict[str, List[str]]:
+    """{席番号: マスク}（GameHand.hole_cards）を {席番号: ['Ah', ...]} にする"""
+    return {seat: codes_to_display(mask_to_codes(mask)) for seat, mask in masks.items()}
+
+
+def rank_of(code: int) -> int:
+    return code >> 2
+
+
+def suit_of(code: int) -> int:
+    return code & 3
@@ -0,0 +1,109 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .. import forksafe
+
+logger = logging.getLogger(__name__)
+
+
+def _log_failure(future: Future):
+    error = future.exception()
+    if error is not None:
+        logger.error('DB write failed', exc_info=error)
+
+
+class DBWriter:
+    """ORMの書き込みを1本のスレッドに直列化するライター
+
+    キューに溜まった書き込みをまとめて1トランザクションでコミットする。
+    各書き込みはセーブポイントで分離し、失敗したものだけを巻き戻す。
+    settings.POKER_DB_WRITER が False の場合は呼び出し元のスレッドで即時実行する。
+    """
+
+    # 1トランザクションにまとめる最大件数
+    MAX_BATCH = 64
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        forksafe.register(self)
+
+    def _after_fork(self):
+        # 親プロセスのキューに残った書き込みは親のもの
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, fn: Callable, log_errors: bool = True) -> Future:
+        """書き込みを登録し、コミット後に結果が入る Future を返す
+
+        結果を待たない呼び出しが多いため、失敗した書き込みはここでログに残す
+        （log_errors=False は呼び出し元が例外を受け取る call() 用）。
+        """
+        future = Future()
+        if log_errors:
+            future.add_done_callback(_log_failure)
+        if not getattr(settings, 'POKER_DB_WRITER', False):
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_thread()
+        self._queue.put((future, fn))
+        return future
+
+    def call(self, fn: Callable):
+        """書き込みを登録してコミットを待ち、結果を返す（例外はそのまま送出）"""
+        return self.submit(fn, log_errors=False).result()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='poker-db-writer', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[Future, Callable]]:
+        batch = [self._queue.get()]
+        while len(batch) < self.MAX_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            outcomes = []
+            try:
+                with transaction.atomic():
+                    for future, fn in batch:
+                        try:
+                            with transaction.atomic():
+                                outcomes.append((future, fn(), None))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+            except Exception as e:
+                logger.exception('DB write batch failed')
+                close_old_connections()
+                outcomes = [(future, None, e) for future, _ in batch]
+
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+# シングルトンインスタンス
+db_writer = DBWriter()
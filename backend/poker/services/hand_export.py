@@ -0,0 +1,108 @@
+"""ハンド履歴のNDJSONエクスポート
+
+GameHand と ActionLog をそれぞれハンド順のサーバーサイドイテレーションで読み、
+マージしながら1ハンド1行のNDJSONとして流す。件数に関係なくメモリ使用量は
+1ハンド分 + チャンク分で一定。アーカイブ済みのハンドはDBの分より先に出力する。
+"""
+import itertools
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..models import ActionLog, GameHand
+from .archive import HandArchive
+from .card_codec import codes_to_display, masks_to_display
+
+EXPORT_CHUNK_SIZE = 2000
+
+HAND_FIELDS = (
+    'id', 'table_id', 'hand_number', 'button_seat', 'total_pot',
+    'community_cards', 'hole_cards', 'winner_seats', 'winning_hand', 'started_at', 'finished_at',
+)
+
+ACTION_FIELDS = (
+    'hand_id', 'action', 'amount', 'details', 'created_at', 'player__username',
+)
+
+
+def filter_hands(table_id: Optional[int] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 hand_from: Optional[int] = None, hand_to: Optional[int] = None):
+    """エクスポート対象のハンドをID順で返す（範囲はいずれも両端を含む）"""
+    hands = GameHand.objects.all()
+    if table_id is not None:
+        hands = hands.filter(table_id=table_id)
+    if since is not None:
+        hands = hands.filter(started_at__gte=since)
+    if until is not None:
+        hands = hands.filter(started_at__lte=until)
+    if hand_from is not None:
+        hands = hands.filter(hand_number__gte=hand_from)
+    if hand_to is not None:
+        hands = hands.filter(hand_number__lte=hand_to)
+    return hands.order_by('id')
+
+
+def iter_hand_records(hands, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """ハンドごとにアクションを結合したdictを順に返す
+
+    hands は filter_hands() の結果（ID順）であること。
+    """
+    actions = (
+        ActionLog.objects
+        .filter(hand__in=hands.values('id'))
+        .order_by('hand_id', 'created_at', 'id')
+        .values_list(*ACTION_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    pending = next(actions, None)
+
+    for hand in hands.values(*HAND_FIELDS).iterator(chunk_size=chunk_size):
+        hand_actions = []
+        while pending is not None and pending[0] <= hand['id']:
+            if pending[0] == hand['id']:
+                _, action, amount, details, created_at, username = pending
+                hand_actions.append({
+                    'action': action,
+                    'player': username,
+                    'amount': amount,
+                    'details': details,
+                    'created_at': created_at,
+                })
+            pending = next(actions, None)
+        hand['community_cards'] = codes_to_display(hand['community_cards'])
+        # 進行中のハンドのホールカードは出さない
+        hand['hole_cards'] = masks_to_display(hand['hole_cards']) if hand['finished_at'] is not None else {}
+        hand['actions'] = hand_actions
+        yield hand
+
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    """dictを1行ずつNDJSONのバイト列にする"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for record in records:
+        yield encoder.encode(record).encode('utf-8') + b'\n'
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """バイト列のストリームをgzip形式で逐次圧縮する"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_hands(compress: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE,
+                 include_archive: bool = True, **filters) -> Iterator[bytes]:
+    """フィルタ条件に合うハンド履歴をNDJSON（compress=True ならgzip）で返す"""
+    records = iter_hand_records(filter_hands(**filters), chunk_size=chunk_size)
+    if include_archive:
+        records = itertools.chain(HandArchive().iter_records(**filters), records)
+    stream = iter_ndjson(records)
+    if compress:
+        stream = gzip_stream(stream)
+    return stream
@@ -0,0 +1,105 @@
+"""全テーブル横断のチップリーダーボード
+
+ユーザー名ごとに着席中の全テーブルのチップを合計し、(-合計, ユーザー名) の
+SortedList で順位を保つ。更新・順位・上位N件はいずれも O(log n)（上位N件は + N）。
+"""
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sortedcontainers import SortedList
+
+from .. import forksafe
+
+
+class Leaderboard:
+    """(table_id, username) ごとのチップからユーザー名ごとの順位を保つ"""
+
+    def __init__(self):
+        self._chips: Dict[Tuple[int, str], int] = {}  # (table_id, username) -> チップ
+        self._totals: Dict[str, int] = {}  # username -> 合計チップ
+        self._seats: Dict[str, int] = {}  # username -> 着席中のテーブル数
+        self._tables: Dict[int, Set[str]] = {}  # table_id -> 着席中のユーザー名
+        self._ranking = SortedList()  # (-合計チップ, username)
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def _set_total(self, username: str, total: Optional[int]):
+        """合計チップを置き換える（None で削除）"""
+        old = self._totals.pop(username, None)
+        if old is not None:
+            self._ranking.remove((-old, username))
+        if total is not None:
+            self._totals[username] = total
+            self._ranking.add((-total, username))
+
+    def _put(self, key: Tuple[int, str], chips: int):
+        table_id, username = key
+        old = self._chips.get(key)
+        if old == chips:
+            return
+        self._chips[key] = chips
+        if old is None:
+            self._seats[username] = self._seats.get(username, 0) + 1
+            self._tables.setdefault(table_id, set()).add(username)
+        self._set_total(username, self._totals.get(username, 0) + chips - (old or 0))
+
+    def _pop(self, key: Tuple[int, str]):
+        table_id, username = key
+        chips = self._chips.pop(key, None)
+        if chips is None:
+            return
+        self._tables[table_id].discard(username)
+        self._seats[username] -= 1
+        if self._seats[username] == 0:
+            del self._seats[username]
+            self._set_total(username, None)
+        else:
+            self._set_total(username, self._totals[username] - chips)
+
+    def update(self, table_id: int, username: str, chips: int):
+        """着席中のプレイヤーのチップを設定"""
+        with self._lock:
+            self._put((table_id, username), chips)
+
+    def seed(self, rows: Iterable[Tuple[int, str, int]]):
+        """(table_id, username, chips) のうち未登録のものだけを追加（起動時の再構築用）"""
+        with self._lock:
+            for table_id, username, chips in rows:
+                if (table_id, username) not in self._chips:
+                    self._put((table_id, username), chips)
+
+    def remove(self, table_id: int, username: str):
+        """退出したプレイヤーを外す"""
+        with self._lock:
+            self._pop((table_id, username))
+
+    def remove_table(self, table_id: int):
+        """テーブルのプレイヤーをまとめて外す"""
+        with self._lock:
+            for username in list(self._tables.get(table_id, ())):
+                self._pop((table_id, username))
+            self._tables.pop(table_id, None)
+
+    def top(self, limit: int) -> List[dict]:
+        """上位 limit 人（同じチップ数は同順位）"""
+        with self._lock:
+            entries = list(self._ranking.islice(0, limit))
+            return [
+                {'rank': self._ranking.bisect_left((neg_chips, '')) + 1, 'username': username, 'chips': -neg_chips}
+                for neg_chips, username in entries
+            ]
+
+    def rank(self, username: str) -> Optional[dict]:
+        """ユーザーの順位（着席していなければ None）"""
+        with self._lock:
+            total = self._totals.get(username)
+            if total is None:
+                return None
+            return {
+                'rank': self._ranking.bisect_left((-total, '')) + 1,
+                'username': username,
+                'chips': total,
+            }
@@ -0,0 +1,52 @@
+from threading import Lock
+from typing import Container, Dict, Optional, Set, Tuple
+
+from .. import forksafe
+
+
+class SeatIndex:
+    """メモリ上のテーブルをステークス（BB額）と空席数で分類した索引"""
+
+    def __init__(self):
+        self._buckets: Dict[int, Dict[int, Set[int]]] = {}  # big_blind -> {空席数 -> {table_id}}
+        self._entries: Dict[int, Tuple[int, int]] = {}  # table_id -> (big_blind, 空席数)
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def update(self, table_id: int, big_blind: int, free_count: int):
+        """テーブルの空席数を登録・更新"""
+        with self._lock:
+            self._discard(table_id)
+            self._buckets.setdefault(big_blind, {}).setdefault(free_count, set()).add(table_id)
+            self._entries[table_id] = (big_blind, free_count)
+
+    def remove(self, table_id: int):
+        """テーブルを索引から削除"""
+        with self._lock:
+            self._discard(table_id)
+
+    def best_table(self, big_blind: int, exclude: Container[int] = ()) -> Optional[int]:
+        """空席のあるテーブルのうち最も埋まっているものを返す（なければ None）
+
+        空席数ごとのバケットを小さい順に見るため、コストはテーブル数ではなく
+        最大人数に比例する。exclude のテーブル（着席を試して失敗したものなど）は除く。
+        """
+        with self._lock:
+            buckets = self._buckets.get(big_blind, {})
+            for free_count in sorted(buckets):
+                if free_count <= 0:
+                    continue
+                for table_id in buckets[free_count]:
+                    if table_id not in exclude:
+                        return table_id
+        return None
+
+    def _discard(self, table_id: int):
+        entry = self._entries.pop(table_id, None)
+        if entry is None:
+            return
+        big_blind, free_count = entry
+        bucket = self._buckets[big_blind][free_count]
+        bucket.discard(table_id)
+        if not bucket:
+            del self._buckets[big_blind][free_count]
@@ -0,0 +1,207 @@
+"""メモリ使用量の内訳
+
+- approx_size: オブジェクトから辿れる範囲の概算バイト数（sys.getsizeof の合計、共有オブジェクトは1回だけ数える）
+- memory_report: メモリ上のテーブル・PlayerInfo・キャッシュ済み応答などの内訳
+- SnapshotStore: tracemalloc のスナップショットを取り、2時点の差分で増えた箇所を探す
+
+approx_size は辿る範囲に比例して時間がかかるため、デバッグ用（POKER_DEBUG_ENDPOINTS）に限って使う。
+"""
+import gc
+import sys
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .. import forksafe
+
+# 辿らない型（クラス・関数・モジュールは共有物なので数えない）
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def approx_size(obj, seen: Optional[set] = None) -> int:
+    """obj から辿れるオブジェクトの sys.getsizeof の合計（seen にあるものは数えない）"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif not isinstance(current, (str, bytes, bytearray, int, float, bool)):
+            if hasattr(current, '__dict__'):
+                stack.append(vars(current))
+            for cls in type(current).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    if name not in ('__dict__', '__weakref__') and hasattr(current, name):
+                        stack.append(getattr(current, name))
+    return total
+
+
+def process_rss() -> Optional[int]:
+    """プロセスの常駐メモリ（Linux 以外は None）"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    import resource
+
+    return resident_pages * resource.getpagesize()
+
+
+def memory_report(manager) -> dict:
+    """TableManager が持つメモリの内訳（テーブルごと・サブシステムごと）"""
+    # テーブル間で共有されるオブジェクト（インターンされた文字列など）は最初に見たテーブルで数える
+    seen = set()
+    tables = []
+    for table_id, table in list(manager._tables.items()):
+        player_info = manager._player_info.get(table_id, {})
+        entry = {
+            'table_id': table_id,
+            'players': len(player_info),
+            'table_bytes': approx_size(table, seen),
+            'player_info_bytes': approx_size(player_info, seen),
+            'seat_map_bytes': approx_size(manager._seat_maps.get(table_id), seen),
+            'state_history_bytes': approx_size(manager._state_history.get(table_id), seen),
+            'cached_response_bytes': approx_size(manager._public_responses.get(table_id), seen),
+        }
+        telemetry = manager._telemetry.peek(table_id)
+        entry['telemetry_bytes'] = approx_size(telemetry, seen) if telemetry is not None else 0
+        entry['total_bytes'] = sum(v for k, v in entry.items() if k.endswith('_bytes'))
+        tables.append(entry)
+    tables.sort(key=lambda t: -t['total_bytes'])
+
+    from .replay import replay_cache
+
+    subsystems = {
+        'leaderboard': approx_size(manager._leaderboard, seen),
+        'seat_index': approx_size(manager._seat_index, seen),
+        'presence': approx_size(manager._presence, seen),
+        'token_index': approx_size(manager._token_index, seen),
+        'replay_cache': approx_size(replay_cache, seen),
+    }
+    table_total = sum(t['total_bytes'] for t in tables)
+    return {
+        'process_rss_bytes': process_rss(),
+        'gc_objects': len(gc.get_objects()),
+        'table_count': len(tables),
+        'table_bytes_total': table_total,
+        'bytes_per_table': table_total // len(tables) if tables else 0,
+        'subsystems': subsystems,
+        'tables': tables,
+    }
+
+
+class SnapshotStore:
+    """tracemalloc のスナップショット（直近 MAX_SNAPSHOTS 件）
+
+    最初の take で tracemalloc を開始する。開始前の割り当ては追跡されないので、
+    増加を調べるときは基準点のスナップショットを先に取る。
+    """
+
+    MAX_SNAPSHOTS = 4
+    # 保存するトレースバックの深さ
+    FRAMES = 1
+
+    def __init__(self):
+        self._snapshots: 'OrderedDict[int, dict]' = OrderedDict()
+        self._next_id = 1
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def take(self) -> dict:
+        """スナップショットを取って {id, taken_at, traced_bytes, peak_bytes} を返す"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        traced, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            info = {'id': snapshot_id, 'taken_at': time.time(), 'traced_bytes': traced, 'peak_bytes': peak}
+            self._snapshots[snapshot_id] = dict(info, snapshot=snapshot)
+            while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return info
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [
+                {k: v for k, v in entry.items() if k != 'snapshot'}
+                for entry in self._snapshots.values()
+            ]
+
+    def diff(self, from_id: int, to_id: Optional[int] = None, limit: int = 20) -> Optional[List[dict]]:
+        """from_id から to_id（省略時は最新）までに増えた割り当てを行ごとに多い順で返す"""
+        with self._lock:
+            if to_id is None and self._snapshots:
+                to_id = next(reversed(self._snapshots))
+            older = self._snapshots.get(from_id)
+            newer = self._snapshots.get(to_id)
+        if older is None or newer is None:
+            return None
+        stats = newer['snapshot'].compare_to(older['snapshot'], 'lineno')
+        return [{
+            'location': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+            'size_diff_bytes': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'size_bytes': stat.size,
+        } for stat in stats[:limit]]
+
+    def stop(self):
+        """tracemalloc を止めてスナップショットを捨てる"""
+        with self._lock:
+            self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+snapshots = SnapshotStore()
+
+
+def bytes_per_instance(factory, args: List[tuple]) -> float:
+    """factory(*args) で作ったオブジェクト1個あたりの割り当てバイト数（引数は計測に含めない）"""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(*a) for a in args]
+    after = tracemalloc.take_snapshot()
+    if not was_tracing:
+        tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # リスト自体の分は除く
+    grown -= sys.getsizeof(objects)
+    return grown / len(args)
+
+
+def layout_comparison(count: int = 10000) -> Dict[str, float]:
+    """PlayerInfo（slots）と、同じ項目で __dict__ を持つ通常のクラスの1個あたりのバイト数"""
+    from dataclasses import fields, make_dataclass
+
+    from .table_manager import PlayerInfo
+
+    plain = make_dataclass('PlainPlayerInfo', [(f.name, f.type) for f in fields(PlayerInfo)])
+    args = [(f'player_{i}', i % 9 + 1, f'{i:064x}', i, False) for i in range(count)]
+
+    slotted = bytes_per_instance(PlayerInfo, args)
+    regular = bytes_per_instance(plain, args)
+    return {
+        'slots_bytes': round(slotted, 1),
+        'dict_bytes': round(regular, 1),
+        'saved_bytes': round(regular - slotted, 1),
+    }
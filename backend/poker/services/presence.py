@@ -0,0 +1,67 @@
+"""プレイヤーの最終アクセス時刻の追跡
+
+リクエストごとの touch は dict への代入だけで済ませ、DBには書かない。
+期限切れの検出には最終アクセス時刻順のヒープを使う。ヒープには登録時の時刻だけを積み、
+取り出した時点で最新の最終アクセス時刻と比べて、まだ有効なら積み直す（遅延更新）。
+"""
+import heapq
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .. import forksafe
+
+
+class PresenceTracker:
+    """トークンごとの最終アクセス時刻（time.monotonic）"""
+
+    def __init__(self):
+        self._last_seen: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []  # (積んだ時点の最終アクセス時刻, トークン)
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def __len__(self):
+        return len(self._last_seen)
+
+    def track(self, token: str, now: Optional[float] = None):
+        """トークンの追跡を始める（now を最終アクセス時刻とする）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_seen[token] = now
+            heapq.heappush(self._heap, (now, token))
+
+    def touch(self, token: str, now: Optional[float] = None):
+        """追跡中のトークンの最終アクセス時刻を更新（未登録のトークンは無視）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if token in self._last_seen:
+                self._last_seen[token] = now
+
+    def forget(self, token: str):
+        """追跡をやめる（ヒープ上の項目は取り出したときに捨てる）"""
+        with self._lock:
+            self._last_seen.pop(token, None)
+
+    def last_seen(self, token: str) -> Optional[float]:
+        return self._last_seen.get(token)
+
+    def expired(self, cutoff: float) -> List[Tuple[str, float]]:
+        """最終アクセスが cutoff 以前のトークンを (トークン, 最終アクセス時刻) で取り出す
+
+        取り出したトークンは追跡をやめる。続けて追跡するなら track(token, last_seen) で戻す。
+        """
+        result = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= cutoff:
+                _, token = heapq.heappop(self._heap)
+                last_seen = self._last_seen.get(token)
+                if last_seen is None:
+                    # forget 済み、または同じトークンの古い項目
+                    continue
+                if last_seen > cutoff:
+                    heapq.heappush(self._heap, (last_seen, token))
+                    continue
+                del self._last_seen[token]
+                result.append((token, last_seen))
+        return result
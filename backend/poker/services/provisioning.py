@@ -0,0 +1,75 @@
+"""テーブルの一括作成・一括終了
+
+トーナメントや負荷試験向けに、テンプレートの設定で N 卓を1回の bulk_create（1トランザクション）で作る。
+register=True なら作成直後に TableManager へ登録し、最初のアクセスを待たずに参加できるようにする。
+終了は is_active=False（着席者も退出扱い）、purge は行ごと削除する。
+
+メモリから外せるのは呼び出したプロセスのテーブルだけ。provision_tables コマンドのように
+サーバーのワーカーとは別のプロセスで終了・削除した卓は、各ワーカーがその卓への次のアクセスで
+DBの is_active を見て forget_tables で外す（views.py の _open_table と観戦の共有応答）。
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from ..models import PokerTable as PokerTableModel, TablePlayer
+from .db_writer import db_writer
+from .replay import replay_cache
+from .table_manager import table_manager
+
+
+def create_tables(count: int, name_prefix: str, template: dict, register: bool = False) -> List[PokerTableModel]:
+    """テンプレートの設定で「{name_prefix} 1」〜「{name_prefix} count」の卓を作る"""
+    tables = [
+        PokerTableModel(name=f'{name_prefix} {number}', **template)
+        for number in range(1, count + 1)
+    ]
+
+    def write():
+        with transaction.atomic():
+            return PokerTableModel.objects.bulk_create(tables)
+
+    created = db_writer.call(write)
+    if register:
+        table_manager.register_tables(created)
+    return created
+
+
+def select_tables(ids: Optional[Iterable[int]] = None, name_prefix: Optional[str] = None):
+    """ID一覧または名前の接頭辞で対象の卓を選ぶ"""
+    tables = PokerTableModel.objects.all()
+    if ids is not None:
+        tables = tables.filter(id__in=list(ids))
+    if name_prefix:
+        tables = tables.filter(name__startswith=name_prefix)
+    return tables
+
+
+def close_tables(table_ids: List[int]) -> Tuple[int, int]:
+    """卓と着席者をまとめて非アクティブにし、メモリからも外す（(卓数, 退出させた人数) を返す）"""
+
+    def write():
+        with transaction.atomic():
+            players = TablePlayer.objects.filter(table_id__in=table_ids, is_active=True).update(is_active=False)
+            tables = PokerTableModel.objects.filter(id__in=table_ids).update(is_active=False, status='finished')
+        return tables, players
+
+    closed = db_writer.call(write)
+    forget_tables(table_ids)
+    return closed
+
+
+def purge_tables(table_ids: List[int]) -> int:
+    """卓を関連行（着席者・ハンド・アクションログ）ごと削除する（削除した卓数を返す）"""
+    _, per_model = db_writer.call(
+        lambda: PokerTableModel.objects.filter(id__in=table_ids).delete()
+    )
+    forget_tables(table_ids)
+    return per_model.get(PokerTableModel._meta.label, 0)
+
+
+def forget_tables(table_ids: Iterable[int]):
+    """このプロセスのメモリとリプレイキャッシュから卓を外す"""
+    for table_id in table_ids:
+        table_manager.remove_table(table_id)
+        replay_cache.discard_table(table_id)
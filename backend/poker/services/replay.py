@@ -0,0 +1,169 @@
+"""ハンドのリプレイ
+
+ActionLog を時系列に1回のクエリで読み、1アクションごとの状態（フレーム）を組み立てる。
+終了済みのハンドは変わらないため、組み立てた結果を LRU キャッシュに置く。
+DBから消えたハンドはアーカイブから読む。
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from .. import forksafe
+from ..models import ActionLog, GameHand
+from .card_codec import codes_to_display, masks_to_display
+
+# フェーズごとに公開されているコミュニティカードの枚数
+BOARD_SIZE = {'preflop': 0, 'flop': 3, 'turn': 4, 'river': 5}
+COMMITTING = ('post_blind', 'post_ante', 'call', 'bet', 'raise', 'all_in')
+
+
+class ReplayCache:
+    """(table_id, hand_number) -> リプレイ のLRUキャッシュ"""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._entries: 'OrderedDict[Tuple[int, int], dict]' = OrderedDict()
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def get(self, key: Tuple[int, int]) -> Optional[dict]:
+        with self._lock:
+            replay = self._entries.get(key)
+            if replay is not None:
+                self._entries.move_to_end(key)
+            return replay
+
+    def put(self, key: Tuple[int, int], replay: dict):
+        with self._lock:
+            self._entries[key] = replay
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def discard_table(self, table_id: int):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == table_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+replay_cache = ReplayCache()
+
+
+def build_frames(community_cards: List[str], actions: List[dict]) -> List[dict]:
+    """アクション（export と同じ形のdict）を順に適用したフレームの一覧"""
+    frames = []
+    phase = 'preflop'
+    pot = 0
+    street_bets = {}
+    folded = []
+
+    for step, entry in enumerate(actions):
+        action = entry['action']
+        details = entry['details'] or {}
+        seat = details.get('seat')
+        amount = entry['amount']
+
+        if details.get('phase') and details['phase'] != phase:
+            # 新しいストリート
+            phase = details['phase']
+            street_bets = {}
+        if action in COMMITTING:
+            pot += amount
+            street_bets[str(seat)] = street_bets.get(str(seat), 0) + amount
+        elif action == 'fold':
+            folded.append(seat)
+        elif action == 'win':
+            pot = max(pot - amount, 0)
+
+        board = community_cards if action == 'win' else community_cards[:BOARD_SIZE.get(phase, 0)]
+        frames.append({
+            'step': step,
+            'action': action,
+            'seat': seat,
+            'username': entry['player'],
+            'amount': amount,
+            'phase': 'finished' if action == 'win' else phase,
+            'pot': pot,
+            'bets': dict(street_bets),
+            'folded': list(folded),
+            'community_cards': list(board),
+        })
+    return frames
+
+
+def _replay(hand: dict, actions: List[dict]) -> dict:
+    return {
+        'table_id': hand['table_id'],
+        'hand_number': hand['hand_number'],
+        'button_seat': hand['button_seat'],
+        'total_pot': hand['total_pot'],
+        'community_cards': hand['community_cards'],
+        'hole_cards': hand['hole_cards'],
+        'winner_seats': hand['winner_seats'],
+        'started_at': hand['started_at'],
+        'finished_at': hand['finished_at'],
+        'frames': build_frames(hand['community_cards'], actions),
+    }
+
+
+def _load_from_db(table_id: int, hand_number: int) -> Optional[dict]:
+    """ハンドとアクションを1クエリで読む（アクションがなければハンドだけ読み直す）"""
+    rows = list(
+        ActionLog.objects
+        .filter(hand__table_id=table_id, hand__hand_number=hand_number)
+        .select_related('hand', 'player')
+        .order_by('created_at', 'id')
+    )
+    if rows:
+        hand = rows[0].hand
+    else:
+        hand = GameHand.objects.filter(table_id=table_id, hand_number=hand_number).first()
+        if hand is None:
+            return None
+
+    actions = [{
+        'action': row.action,
+        'player': row.player.username if row.player else None,
+        'amount': row.amount,
+        'details': row.details,
+    } for row in rows]
+    return _replay({
+        'table_id': hand.table_id,
+        'hand_number': hand.hand_number,
+        'button_seat': hand.button_seat,
+        'total_pot': hand.total_pot,
+        'community_cards': codes_to_display(hand.community_cards),
+        # 進行中のハンドのホールカードは出さない
+        'hole_cards': masks_to_display(hand.hole_cards) if hand.finished_at is not None else {},
+        'winner_seats': hand.winner_seats,
+        'started_at': hand.started_at,
+        'finished_at': hand.finished_at,
+    }, actions)
+
+
+def replay_hand(table_id: int, hand_number: int) -> Optional[dict]:
+    """ハンドのリプレイ（見つからなければ None）"""
+    key = (table_id, hand_number)
+    cached = replay_cache.get(key)
+    if cached is not None:
+        return cached
+
+    replay = _load_from_db(table_id, hand_number)
+    if replay is None:
+        # アーカイブ（numpy）は必要になるまで読み込まない
+        from .archive import HandArchive
+
+        record = HandArchive().find_hand(table_id, hand_number)
+        if record is None:
+            return None
+        replay = _replay(record, record['actions'])
+
+    # 進行中のハンドはまだ変わるのでキャッシュしない
+    if replay['finished_at'] is not None:
+        replay_cache.put(key, replay)
+    return replay
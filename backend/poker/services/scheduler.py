@@ -0,0 +1,85 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from .. import forksafe
+
+logger = logging.getLogger(__name__)
+
+
+class TaskScheduler:
+    """遅延タスクを1本のデーモンスレッドで実行するスケジューラ
+
+    タスクはキーで識別し、同じキーで再登録すると前の予定を置き換える。
+    """
+
+    def __init__(self, name: str = 'poker-scheduler'):
+        self._name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []  # (実行時刻, 連番, キー)
+        self._tasks: Dict[Hashable, Tuple[int, Callable[[], None]]] = {}  # キー -> (連番, 関数)
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        forksafe.register(self)
+
+    def _after_fork(self):
+        # 親プロセスのスレッドは引き継がれないので、予定済みのタスクがあれば起動し直す
+        self._thread = None
+        if self._tasks:
+            self._ensure_thread()
+
+    def schedule(self, delay: float, key: Hashable, fn: Callable[[], None]):
+        """delay 秒後に fn を実行する"""
+        due = time.monotonic() + delay
+        with self._cond:
+            seq = next(self._counter)
+            self._tasks[key] = (seq, fn)
+            heapq.heappush(self._heap, (due, seq, key))
+            self._ensure_thread()
+            self._cond.notify()
+
+    def cancel(self, key: Hashable):
+        """予定済みのタスクを取り消す"""
+        with self._cond:
+            self._tasks.pop(key, None)
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        """タスクが予定済みか"""
+        return key in self._tasks
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def _next_task(self) -> Callable[[], None]:
+        """実行時刻になった次のタスクを取り出す（なければ待機）"""
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, seq, key = self._heap[0]
+                task = self._tasks.get(key)
+                if task is None or task[0] != seq:
+                    # 取り消し・置き換え済み
+                    heapq.heappop(self._heap)
+                    continue
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                del self._tasks[key]
+                return task[1]
+
+    def _run(self):
+        while True:
+            fn = self._next_task()
+            try:
+                fn()
+            except Exception:
+                logger.exception('Scheduled task failed')
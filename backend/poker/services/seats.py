@@ -0,0 +1,44 @@
+from typing import List, Optional, Set
+
+
+class SeatMap:
+    """テーブルの空席ビットマップと着席中のユーザー名
+
+    スレッドセーフではないため、テーブルごとのロック内で操作する。
+    """
+
+    __slots__ = ('max_players', 'occupied', 'usernames')
+
+    def __init__(self, max_players: int):
+        self.max_players = max_players
+        self.occupied = 0  # bit (seat_number - 1) が立っていれば使用中
+        self.usernames: Set[str] = set()
+
+    def reserve(self, seat_number: int, username: str) -> Optional[str]:
+        """席とユーザー名を確保する（失敗時はエラーメッセージを返す）"""
+        if not 1 <= seat_number <= self.max_players:
+            return f'Seat number must be between 1 and {self.max_players}'
+        bit = 1 << (seat_number - 1)
+        if self.occupied & bit:
+            return 'Seat already taken'
+        if username in self.usernames:
+            return 'Username already taken at this table'
+        self.occupied |= bit
+        self.usernames.add(username)
+        return None
+
+    def release(self, seat_number: int, username: str):
+        """席とユーザー名を解放する"""
+        self.occupied &= ~(1 << (seat_number - 1))
+        self.usernames.discard(username)
+
+    def is_free(self, seat_number: int) -> bool:
+        return not self.occupied & (1 << (seat_number - 1))
+
+    def free_seats(self) -> List[int]:
+        """空席の席番号一覧"""
+        return [seat for seat in range(1, self.max_players + 1) if self.is_free(seat)]
+
+    @property
+    def free_count(self) -> int:
+        return self.max_players - bin(self.occupied).count('1')
@@ -0,0 +1,58 @@
+"""state 応答の差分（パッチ）計算
+
+パッチは変更のあったキーだけを持つdict。
+- ネストしたdictは再帰的に差分を取る
+- players は人数が同じならインデックス（文字列）ごとの差分dict、人数が変わればリスト全体
+- それ以外のリスト（カードなど）は変更があれば丸ごと置き換える
+- 削除されたキーは '_removed' に列挙する
+"""
+
+REMOVED_KEY = '_removed'
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    """old から new へのパッチを計算"""
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        old_value = old[key]
+        if old_value == value:
+            continue
+        if key == 'players' and len(value) == len(old_value):
+            patch[key] = {
+                str(index): diff_state(old_item, new_item)
+                for index, (old_item, new_item) in enumerate(zip(old_value, value))
+                if old_item != new_item
+            }
+        elif isinstance(value, dict) and isinstance(old_value, dict):
+            patch[key] = diff_state(old_value, value)
+        else:
+            patch[key] = value
+
+    removed = [key for key in old if key not in new]
+    if removed:
+        patch[REMOVED_KEY] = removed
+    return patch
+
+
+def apply_patch(base: dict, patch: dict) -> dict:
+    """base にパッチを適用した新しいdictを返す"""
+    result = dict(base)
+    for key in patch.get(REMOVED_KEY, []):
+        result.pop(key, None)
+    for key, value in patch.items():
+        if key == REMOVED_KEY:
+            continue
+        current = result.get(key)
+        if isinstance(value, dict) and isinstance(current, list):
+            items = list(current)
+            for index, item_patch in value.items():
+                items[int(index)] = apply_patch(items[int(index)], item_patch)
+            result[key] = items
+        elif isinstance(value, dict) and isinstance(current, dict):
+            result[key] = apply_patch(current, value)
+        else:
+            result[key] = value
+    return result
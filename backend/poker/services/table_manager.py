@@ -1,49 +1,150 @@
-from typing import Dict, Optional
+import gzip
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
-from threading import Lock
+from threading import Lock, RLock
 
+from django.conf import settings
 from poker_domain import (
-    PokerTable, Chips, GamePhase, GameState, ActionResult, PlayerState,
+    PokerTable, Chips, GamePhase, GameState, ActionResult, PlayerState, PokerError,
+    Fold, Check, Call, Bet, Raise, EventType,
 )
+from .. import forksafe
 from ..models import PokerTable as PokerTableModel, TablePlayer, GameHand, ActionLog
+from .bots import decide_action
+from .card_codec import CODE_TO_DICT, card_code, codes_to_mask
+from .db_writer import db_writer
+from .leaderboard import Leaderboard
+from .matchmaking import SeatIndex
+from .presence import PresenceTracker
+from .scheduler import TaskScheduler
+from .seats import SeatMap
+from .state_delta import diff_state
+from .telemetry import Stopwatch, TelemetryRegistry
 
-
-SUIT_TO_SHORT = {
-    'hearts': 'h',
-    'diamonds': 'd',
-    'clubs': 'c',
-    'spades': 's',
-}
-
-RANK_TO_SHORT = {
-    2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7', 8: '8', 9: '9',
-    10: 'T', 11: 'J', 12: 'Q', 13: 'K', 14: 'A',
-}
-
+logger = logging.getLogger(__name__)
 
 PHASE_MAP = {
     'showdown': 'finished',
     'pre_flop': 'preflop',
 }
 
+# 次のハンドを自動開始できるフェーズ（ハンド前と前のハンドの終了後）
+AUTO_START_PHASES = ('waiting', 'showdown')
+
 
 def _map_phase(phase_value: str) -> str:
     return PHASE_MAP.get(phase_value, phase_value)
 
 
 def card_to_dict(card) -> dict:
-    rank_str = RANK_TO_SHORT[card.rank.value]
-    suit_str = SUIT_TO_SHORT[card.suit.value]
-    return {'rank': rank_str, 'suit': suit_str, 'display': f'{rank_str}{suit_str}'}
+    """API応答用のカードdict（前もって作った共有のdictを返す）"""
+    return CODE_TO_DICT[card_code(card)]
+
+
+def build_action(action_str: str, amount: int, state, username: str):
+    """アクション文字列をドメインのActionオブジェクトに変換"""
+    if action_str == 'fold':
+        return Fold()
+    elif action_str == 'check':
+        return Check()
+    elif action_str == 'call':
+        return Call()
+    elif action_str == 'bet':
+        return Bet(amount=amount)
+    elif action_str == 'raise':
+        return Raise(amount=amount)
+    elif action_str == 'all_in':
+        # all_in は新ドメインに直接存在しないため、適切なアクションに変換
+        player_state = next(
+            (p for p in state.players if p.player_id == username), None
+        )
+        if not player_state:
+            return Fold()
+        player_chips = player_state.chips.amount
+        player_current_bet = player_state.current_bet.amount
+        table_current_bet = state.current_bet.amount
+
+        if table_current_bet == 0:
+            return Bet(amount=player_chips)
+        else:
+            total = player_chips + player_current_bet
+            if total > table_current_bet:
+                return Raise(amount=total)
+            else:
+                return Call()
+    else:
+        raise ValueError(f"Unknown action: {action_str}")
+
+
+def committed_chips(action_str: str, amount: int, state, username: str) -> int:
+    """アクションでプレイヤーが新たにポットへ出すチップ額（アクション前のstateから計算）"""
+    player_state = next(
+        (p for p in state.players if p.player_id == username), None
+    )
+    if not player_state or action_str in ('fold', 'check'):
+        return 0
+    player_chips = player_state.chips.amount
+    player_current_bet = player_state.current_bet.amount
+    if action_str == 'call':
+        return min(state.current_bet.amount - player_current_bet, player_chips)
+    if action_str == 'all_in':
+        return player_chips
+    # bet / raise は「いくらまで」の額
+    return min(max(amount - player_current_bet, 0), player_chips)
+
+
+def extract_winner_id(result):
+    """ActionResultからSHOWDOWNイベントの勝者IDを取得"""
+    for event in result.events:
+        if event.event_type == EventType.SHOWDOWN:
+            return event.payload.get('winner_id')
+    return None
+
+
+def get_valid_actions_dict(state, username: str) -> dict:
+    """GameStateからvalid_actionsのdictを構築"""
+    player_state = next(
+        (p for p in state.players if p.player_id == username), None
+    )
+    if not player_state:
+        return {}
+
+    actions = {}
+    to_call = state.current_bet.amount - player_state.current_bet.amount
+    player_chips = player_state.chips.amount
+
+    actions['fold'] = {}
+
+    if to_call == 0:
+        actions['check'] = {}
+        actions['bet'] = {'min': state.big_blind.amount, 'max': player_chips}
+    else:
+        actions['call'] = {'amount': min(to_call, player_chips)}
+        min_raise_to = state.current_bet.amount * 2
+        if player_chips + player_state.current_bet.amount > state.current_bet.amount:
+            actions['raise'] = {
+                'min': min(min_raise_to, player_chips + player_state.current_bet.amount),
+                'max': player_chips + player_state.current_bet.amount,
+            }
 
+    if player_chips > 0:
+        actions['all_in'] = {'amount': player_chips}
 
-@dataclass
+    return actions
+
+
+@dataclass(slots=True)
 class PlayerInfo:
-    """DBプレイヤーとドメインプレイヤーの対応情報"""
+    """DBプレイヤーとドメインプレイヤーの対応情報（着席者ごとに持つため __dict__ なしの slots）"""
     username: str
     seat_number: int
     token: str
     db_id: int
+    is_bot: bool = False
 
 
 class TableManager:
@@ -52,6 +153,13 @@ class TableManager:
     _instance = None
     _lock = Lock()
 
+    # テーブルごとに保持する公開stateの履歴数（since_version の差分計算用）
+    STATE_HISTORY_SIZE = 16
+    # hands_per_hour の計算に使う直近のハンド開始時刻の数
+    HAND_RATE_WINDOW = 60
+    # AIプレイヤーが手番を受けてから行動するまでの秒数
+    BOT_THINK_SECONDS = 0.5
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -65,58 +173,244 @@ class TableManager:
             return
         self._tables: Dict[int, PokerTable] = {}
         self._player_info: Dict[int, Dict[str, PlayerInfo]] = {}  # table_id -> {username -> PlayerInfo}
+        self._seat_maps: Dict[int, SeatMap] = {}  # table_id -> 空席ビットマップ
+        self._seat_index = SeatIndex()  # クイックシート用の (BB額, 空席数) 索引
+        self._big_blinds: Dict[int, int] = {}  # table_id -> BB額
+        self._warmed_up = False
+        self._leaderboard = Leaderboard()  # 全テーブル横断のチップ順位
+        self._leaderboard_seeded = False
+        self._token_index: Dict[str, Tuple[int, str]] = {}  # token -> (table_id, username)
+        self._presence = PresenceTracker()  # 人間プレイヤーの最終アクセス時刻
         self._hand_numbers: Dict[int, int] = {}  # table_id -> hand_number
+        self._state_versions: Dict[int, int] = {}  # table_id -> state version
+        self._state_epochs: Dict[int, str] = {}  # table_id -> 復元ごとに変わる値（バージョンの巻き戻りを見分ける）
+        self._open_checked_at: Dict[int, float] = {}  # table_id -> DBで開いていることを最後に確かめた時刻
+        self._state_history: Dict[int, deque] = {}  # table_id -> deque[(version, 公開state dict)]
+        self._public_responses: Dict[int, Dict[str, Tuple[str, int, bytes, bytes]]] = {}  # table_id -> {media_type -> (epoch, version, body, gzip body)}
+        self._hand_started_at: Dict[int, deque] = {}  # table_id -> deque[ハンド開始時刻]
+        self._hand_db_ids: Dict[int, int] = {}  # table_id -> 進行中ハンドの GameHand.id（DBライタースレッドが設定）
+        self._telemetry = TelemetryRegistry()  # table_id -> ゲーム進行の計測値
+        self._locks: Dict[int, RLock] = {}  # table_id -> テーブルごとのロック
         self._table_lock = Lock()
+        self._scheduler = TaskScheduler()
         self._initialized = True
+        forksafe.register(self)
+
+    def _after_fork(self):
+        """fork した子プロセスでテーブルごとのロックとシングルトン生成用のロックを作り直す"""
+        type(self)._lock = Lock()
+        with self._table_lock:
+            self._locks = {table_id: RLock() for table_id in self._locks}
 
     def get_or_create_table(self, table_id: int) -> Optional[PokerTable]:
-        """テーブルを取得（なければDBから復元）"""
+        """テーブルを取得（なければDBから復元。終了済みの卓は復元しない）"""
         with self._table_lock:
             if table_id in self._tables:
                 return self._tables[table_id]
 
             # DBから復元
             try:
-                db_table = PokerTableModel.objects.get(id=table_id)
+                db_table = PokerTableModel.objects.get(id=table_id, is_active=True)
             except PokerTableModel.DoesNotExist:
                 return None
 
-            table = PokerTable(
-                table_id=str(db_table.id),
-                max_players=db_table.max_players,
-                small_blind=db_table.small_blind,
-                big_blind=db_table.big_blind,
-                timeout_seconds=db_table.time_limit_seconds,
+            return self._restore_table(db_table, db_table.table_players.filter(is_active=True))
+
+    def warm_up(self, resume: bool = True) -> Tuple[int, float]:
+        """アクティブな全テーブルをまとめてDBから復元する
+
+        PokerTable と TablePlayer をそれぞれ1クエリで読み込み、
+        (復元したテーブル数, 所要秒数) を返す。resume=False ならAIの手番・自動開始を予約しない。
+        """
+        started = time.perf_counter()
+
+        db_tables = list(PokerTableModel.objects.filter(is_active=True))
+        players_by_table: Dict[int, List[TablePlayer]] = {t.id: [] for t in db_tables}
+        db_players = TablePlayer.objects.filter(
+            table__is_active=True, is_active=True,
+        ).order_by('table_id', 'id')
+        for db_player in db_players:
+            players_by_table.setdefault(db_player.table_id, []).append(db_player)
+
+        restored = 0
+        with self._table_lock:
+            for db_table in db_tables:
+                if db_table.id in self._tables:
+                    continue
+                self._restore_table(db_table, players_by_table[db_table.id], resume=resume)
+                restored += 1
+
+        self._warmed_up = True
+        self._leaderboard_seeded = True
+        return restored, time.perf_counter() - started
+
+    def ensure_warmed_up(self):
+        """warm_up がまだなら実行（クイックシートの索引を全テーブル分そろえる）"""
+        if not self._warmed_up:
+            self.warm_up()
+
+    def register_table(self, db_table: PokerTableModel) -> PokerTable:
+        """作成直後のテーブルをDBを読まずにメモリへ登録"""
+        with self._table_lock:
+            if db_table.id in self._tables:
+                return self._tables[db_table.id]
+            return self._restore_table(db_table, [])
+
+    def register_tables(self, db_tables: Iterable[PokerTableModel]) -> int:
+        """作成直後の複数テーブルをまとめて登録（登録した数を返す）"""
+        registered = 0
+        with self._table_lock:
+            for db_table in db_tables:
+                if db_table.id in self._tables:
+                    continue
+                self._restore_table(db_table, [])
+                registered += 1
+        return registered
+
+    def _restore_table(self, db_table: PokerTableModel, db_players: Iterable[TablePlayer],
+                       resume: bool = True) -> PokerTable:
+        """DBのテーブルとプレイヤーからインメモリテーブルを構築（_table_lock 内で呼ぶ）"""
+        table_id = db_table.id
+        table = PokerTable(
+            table_id=str(db_table.id),
+            max_players=db_table.max_players,
+            small_blind=db_table.small_blind,
+            big_blind=db_table.big_blind,
+            timeout_seconds=db_table.time_limit_seconds,
+        )
+
+        self._player_info[table_id] = {}
+        self._seat_maps[table_id] = seat_map = SeatMap(db_table.max_players)
+        self._hand_numbers[table_id] = db_table.current_hand_number
+
+        # プレイヤーを復元
+        for db_player in db_players:
+            table.add_player(
+                player_id=db_player.username,
+                chips=Chips(db_player.chips),
             )
+            seat_map.reserve(db_player.seat_number, db_player.username)
+            self._register_player(table_id, PlayerInfo(
+                username=db_player.username,
+                seat_number=db_player.seat_number,
+                token=db_player.token,
+                db_id=db_player.id,
+                is_bot=db_player.is_bot,
+            ))
+            self._leaderboard.update(table_id, db_player.username, db_player.chips)
 
-            self._player_info[table_id] = {}
-            self._hand_numbers[table_id] = db_table.current_hand_number
+        self._tables[table_id] = table
+        self._big_blinds[table_id] = db_table.big_blind
+        self._seat_index.update(table_id, db_table.big_blind, seat_map.free_count)
+        self._state_versions[table_id] = 0
+        # バージョンは復元のたびに 0 から数え直すので、以前の番号と区別できるよう新しいエポックにする
+        self._state_epochs[table_id] = secrets.token_hex(4)
+        self._open_checked_at[table_id] = time.monotonic()
+        self._state_history[table_id] = deque(maxlen=self.STATE_HISTORY_SIZE)
+        state = self._record_snapshot(table_id, db_table)
 
-            # プレイヤーを復元
-            for db_player in db_table.table_players.filter(is_active=True):
-                table.add_player(
-                    player_id=db_player.username,
-                    chips=Chips(db_player.chips),
-                )
-                self._player_info[table_id][db_player.username] = PlayerInfo(
-                    username=db_player.username,
-                    seat_number=db_player.seat_number,
-                    token=db_player.token,
-                    db_id=db_player.id,
-                )
+        # AIの手番・自動開始の予約は復元前のプロセスと一緒に消えているので、ここで予約し直す
+        if resume:
+            self._schedule_bot_turn(table_id, state)
+            if state.phase.value in AUTO_START_PHASES and sum(1 for p in state.players if p.chips.amount > 0) >= 2:
+                self.schedule_auto_start(table_id, db_table)
+        return table
 
-            self._tables[table_id] = table
-            return table
+    def is_open(self, table_id: int) -> bool:
+        """メモリ上の卓がDBでまだ開いているか
+
+        別プロセス（provision_tables --close / --purge）での終了・削除を見つけるため、
+        DBは卓ごとに POKER_TABLE_RECHECK_SECONDS に1回だけ確かめ、その間は開いているものとする。
+        """
+        now = time.monotonic()
+        checked = self._open_checked_at.get(table_id)
+        if checked is not None and now - checked < settings.POKER_TABLE_RECHECK_SECONDS:
+            return True
+        if not PokerTableModel.objects.filter(id=table_id, is_active=True).exists():
+            return False
+        self._open_checked_at[table_id] = now
+        return True
 
     def get_table(self, table_id: int) -> Optional[PokerTable]:
         """テーブルを取得"""
         return self._tables.get(table_id)
 
-    def add_player_info(self, table_id: int, info: PlayerInfo):
+    def add_player_info(self, table_id: int, info: PlayerInfo, chips: int):
         """プレイヤー情報を登録"""
         if table_id not in self._player_info:
             self._player_info[table_id] = {}
+        self._register_player(table_id, info)
+        self._leaderboard.update(table_id, info.username, chips)
+        self._schedule_reaper()
+
+    def _register_player(self, table_id: int, info: PlayerInfo):
+        """プレイヤー情報とトークン索引を登録し、人間プレイヤーは無応答の監視を始める"""
         self._player_info[table_id][info.username] = info
+        self._token_index[info.token] = (table_id, info.username)
+        if not info.is_bot:
+            self._presence.track(info.token)
+
+    def _forget_player(self, table_id: int, username: str):
+        """プレイヤー情報・トークン索引・最終アクセス時刻を削除"""
+        info = self._player_info.get(table_id, {}).pop(username, None)
+        if info is not None:
+            self._token_index.pop(info.token, None)
+            self._presence.forget(info.token)
+        telemetry = self._telemetry.peek(table_id)
+        if telemetry is not None:
+            telemetry.forget_player(username)
+
+    def reserve_seat(self, table_id: int, username: str, seat_number: int) -> Optional[str]:
+        """空席ビットマップ上で席を確保（table_lock 内で呼ぶ、失敗時はエラーメッセージ）"""
+        seat_map = self._seat_maps.get(table_id)
+        if seat_map is None:
+            return 'Table not found'
+        error = seat_map.reserve(seat_number, username)
+        if error is None:
+            self._seat_index.update(table_id, self._big_blinds[table_id], seat_map.free_count)
+        return error
+
+    def release_seat(self, table_id: int, username: str, seat_number: int):
+        """確保した席を解放（table_lock 内で呼ぶ）"""
+        seat_map = self._seat_maps.get(table_id)
+        if seat_map is not None:
+            seat_map.release(seat_number, username)
+            self._seat_index.update(table_id, self._big_blinds[table_id], seat_map.free_count)
+        self._leaderboard.remove(table_id, username)
+        self._forget_player(table_id, username)
+
+    def ensure_leaderboard(self):
+        """リーダーボードにメモリ外のテーブルの着席者も載せる（起動後の初回のみ1クエリ）"""
+        if self._leaderboard_seeded:
+            return
+        self._leaderboard.seed(
+            TablePlayer.objects.filter(is_active=True, table__is_active=True)
+            .values_list('table_id', 'username', 'chips')
+        )
+        self._leaderboard_seeded = True
+
+    def leaderboard_top(self, limit: int) -> List[dict]:
+        """チップ合計の上位 limit 人"""
+        self.ensure_leaderboard()
+        return self._leaderboard.top(limit)
+
+    def leaderboard_rank(self, username: str) -> Optional[dict]:
+        """ユーザーの順位（着席していなければ None）"""
+        self.ensure_leaderboard()
+        return self._leaderboard.rank(username)
+
+    def leaderboard_size(self) -> int:
+        self.ensure_leaderboard()
+        return len(self._leaderboard)
+
+    def find_quick_seat_table(self, big_blind: int, exclude: Iterable[int] = ()) -> Optional[int]:
+        """指定ステークスで空席のある最も埋まったテーブルを返す（exclude のテーブルは除く）"""
+        return self._seat_index.best_table(big_blind, exclude=set(exclude))
+
+    def free_seats(self, table_id: int) -> List[int]:
+        """空席の席番号一覧"""
+        seat_map = self._seat_maps.get(table_id)
+        return seat_map.free_seats() if seat_map else []
 
     def get_player_info_by_username(self, table_id: int, username: str) -> Optional[PlayerInfo]:
         """usernameからプレイヤー情報を取得"""
@@ -124,17 +418,452 @@ class TableManager:
 
     def get_player_info_by_token(self, table_id: int, token: str) -> Optional[PlayerInfo]:
         """トークンからプレイヤー情報を取得"""
-        for info in self._player_info.get(table_id, {}).values():
-            if info.token == token:
-                return info
-        return None
+        entry = self._token_index.get(token)
+        if entry is None or entry[0] != table_id:
+            return None
+        return self._player_info.get(table_id, {}).get(entry[1])
+
+    def is_seated_token(self, token: str) -> bool:
+        """着席中のプレイヤーに発行されたトークンか"""
+        return token in self._token_index
+
+    def touch(self, token: str):
+        """トークン付きリクエストの最終アクセス時刻を記録（DBには書かない）
+
+        見回りの予約もここと参加時に行い、warm_up（gunicorn --preload ではマスタープロセス）では
+        スレッドを起動しない。
+        """
+        self._presence.touch(token)
+        self._schedule_reaper()
 
     def remove_table(self, table_id: int):
         """テーブルを削除"""
         with self._table_lock:
             self._tables.pop(table_id, None)
-            self._player_info.pop(table_id, None)
+            for info in self._player_info.pop(table_id, {}).values():
+                self._token_index.pop(info.token, None)
+                self._presence.forget(info.token)
+            self._seat_maps.pop(table_id, None)
+            self._big_blinds.pop(table_id, None)
+            self._seat_index.remove(table_id)
             self._hand_numbers.pop(table_id, None)
+            self._state_versions.pop(table_id, None)
+            self._state_epochs.pop(table_id, None)
+            self._open_checked_at.pop(table_id, None)
+            self._state_history.pop(table_id, None)
+            self._public_responses.pop(table_id, None)
+            self._hand_started_at.pop(table_id, None)
+            self._hand_db_ids.pop(table_id, None)
+        self._telemetry.remove(table_id)
+        self._leaderboard.remove_table(table_id)
+        self.cancel_auto_start(table_id)
+        self._scheduler.cancel(('bot_turn', table_id))
+
+    def table_lock(self, table_id: int) -> RLock:
+        """テーブルごとのロックを取得（テーブル状態を変更する処理はこの中で行う）"""
+        lock = self._locks.get(table_id)
+        if lock is None:
+            with self._table_lock:
+                lock = self._locks.setdefault(table_id, RLock())
+        return lock
+
+    def start_hand(self, table_id: int, db_table: PokerTableModel) -> Tuple[ActionResult, int]:
+        """次のハンドを開始し (ActionResult, ハンド番号) を返す
+
+        PokerError はそのまま送出する。
+        """
+        table = self._tables[table_id]
+        with self.table_lock(table_id):
+            result = table.start_game()
+            self._telemetry.get(table_id).hand_started(time.monotonic())
+
+            # ハンド番号をインクリメント
+            hand_number = self.increment_hand_number(table_id)
+
+            # ゲームハンド作成
+            self.create_game_hand(table_id, result.state, self.hole_card_masks(table_id, table, result.state))
+            self.log_hand_start(table_id, result.state, hand_number)
+
+            # DB同期
+            self.sync_to_db(table_id, result.state)
+            self.mark_changed(table_id, db_table)
+
+        self._hand_started_at.setdefault(table_id, deque(maxlen=self.HAND_RATE_WINDOW)).append(time.monotonic())
+        return result, hand_number
+
+    def apply_action(self, table_id: int, db_table: PokerTableModel, username: str,
+                     action_str: str, amount: int = 0) -> ActionResult:
+        """プレイヤーのアクションを処理してDBへ反映
+
+        ValueError（不明なアクション）と PokerError はそのまま送出する。
+        """
+        table = self._tables[table_id]
+        with self.table_lock(table_id):
+            # 現在の状態を取得（all_inの変換に必要）
+            current_state = table.get_state(viewer_player_id=username)
+            action_obj = build_action(action_str, amount, current_state, username)
+
+            telemetry = self._telemetry.get(table_id)
+            started = time.perf_counter()
+            result = table.action(player_id=username, action=action_obj)
+            telemetry.record_action(username, (time.perf_counter() - started) * 1000, time.monotonic())
+
+            # DB同期
+            self.sync_to_db(table_id, result.state)
+
+            # アクションログ
+            committed = committed_chips(action_str, amount, current_state, username)
+            entries = [self._log_entry(table_id, username, action_str, committed, {
+                'phase': _map_phase(current_state.phase.value),
+            })]
+
+            # ゲーム終了時（SHOWDOWN）
+            if result.state.phase == GamePhase.SHOWDOWN:
+                telemetry.hand_finished(time.monotonic())
+                with Stopwatch(telemetry.showdown_ms):
+                    winner_id = extract_winner_id(result)
+                    self.finish_game_hand(table_id, result.state, winner_id)
+                    if winner_id:
+                        before = {p.player_id: p.chips.amount for p in current_state.players}
+                        after = {p.player_id: p.chips.amount for p in result.state.players}
+                        won = after.get(winner_id, 0) - before.get(winner_id, 0)
+                        if winner_id == username:
+                            won += committed
+                        entries.append(self._log_entry(table_id, winner_id, 'win', won))
+
+            self.log_actions(table_id, entries)
+
+            self.mark_changed(table_id, db_table)
+
+        # ハンド終了なら次のハンドの自動開始を予約
+        if result.state.phase == GamePhase.SHOWDOWN:
+            self.schedule_auto_start(table_id, db_table)
+        return result
+
+    def schedule_auto_start(self, table_id: int, db_table: PokerTableModel):
+        """auto_start が有効なテーブルで次のハンドの自動開始を予約"""
+        if not db_table.auto_start:
+            return
+        self._scheduler.schedule(
+            db_table.auto_start_delay_seconds,
+            ('auto_start', table_id),
+            lambda: self._run_auto_start(table_id),
+        )
+
+    def cancel_auto_start(self, table_id: int):
+        """予約済みの自動開始を取り消す"""
+        self._scheduler.cancel(('auto_start', table_id))
+
+    def _run_auto_start(self, table_id: int):
+        """スケジューラスレッドから次のハンドを開始"""
+        from django.db import close_old_connections
+
+        close_old_connections()
+        try:
+            try:
+                db_table = PokerTableModel.objects.get(id=table_id)
+            except PokerTableModel.DoesNotExist:
+                return
+            table = self._tables.get(table_id)
+            if table is None or not db_table.auto_start:
+                return
+
+            with self.table_lock(table_id):
+                state = table.get_state()
+                if state.phase.value not in AUTO_START_PHASES:
+                    return
+                # チップが残っているプレイヤーが2人以上必要
+                if sum(1 for p in state.players if p.chips.amount > 0) < 2:
+                    return
+                try:
+                    self.start_hand(table_id, db_table)
+                except PokerError:
+                    return
+        finally:
+            close_old_connections()
+
+    def _schedule_reaper(self):
+        """無応答プレイヤーの見回りを予約（予約済み・無効なら何もしない）"""
+        if settings.POKER_IDLE_SECONDS <= 0 or self._scheduler.is_scheduled(('reaper',)):
+            return
+        self._scheduler.schedule(
+            settings.POKER_REAP_INTERVAL_SECONDS, ('reaper',), self._run_reaper,
+        )
+
+    def _run_reaper(self):
+        """スケジューラスレッドから無応答プレイヤーを退席させ、次の見回りを予約"""
+        from django.db import close_old_connections
+
+        close_old_connections()
+        try:
+            self.reap_idle()
+        finally:
+            close_old_connections()
+            if len(self._presence):
+                self._schedule_reaper()
+
+    def reap_idle(self, now: Optional[float] = None) -> List[Tuple[int, str]]:
+        """最終アクセスから POKER_IDLE_SECONDS 以上経ったプレイヤーを退席させる
+
+        ハンド進行中は手番ならフォールドさせて追跡に戻し、ハンドが終わってから退席させる。
+        TablePlayer の非アクティブ化はまとめて1回で書き込む。
+        退席させた (table_id, username) の一覧を返す。
+        """
+        if settings.POKER_IDLE_SECONDS <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        idle_by_table: Dict[int, List[Tuple[str, str, float]]] = {}
+        for token, last_seen in self._presence.expired(now - settings.POKER_IDLE_SECONDS):
+            entry = self._token_index.get(token)
+            if entry is not None:
+                idle_by_table.setdefault(entry[0], []).append((token, entry[1], last_seen))
+        if not idle_by_table:
+            return []
+
+        db_tables = PokerTableModel.objects.in_bulk(list(idle_by_table))
+        removed = []
+        db_ids = []
+        for table_id, idle_players in idle_by_table.items():
+            table = self._tables.get(table_id)
+            db_table = db_tables.get(table_id)
+            if table is None or db_table is None:
+                continue
+
+            with self.table_lock(table_id):
+                changed = False
+                for token, username, last_seen in idle_players:
+                    info = self._player_info.get(table_id, {}).get(username)
+                    if info is None or info.token != token:
+                        continue
+                    state = table.get_state()
+                    if state.current_player_id == username and state.phase.value not in ('waiting', 'showdown'):
+                        try:
+                            self.apply_action(table_id, db_table, username, 'fold')
+                        except PokerError:
+                            pass
+                        state = table.get_state()
+                    if state.phase.value not in ('waiting', 'showdown'):
+                        # ハンドが終わるまでは席に残し、次の見回りでもう一度確認する
+                        self._presence.track(token, last_seen)
+                        continue
+
+                    try:
+                        table.remove_player(player_id=username)
+                    except PokerError:
+                        pass
+                    self.release_seat(table_id, username, info.seat_number)
+                    removed.append((table_id, username))
+                    db_ids.append(info.db_id)
+                    changed = True
+
+                if changed:
+                    self.sync_to_db(table_id, table.get_state())
+                    self.mark_changed(table_id, db_table)
+
+        if db_ids:
+            db_writer.submit(lambda: TablePlayer.objects.filter(id__in=db_ids).update(is_active=False))
+        return removed
+
+    def hands_per_hour(self, table_id: int) -> float:
+        """直近のハンド開始間隔から1時間あたりのハンド数を計算"""
+        started = self._hand_started_at.get(table_id)
+        if not started or len(started) < 2:
+            return 0.0
+        elapsed = started[-1] - started[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(started) - 1) * 3600 / elapsed
+
+    def table_telemetry(self, table_id: int) -> dict:
+        """テーブルのゲーム進行の計測値"""
+        telemetry = self._telemetry.get(table_id).snapshot()
+        telemetry['table_id'] = table_id
+        telemetry['hands_per_minute'] = round(self.hands_per_hour(table_id) / 60, 3)
+        return telemetry
+
+    def telemetry_overview(self, limit: int = 10) -> dict:
+        """全テーブルの計測値の要約（ハンドの遅いテーブル順、考慮時間の長いプレイヤー順）"""
+        tables = []
+        players = []
+        for table_id in self._telemetry.table_ids():
+            telemetry = self._telemetry.peek(table_id)
+            if telemetry is None:
+                continue
+            snapshot = telemetry.snapshot()
+            tables.append({
+                'table_id': table_id,
+                'hands_per_minute': round(self.hands_per_hour(table_id) / 60, 3),
+                'hand_seconds': snapshot['hand_seconds'],
+                'action_ms': snapshot['action_ms'],
+                'sync_ms': snapshot['sync_ms'],
+            })
+            players.extend(
+                dict(think_ms, table_id=table_id, username=username)
+                for username, think_ms in snapshot['players'].items()
+            )
+
+        def slowest(key):
+            return lambda entry: -(key(entry) or 0)
+
+        tables.sort(key=slowest(lambda t: t['hand_seconds']['avg']))
+        players.sort(key=slowest(lambda p: p['avg']))
+        return {
+            'table_count': len(tables),
+            'slow_tables': tables[:limit],
+            'slow_players': players[:limit],
+        }
+
+    def mark_changed(self, table_id: int, db_table=None) -> int:
+        """テーブル状態の変更を記録し、新しいバージョンを返す
+
+        スケジューラスレッド（自動開始・AIプレイヤー・見回り）からも呼ばれるので、
+        バージョンの更新と履歴への追加はテーブルのロック内で行う。
+        """
+        with self.table_lock(table_id):
+            version = self._state_versions.get(table_id, 0) + 1
+            self._state_versions[table_id] = version
+            state = self._record_snapshot(table_id, db_table)
+            if state is not None:
+                self._telemetry.get(table_id).turn_changed(state.current_player_id, time.monotonic())
+                self._schedule_bot_turn(table_id, state)
+        return version
+
+    def get_state_epoch(self, table_id: int) -> str:
+        """テーブルを復元したときのエポック（バージョンと組で state を特定する）"""
+        return self._state_epochs.get(table_id, '')
+
+    def get_state_version(self, table_id: int) -> int:
+        """現在のstateバージョンを取得"""
+        return self._state_versions.get(table_id, 0)
+
+    def _record_snapshot(self, table_id: int, db_table=None) -> Optional[GameState]:
+        """現在の公開state（viewerなし）を履歴に追加"""
+        table = self._tables.get(table_id)
+        history = self._state_history.get(table_id)
+        if table is None or history is None:
+            return None
+        state = table.get_state()
+        snapshot = self.game_state_to_dict(table_id, state, db_table)
+        history.append((snapshot['version'], snapshot))
+        return state
+
+    def _schedule_bot_turn(self, table_id: int, state: GameState):
+        """手番がAIプレイヤーなら行動を予約"""
+        if not state.current_player_id:
+            return
+        info = self._player_info.get(table_id, {}).get(state.current_player_id)
+        if info is None or not info.is_bot:
+            return
+        self._scheduler.schedule(
+            self.BOT_THINK_SECONDS,
+            ('bot_turn', table_id),
+            lambda: self._run_bot_turn(table_id),
+        )
+
+    def _run_bot_turn(self, table_id: int):
+        """スケジューラスレッドからAIプレイヤーのアクションを実行"""
+        from django.db import close_old_connections
+
+        close_old_connections()
+        try:
+            table = self._tables.get(table_id)
+            if table is None:
+                return
+            try:
+                db_table = PokerTableModel.objects.get(id=table_id)
+            except PokerTableModel.DoesNotExist:
+                return
+
+            with self.table_lock(table_id):
+                state = table.get_state()
+                username = state.current_player_id
+                info = self._player_info.get(table_id, {}).get(username) if username else None
+                if info is None or not info.is_bot:
+                    return
+
+                bot_state = table.get_state(viewer_player_id=username)
+                action_str, amount = decide_action(get_valid_actions_dict(bot_state, username))
+                if action_str is None:
+                    return
+                try:
+                    self.apply_action(table_id, db_table, username, action_str, amount)
+                    return
+                except PokerError as e:
+                    logger.warning('Bot %s at table %s: %s failed: %s', username, table_id, action_str, e)
+
+                # 戦略が無効なアクションを選んだ場合はフォールド、それも通らなければチェック・コール
+                for fallback in ('fold', 'check', 'call'):
+                    try:
+                        self.apply_action(table_id, db_table, username, fallback)
+                        return
+                    except PokerError as e:
+                        logger.warning('Bot %s at table %s: %s failed: %s', username, table_id, fallback, e)
+
+                # どのアクションも通らなければ手番が止まったままになるので退席させる
+                logger.error('Bot %s at table %s could not act; removing it', username, table_id)
+                try:
+                    table.remove_player(player_id=username)
+                except PokerError:
+                    pass
+                self.release_seat(table_id, username, info.seat_number)
+                self.sync_to_db(table_id, table.get_state())
+                self.mark_changed(table_id, db_table)
+                db_writer.submit(lambda: TablePlayer.objects.filter(id=info.db_id).update(is_active=False))
+        finally:
+            close_old_connections()
+
+    def get_public_response(self, table_id: int, renderer) -> Optional[Tuple[str, int, bytes, bytes]]:
+        """最新の公開stateをエンコードした (epoch, version, body, gzip body) を返す
+
+        バージョン・形式ごとに1回だけエンコードし、匿名の観戦リクエストで共有する。
+        テーブルがメモリ上になければ None。
+        """
+        history = self._state_history.get(table_id)
+        if not history:
+            return None
+        version, snapshot = history[-1]
+        epoch = snapshot['epoch']
+
+        responses = self._public_responses.setdefault(table_id, {})
+        cached = responses.get(renderer.media_type)
+        if cached is None or cached[:2] != (epoch, version):
+            body = renderer.render(snapshot)
+            cached = (epoch, version, body, gzip.compress(body, compresslevel=6, mtime=0))
+            responses[renderer.media_type] = cached
+        return cached
+
+    def state_patch(self, table_id: int, since_version: int, state_dict: dict,
+                    viewer_username: Optional[str] = None, epoch: Optional[str] = None) -> Optional[dict]:
+        """since_version から state_dict へのパッチを返す（履歴から外れていれば None）
+
+        バージョンは再起動・再復元で 0 に戻るので、クライアントの epoch が
+        state_dict['epoch'] と違えば（省略時も）同じ番号でも別の state として None を返す。
+        履歴は公開stateなので、同じハンド内であれば viewer 自身のホールカードは
+        変化しないものとして state_dict の値で補う。
+        """
+        if epoch is None or epoch != state_dict['epoch']:
+            return None
+
+        # 履歴は他のスレッドが mark_changed で追加するので、ロック内で複製してから探す
+        with self.table_lock(table_id):
+            history = list(self._state_history.get(table_id, ()))
+        base = None
+        for version, snapshot in history:
+            if version == since_version:
+                base = snapshot
+                break
+        if base is None:
+            return None
+
+        if viewer_username and base['hand_number'] == state_dict['hand_number']:
+            own = next((p for p in state_dict['players'] if p['username'] == viewer_username), None)
+            if own is not None:
+                base = dict(base)
+                base['players'] = [
+                    dict(p, hole_cards=own['hole_cards']) if p['username'] == viewer_username else p
+                    for p in base['players']
+                ]
+        return diff_state(base, state_dict)
 
     def increment_hand_number(self, table_id: int) -> int:
         """ハンド番号をインクリメントして返す"""
@@ -146,70 +875,127 @@ class TableManager:
         return self._hand_numbers.get(table_id, 0)
 
     def sync_to_db(self, table_id: int, state: GameState):
-        """テーブル状態をDBに同期"""
-        try:
-            db_table = PokerTableModel.objects.get(id=table_id)
-        except PokerTableModel.DoesNotExist:
-            return
-
-        # テーブル状態を更新
-        db_table.current_hand_number = self._hand_numbers.get(table_id, 0)
+        """テーブル状態をDBに同期（書き込みはDBライタースレッドで行う）"""
+        # テーブル状態
+        hand_number = self._hand_numbers.get(table_id, 0)
         phase_value = state.phase.value
         if phase_value == 'waiting':
-            db_table.status = 'waiting'
+            table_status = 'waiting'
         elif phase_value == 'showdown':
-            db_table.status = 'waiting'
+            table_status = 'waiting'
         else:
-            db_table.status = 'playing'
-        db_table.save()
+            table_status = 'playing'
 
-        # プレイヤーのチップを更新
+        # プレイヤーのチップ
         info_map = self._player_info.get(table_id, {})
-        for player_state in state.players:
-            info = info_map.get(player_state.player_id)
-            if not info:
+        chips = [
+            (info_map[ps.player_id].db_id, ps.chips.amount)
+            for ps in state.players if ps.player_id in info_map
+        ]
+        for ps in state.players:
+            if ps.player_id in info_map:
+                self._leaderboard.update(table_id, ps.player_id, ps.chips.amount)
+
+        sync_ms = self._telemetry.get(table_id).sync_ms
+
+        def write():
+            with Stopwatch(sync_ms):
+                PokerTableModel.objects.filter(id=table_id).update(
+                    current_hand_number=hand_number, status=table_status,
+                )
+                for db_id, amount in chips:
+                    TablePlayer.objects.filter(id=db_id).update(chips=amount)
+
+        db_writer.submit(write)
+
+    def hole_card_masks(self, table_id: int, table: PokerTable, state: GameState) -> Dict[str, int]:
+        """各プレイヤーのホールカードを {席番号(文字列): カードのマスク} で返す
+
+        全員分のホールカードが見える状態はないため、プレイヤーごとに本人視点の状態から取り出す。
+        """
+        info_map = self._player_info.get(table_id, {})
+        masks = {}
+        for ps in state.players:
+            info = info_map.get(ps.player_id)
+            if info is None:
                 continue
-            try:
-                db_player = TablePlayer.objects.get(id=info.db_id)
-                db_player.chips = player_state.chips.amount
-                db_player.save()
-            except TablePlayer.DoesNotExist:
-                pass
-
-    def create_game_hand(self, table_id: int, state: GameState) -> Optional[GameHand]:
-        """ゲームハンドをDBに作成"""
-        try:
-            db_table = PokerTableModel.objects.get(id=table_id)
-        except PokerTableModel.DoesNotExist:
-            return None
+            view = table.get_state(viewer_player_id=ps.player_id)
+            own = next((p for p in view.players if p.player_id == ps.player_id), None)
+            if own is not None and own.hole_cards:
+                masks[str(info.seat_number)] = codes_to_mask(card_code(c) for c in own.hole_cards)
+        return masks
 
+    def create_game_hand(self, table_id: int, state: GameState, hole_cards: Optional[Dict[str, int]] = None):
+        """ゲームハンドをDBに作成（DBライタースレッドで行う）"""
         hand_number = self._hand_numbers.get(table_id, 0)
         info_map = self._player_info.get(table_id, {})
         dealer_info = info_map.get(state.dealer_id)
         button_seat = dealer_info.seat_number if dealer_info else 0
 
-        hand = GameHand.objects.create(
-            table=db_table,
-            hand_number=hand_number,
-            button_seat=button_seat,
-        )
-        return hand
+        def write():
+            # 作成に失敗しても、以降のアクションログを前のハンドに紐づけない
+            self._hand_db_ids.pop(table_id, None)
+            hand = GameHand.objects.create(
+                table_id=table_id,
+                hand_number=hand_number,
+                button_seat=button_seat,
+                hole_cards=hole_cards or {},
+            )
+            # 以降のアクションログはこのハンドに紐づける
+            self._hand_db_ids[table_id] = hand.id
 
-    def update_game_hand(self, hand: GameHand, state: GameState, winner_id: Optional[str] = None):
-        """ゲームハンドを更新"""
-        from django.utils import timezone
+        db_writer.submit(write)
+
+    def _log_entry(self, table_id: int, username: Optional[str], action: str,
+                   amount: int = 0, details: Optional[dict] = None) -> dict:
+        """ActionLog 1行分の値を組み立てる（username=None はシステムログ）"""
+        info = self._player_info.get(table_id, {}).get(username) if username else None
+        details = dict(details or {})
+        if info:
+            details['seat'] = info.seat_number
+        return {
+            'player_id': info.db_id if info else None,
+            'action': action,
+            'amount': amount,
+            'details': details,
+        }
+
+    def log_hand_start(self, table_id: int, state: GameState, hand_number: int):
+        """ハンド開始時の配布とブラインドを記録"""
+        entries = [self._log_entry(table_id, None, 'deal', details={'hand_number': hand_number})]
+        for ps in state.players:
+            if ps.current_bet.amount > 0:
+                entries.append(self._log_entry(table_id, ps.player_id, 'post_blind', ps.current_bet.amount))
+        self.log_actions(table_id, entries)
 
-        hand.total_pot = state.pot.amount
-        hand.community_cards = [card_to_dict(c)['display'] for c in state.community_cards]
+    def log_actions(self, table_id: int, entries: List[dict]):
+        """ActionLog をまとめて書き込む（DBライタースレッドで行う）"""
+        def write():
+            hand_id = self._hand_db_ids.get(table_id)
+            ActionLog.objects.bulk_create([
+                ActionLog(table_id=table_id, hand_id=hand_id, **entry) for entry in entries
+            ])
 
+        db_writer.submit(write)
+
+    def finish_game_hand(self, table_id: int, state: GameState, winner_id: Optional[str] = None):
+        """現在のハンドの結果をDBに記録（DBライタースレッドで行う）"""
+        from django.utils import timezone
+
+        fields = {
+            'total_pot': state.pot.amount,
+            'community_cards': [card_code(c) for c in state.community_cards],
+            'finished_at': timezone.now(),
+        }
         if winner_id:
-            info_map = self._player_info.get(int(state.table_id), {})
-            winner_info = info_map.get(winner_id)
+            winner_info = self._player_info.get(table_id, {}).get(winner_id)
             if winner_info:
-                hand.winner_seats = [winner_info.seat_number]
+                fields['winner_seats'] = [winner_info.seat_number]
 
-        hand.finished_at = timezone.now()
-        hand.save()
+        hand_number = self._hand_numbers.get(table_id, 0)
+        db_writer.submit(lambda: GameHand.objects.filter(
+            table_id=table_id, hand_number=hand_number,
+        ).update(**fields))
 
     def game_state_to_dict(self, table_id: int, state: GameState, db_table=None) -> dict:
         """GameStateをAPI応答用のdictに変換"""
@@ -253,6 +1039,8 @@ class TableManager:
             'name': db_table.name if db_table else '',
             'phase': _map_phase(state.phase.value),
             'hand_number': self._hand_numbers.get(table_id, 0),
+            'epoch': self._state_epochs.get(table_id, ''),
+            'version': self._state_versions.get(table_id, 0),
             'pot': state.pot.amount,
             'current_bet': state.current_bet.amount,
             'community_cards': [card_to_dict(c) for c in state.community_cards],
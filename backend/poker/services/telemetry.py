@@ -0,0 +1,135 @@
+"""テーブルごとのゲーム進行の計測
+
+HTTPのレイテンシではなく、ゲームそのものの速さを見るための値を固定長のリングバッファ
+（deque(maxlen)）に記録する。直近 WINDOW 件だけを保持するので、記録は O(1)・メモリは一定。
+
+- ハンドの所要時間（開始からショーダウンまで）
+- 手番が来てからアクションが届くまでの考慮時間（プレイヤーごと）
+- table.action の処理時間、ショーダウン処理の時間、DB同期の書き込み時間
+"""
+import time
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, Iterable, List, Optional
+
+from .. import forksafe
+
+
+def summarize(values: Iterable[float]) -> dict:
+    """件数・平均・p50・p90・最大"""
+    ordered = sorted(values)
+    if not ordered:
+        return {'count': 0, 'avg': None, 'p50': None, 'p90': None, 'max': None}
+    last = len(ordered) - 1
+    return {
+        'count': len(ordered),
+        'avg': round(sum(ordered) / len(ordered), 3),
+        'p50': round(ordered[round(last * 0.5)], 3),
+        'p90': round(ordered[round(last * 0.9)], 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+class TableTelemetry:
+    """1テーブル分の計測値"""
+
+    # 種類ごとに保持する直近の件数
+    WINDOW = 200
+    # プレイヤーごとに保持する考慮時間の件数
+    PLAYER_WINDOW = 50
+
+    def __init__(self):
+        self.hand_seconds: Deque[float] = deque(maxlen=self.WINDOW)
+        self.think_ms: Deque[float] = deque(maxlen=self.WINDOW)
+        self.action_ms: Deque[float] = deque(maxlen=self.WINDOW)
+        self.showdown_ms: Deque[float] = deque(maxlen=self.WINDOW)
+        self.sync_ms: Deque[float] = deque(maxlen=self.WINDOW)
+        self.player_think_ms: Dict[str, Deque[float]] = {}
+        self._hand_started: Optional[float] = None
+        self._turn: Optional[str] = None
+        self._turn_started: Optional[float] = None
+
+    def hand_started(self, now: float):
+        self._hand_started = now
+
+    def hand_finished(self, now: float):
+        if self._hand_started is not None:
+            self.hand_seconds.append(now - self._hand_started)
+            self._hand_started = None
+
+    def turn_changed(self, username: Optional[str], now: float):
+        """手番のプレイヤーを記録（同じプレイヤーのままなら開始時刻を変えない）"""
+        if username != self._turn:
+            self._turn = username
+            self._turn_started = now if username else None
+
+    def record_action(self, username: str, action_ms: float, now: float):
+        """アクションの処理時間と、手番が来てからの考慮時間を記録"""
+        self.action_ms.append(action_ms)
+        if username == self._turn and self._turn_started is not None:
+            think = (now - self._turn_started) * 1000
+            self.think_ms.append(think)
+            player = self.player_think_ms.get(username)
+            if player is None:
+                player = self.player_think_ms[username] = deque(maxlen=self.PLAYER_WINDOW)
+            player.append(think)
+        # 次の手番が同じプレイヤーでも、アクション後の手番として数え直す
+        self._turn = None
+        self._turn_started = None
+
+    def forget_player(self, username: str):
+        self.player_think_ms.pop(username, None)
+
+    def snapshot(self) -> dict:
+        return {
+            'hand_seconds': summarize(self.hand_seconds),
+            'think_ms': summarize(self.think_ms),
+            'action_ms': summarize(self.action_ms),
+            'showdown_ms': summarize(self.showdown_ms),
+            'sync_ms': summarize(self.sync_ms),
+            'players': {
+                username: summarize(values)
+                for username, values in list(self.player_think_ms.items())
+            },
+        }
+
+
+class Stopwatch:
+    """with ブロックの経過ミリ秒を deque に追加する"""
+
+    def __init__(self, target: Deque[float]):
+        self.target = target
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.target.append((time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class TelemetryRegistry:
+    """table_id -> TableTelemetry"""
+
+    def __init__(self):
+        self._tables: Dict[int, TableTelemetry] = {}
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def get(self, table_id: int) -> TableTelemetry:
+        telemetry = self._tables.get(table_id)
+        if telemetry is None:
+            with self._lock:
+                telemetry = self._tables.setdefault(table_id, TableTelemetry())
+        return telemetry
+
+    def peek(self, table_id: int) -> Optional[TableTelemetry]:
+        return self._tables.get(table_id)
+
+    def remove(self, table_id: int):
+        with self._lock:
+            self._tables.pop(table_id, None)
+
+    def table_ids(self) -> List[int]:
+        return list(self._tables)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, GameHand, PokerTable, TablePlayer
+from poker.services.analytics import compute_stats, load_actions, player_stats
+from poker.services.archive import archive_hands
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+# (username, action, amount, phase)
+HAND_1 = [  # Alice がレイズ、Bob がコールしてショーダウン、Bob の勝ち
+    ('Alice', 'post_blind', 10, None),
+    ('Bob', 'post_blind', 20, None),
+    ('Alice', 'raise', 50, 'preflop'),
+    ('Bob', 'call', 40, 'preflop'),
+    ('Alice', 'bet', 60, 'flop'),
+    ('Bob', 'call', 60, 'flop'),
+    ('Bob', 'win', 240, None),
+]
+HAND_2 = [  # Bob がフォールドして Alice の勝ち
+    ('Bob', 'post_blind', 10, None),
+    ('Alice', 'post_blind', 20, None),
+    ('Bob', 'fold', 0, 'preflop'),
+    ('Alice', 'win', 30, None),
+]
+
+
+@pytest.fixture
+def history():
+    table = PokerTable.objects.create(name='Stats Table')
+    players = {
+        name: TablePlayer.objects.create(table=table, username=name, seat_number=seat, chips=1000)
+        for seat, name in enumerate(('Alice', 'Bob'), start=1)
+    }
+    for hand_number, actions in enumerate((HAND_1, HAND_2), start=1):
+        hand = GameHand.objects.create(table=table, hand_number=hand_number, button_seat=1)
+        GameHand.objects.filter(id=hand.id).update(finished_at=NOW - timedelta(days=40 * (2 - hand_number)))
+        ActionLog.objects.create(table=table, hand=hand, action='deal', details={'hand_number': hand_number})
+        for username, action, amount, phase in actions:
+            details = {'seat': players[username].seat_number}
+            if phase:
+                details['phase'] = phase
+            ActionLog.objects.create(
+                table=table, hand=hand, player=players[username],
+                action=action, amount=amount, details=details,
+            )
+    return table
+
+
+EXPECTED = {
+    'Alice': {
+        'username': 'Alice', 'hands': 2, 'vpip': 0.5, 'pfr': 0.5, 'aggression_factor': None,
+        'showdowns': 1, 'showdown_win_rate': 0.0, 'net_chips': -110,
+    },
+    'Bob': {
+        'username': 'Bob', 'hands': 2, 'vpip': 0.5, 'pfr': 0.0, 'aggression_factor': 0.0,
+        'showdowns': 1, 'showdown_win_rate': 1.0, 'net_chips': 110,
+    },
+}
+
+
+class TestPlayerStats:
+    """プレイヤー統計の集計に関するテスト"""
+
+    def test_stats_from_db(self, history):
+        """DBのアクション履歴から統計を計算するテスト"""
+        assert player_stats('Alice') == EXPECTED['Alice']
+        assert player_stats('Bob') == EXPECTED['Bob']
+
+    def test_stats_include_archive(self, history):
+        """アーカイブ済みのハンドも合わせて集計されるテスト"""
+        assert archive_hands(30, now=NOW)[0] == 1
+        assert GameHand.objects.count() == 1
+        assert player_stats('Alice') == EXPECTED['Alice']
+        assert player_stats('Bob') == EXPECTED['Bob']
+
+    def test_all_players(self, history):
+        """全プレイヤーをまとめて集計するテスト"""
+        columns = load_actions(chunk_size=3)
+        stats = compute_stats(columns)
+        assert sorted(stats['names'].tolist()) == ['Alice', 'Bob']
+        assert int(stats['net_chips'].sum()) == 0
+
+    def test_unknown_player(self, history):
+        """履歴のないプレイヤーは None を返すテスト"""
+        assert player_stats('Carol') is None
+
+
+class TestPlayerStatsEndpoint:
+    """プレイヤー統計APIに関するテスト"""
+
+    def test_get_stats(self, history):
+        """統計が取得できるテスト"""
+        response = APIClient().get('/api/poker/players/Alice/stats/')
+        assert response.status_code == 200
+        assert response.data == EXPECTED['Alice']
+
+    def test_not_found(self, history):
+        """履歴のないプレイヤーは404を返すテスト"""
+        response = APIClient().get('/api/poker/players/Carol/stats/')
+        assert response.status_code == 404
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+import pytest
+
+from poker.models import ActionLog, GameHand, PokerTable, TablePlayer
+from poker.services import archive
+from poker.services.archive import HandArchive, archive_hands
+from poker.services.card_codec import codes_to_mask, display_to_code
+from poker.services.hand_export import filter_hands, iter_hand_records
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+HOLE_CARDS = {
+    '1': codes_to_mask(display_to_code(c) for c in ('As', 'Ad')),
+    '3': codes_to_mask(display_to_code(c) for c in ('2c', '7h')),
+}
+
+
+def _create_hand(table, player, hand_number, finished_at):
+    hand = GameHand.objects.create(
+        table=table, hand_number=hand_number, button_seat=1,
+        total_pot=40, community_cards=[display_to_code(c) for c in ('Ah', 'Kd', '7c')], winner_seats=[1],
+        hole_cards=HOLE_CARDS,
+    )
+    GameHand.objects.filter(id=hand.id).update(
+        started_at=finished_at - timedelta(minutes=1), finished_at=finished_at,
+    )
+    ActionLog.objects.create(table=table, hand=hand, action='deal', details={'hand_number': hand_number})
+    ActionLog.objects.create(table=table, hand=hand, player=player, action='post_blind', amount=10, details={'seat': 1})
+    ActionLog.objects.create(table=table, hand=hand, player=player, action='raise', amount=30,
+                             details={'phase': 'preflop', 'seat': 1})
+    ActionLog.objects.create(table=table, hand=hand, player=player, action='win', amount=40, details={'seat': 1})
+    return hand
+
+
+@pytest.fixture
+def table():
+    return PokerTable.objects.create(name='Archive Table')
+
+
+@pytest.fixture
+def player(table):
+    return TablePlayer.objects.create(table=table, username='Player1', seat_number=1, chips=1000)
+
+
+def _comparable(record):
+    """DB由来とアーカイブ由来で精度が違う時刻をミリ秒に揃える"""
+    record = dict(record)
+    for key in ('started_at', 'finished_at'):
+        record[key] = record[key].replace(microsecond=record[key].microsecond // 1000 * 1000)
+    record['actions'] = [
+        {**a, 'created_at': a['created_at'].replace(microsecond=a['created_at'].microsecond // 1000 * 1000)}
+        for a in record['actions']
+    ]
+    return record
+
+
+class TestArchiveHands:
+    """ハンドのアーカイブに関するテスト"""
+
+    def test_old_hands_moved_to_partitions(self, table, player):
+        """古いハンドだけが日単位のパーティションに移りDBから消えるテスト"""
+        _create_hand(table, player, 1, NOW - timedelta(days=40))
+        _create_hand(table, player, 2, NOW - timedelta(days=35))
+        _create_hand(table, player, 3, NOW - timedelta(days=1))
+
+        hands, actions, partitions = archive_hands(30, now=NOW)
+        assert (hands, actions, partitions) == (2, 8, 2)
+        assert list(GameHand.objects.values_list('hand_number', flat=True)) == [3]
+        assert ActionLog.objects.count() == 4
+        assert len(HandArchive().days()) == 2
+
+    def test_round_trip(self, table, player):
+        """アーカイブから読んだ内容がDBのエクスポートと一致するテスト"""
+        _create_hand(table, player, 1, NOW - timedelta(days=40))
+        before = [_comparable(r) for r in iter_hand_records(filter_hands())]
+
+        archive_hands(30, now=NOW)
+        after = [_comparable(r) for r in HandArchive().iter_records()]
+        assert after == before
+
+    def test_rerun_appends_to_partition(self, table, player):
+        """同じ日に再実行すると既存パーティションに追記されるテスト"""
+        finished_at = NOW - timedelta(days=40)
+        _create_hand(table, player, 1, finished_at)
+        archive_hands(30, now=NOW)
+        _create_hand(table, player, 2, finished_at + timedelta(minutes=5))
+        archive_hands(30, now=NOW)
+
+        records = list(HandArchive().iter_records())
+        assert [r['hand_number'] for r in records] == [1, 2]
+        assert [a['action'] for a in records[1]['actions']] == ['deal', 'post_blind', 'raise', 'win']
+        assert records[1]['actions'][1]['player'] == 'Player1'
+
+    def test_rerun_after_failed_delete(self, table, player, monkeypatch):
+        """DBからの削除に失敗したあと再実行しても同じハンドが二重に入らないテスト"""
+        finished_at = NOW - timedelta(days=40)
+        _create_hand(table, player, 1, finished_at)
+
+        def fail(fn):
+            raise RuntimeError('delete failed')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(archive.db_writer, 'call', fail)
+            with pytest.raises(RuntimeError):
+                archive_hands(30, now=NOW)
+        assert GameHand.objects.count() == 1
+
+        _create_hand(table, player, 2, finished_at + timedelta(minutes=5))
+        archive_hands(30, now=NOW)
+        assert GameHand.objects.count() == 0
+
+        records = list(HandArchive().iter_records())
+        assert [r['hand_number'] for r in records] == [1, 2]
+        assert [len(r['actions']) for r in records] == [4, 4]
+        assert records[1]['actions'][1]['player'] == 'Player1'
+
+    def test_hole_cards_kept(self, table, player):
+        """ホールカードがアーカイブに残るテスト"""
+        _create_hand(table, player, 1, NOW - timedelta(days=40))
+        hand = _create_hand(table, player, 2, NOW - timedelta(days=40, minutes=-5))
+        GameHand.objects.filter(id=hand.id).update(hole_cards={})
+        archive_hands(30, now=NOW)
+
+        archive = HandArchive()
+        partition = archive.partition(archive.days()[0])
+        assert partition.hole_card_masks(0) == HOLE_CARDS
+        assert partition.hole_card_masks(1) == {}
+
+
+class TestHandArchiveReader:
+    """アーカイブの読み出しに関するテスト"""
+
+    def test_memory_mapped(self, table, player):
+        """パーティションの配列がメモリマップで開かれるテスト"""
+        _create_hand(table, player, 1, NOW - timedelta(days=40))
+        archive_hands(30, now=NOW)
+
+        archive = HandArchive()
+        partition = archive.partition(archive.days()[0])
+        assert isinstance(partition.hands, np.memmap)
+        assert isinstance(partition.actions, np.memmap)
+
+    def test_filters(self, table, player):
+        """テーブル・ハンド番号・時刻で絞り込めるテスト"""
+        for hand_number in range(1, 4):
+            _create_hand(table, player, hand_number, NOW - timedelta(days=40, hours=hand_number))
+        archive_hands(30, now=NOW)
+
+        archive = HandArchive()
+        assert archive.find_hand(table.id, 2)['hand_number'] == 2
+        assert archive.find_hand(table.id + 1, 2) is None
+        records = archive.iter_records(table_id=table.id, hand_from=2)
+        assert sorted(r['hand_number'] for r in records) == [2, 3]
+        assert list(archive.iter_records(since=NOW)) == []
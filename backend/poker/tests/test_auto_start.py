@@ -0,0 +1,108 @@
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, PokerTable, TablePlayer
+from poker.services.table_manager import table_manager
+
+TIMEOUT = 5
+
+
+def _join(client, table_id, seat_number, username):
+    response = client.post(
+        f'/api/poker/tables/{table_id}/join/',
+        {'seat_number': seat_number, 'username': username},
+        format='json',
+    )
+    assert response.status_code == 201
+    return response.data['token']
+
+
+def _wait_for_hand(table_id, hand_number):
+    deadline = time.monotonic() + TIMEOUT
+    while table_manager.get_hand_number(table_id) < hand_number and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return table_manager.get_hand_number(table_id)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAutoStartOnJoin:
+    """参加時の自動開始の予約に関するテスト（API経由）"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Auto Start Table', auto_start=True, auto_start_delay_seconds=1)
+        yield table
+        table_manager.remove_table(table.id)
+
+    def test_rejoin_after_showdown_starts_hand(self, db_table):
+        """ハンド終了後に1人になったテーブルへ再び参加すると次のハンドが始まるテスト"""
+        client = APIClient()
+        tokens = {
+            'Player1': _join(client, db_table.id, 1, 'Player1'),
+            'Player2': _join(client, db_table.id, 2, 'Player2'),
+        }
+        response = client.post(f'/api/poker/tables/{db_table.id}/start/', HTTP_X_PLAYER_TOKEN=tokens['Player1'])
+        assert response.status_code == 200
+        assert table_manager.get_hand_number(db_table.id) == 1
+
+        # 手番のプレイヤーがフォールドしてハンド終了、すぐにもう1人が退出する
+        table = table_manager.get_table(db_table.id)
+        folder = table.get_state().current_player_id
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/action/', {'action': 'fold'},
+            format='json', HTTP_X_PLAYER_TOKEN=tokens[folder],
+        )
+        assert response.status_code == 200
+        assert table.get_state().phase.value == 'showdown'
+        response = client.post(f'/api/poker/tables/{db_table.id}/leave/', HTTP_X_PLAYER_TOKEN=tokens[folder])
+        assert response.status_code == 200
+
+        # ハンド終了時の予約は人数不足で何もしない
+        time.sleep(db_table.auto_start_delay_seconds + 0.5)
+        assert table.get_state().phase.value == 'showdown'
+        assert table_manager.get_hand_number(db_table.id) == 1
+
+        _join(client, db_table.id, 3, 'Player3')
+        assert _wait_for_hand(db_table.id, 2) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAutoStartOnRestore:
+    """DBからの復元（再起動後）に止まったハンドを再開させるテスト"""
+
+    def _seed(self, is_bot):
+        table = PokerTable.objects.create(name='Restore Table', auto_start=True, auto_start_delay_seconds=1)
+        for seat in (1, 2):
+            TablePlayer.objects.create(
+                table=table, username=f'Player{seat}', seat_number=seat, chips=1000, is_bot=is_bot,
+            )
+        # 別のテストが同じIDのテーブルをメモリに残していても、未復元の状態から始める
+        table_manager.remove_table(table.id)
+        return table
+
+    def test_restore_schedules_auto_start(self):
+        """人数の揃ったテーブルを復元すると次のハンドが自動で始まるテスト"""
+        db_table = self._seed(is_bot=False)
+        try:
+            table_manager.get_or_create_table(db_table.id)
+            assert _wait_for_hand(db_table.id, 1) == 1
+        finally:
+            table_manager.remove_table(db_table.id)
+
+    def test_warm_up_resumes_bots(self):
+        """AIプレイヤーだけのテーブルを warm_up で復元するとハンドが始まりAIが行動するテスト"""
+        db_table = self._seed(is_bot=True)
+        bot_actions = ActionLog.objects.filter(
+            table=db_table, player__is_bot=True, action__in=('fold', 'check', 'call', 'bet', 'raise', 'all_in'),
+        )
+        try:
+            table_manager.warm_up()
+            assert _wait_for_hand(db_table.id, 1) >= 1
+            deadline = time.monotonic() + TIMEOUT
+            while not bot_actions.exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert bot_actions.exists()
+        finally:
+            table_manager.remove_table(db_table.id)
@@ -0,0 +1,169 @@
+import random
+import time
+
+import pytest
+from poker_domain import PokerError
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, PokerTable, TablePlayer
+from poker.services.bots import decide_action
+from poker.services.table_manager import get_valid_actions_dict, table_manager
+
+TIMEOUT = 5
+BOT_ACTIONS = ('fold', 'check', 'call', 'bet', 'raise', 'all_in')
+
+
+class FixedRandom(random.Random):
+    """random() が常に同じ値を返す乱数"""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+class TestDecideAction:
+    """AIプレイヤーの戦略に関するテスト"""
+
+    def test_no_valid_actions(self):
+        """自分の番でなければ何もしないテスト"""
+        assert decide_action({}) == (None, 0)
+
+    @pytest.mark.parametrize('roll, expected', [
+        (0.5, ('check', 0)),
+        (0.8, ('bet', 40)),
+        (0.95, ('check', 0)),
+    ])
+    def test_check_or_bet(self, roll, expected):
+        """チェック可能な場合の選択テスト"""
+        valid_actions = {'fold': {}, 'check': {}, 'bet': {'min': 20, 'max': 980}}
+        assert decide_action(valid_actions, FixedRandom(roll)) == expected
+
+    @pytest.mark.parametrize('roll, expected', [
+        (0.05, ('fold', 0)),
+        (0.2, ('raise', 80)),
+        (0.5, ('call', 0)),
+    ])
+    def test_facing_bet(self, roll, expected):
+        """ベットに直面した場合の選択テスト"""
+        valid_actions = {
+            'fold': {},
+            'call': {'amount': 40},
+            'raise': {'min': 80, 'max': 960},
+            'all_in': {'amount': 960},
+        }
+        assert decide_action(valid_actions, FixedRandom(roll)) == expected
+
+    def test_always_valid(self):
+        """選んだアクションが常に有効なアクションに含まれるテスト"""
+        rng = random.Random(0)
+        valid_actions = {'fold': {}, 'all_in': {'amount': 30}}
+        for _ in range(100):
+            action, _ = decide_action(valid_actions, rng)
+            assert action in valid_actions
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBotEndpoints:
+    """AIプレイヤーの着席とスケジューラからの行動に関するテスト（API経由）"""
+
+    @pytest.fixture
+    def db_table(self, monkeypatch):
+        # 既定ではスケジューラに行動させず、テストから _run_bot_turn を直接呼ぶ
+        monkeypatch.setattr(table_manager, 'BOT_THINK_SECONDS', 60)
+        table = PokerTable.objects.create(name='Bot Table', auto_start=False)
+        yield table
+        table_manager.remove_table(table.id)
+
+    @pytest.fixture
+    def client(self, db_table):
+        """人間を席1、AIプレイヤー（Bot）を席2に座らせたクライアント"""
+        client = APIClient()
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'seat_number': 1, 'username': 'Player1'}, format='json',
+        )
+        assert response.status_code == 201
+        response = client.post(f'/api/poker/tables/{db_table.id}/add-bot/', {'username': 'Bot'}, format='json')
+        assert response.status_code == 201
+        return client
+
+    def _start(self, client, db_table):
+        """人間のトークンでハンドを開始し、そのトークンを返す"""
+        token = TablePlayer.objects.get(table=db_table, username='Player1').token
+        response = client.post(f'/api/poker/tables/{db_table.id}/start/', HTTP_X_PLAYER_TOKEN=token)
+        assert response.status_code == 200
+        return token
+
+    def _start_until_bot_turn(self, client, db_table):
+        """ハンドを開始し、人間の手番ならコールしてAIプレイヤーの手番にする"""
+        self._start(client, db_table)
+        table = table_manager.get_table(db_table.id)
+        if table.get_state().current_player_id != 'Bot':
+            table_manager.apply_action(db_table.id, db_table, 'Player1', 'call')
+        assert table.get_state().current_player_id == 'Bot'
+        return table
+
+    def test_add_bot(self, db_table):
+        """席を省略すると空席に自動命名のAIプレイヤーが座るテスト"""
+        client = APIClient()
+        response = client.post(f'/api/poker/tables/{db_table.id}/add-bot/', {}, format='json')
+        assert response.status_code == 201
+        player = response.data['player']
+        assert player['seat_number'] == 1
+        assert player['username'].startswith('AI_1_')
+        assert TablePlayer.objects.get(table=db_table, username=player['username']).is_bot
+        assert table_manager.get_player_info_by_username(db_table.id, player['username']).is_bot
+        assert not table_manager._seat_maps[db_table.id].is_free(1)
+
+    def test_add_bot_seat_taken(self, db_table, client):
+        """埋まっている席へのAIプレイヤー追加は400になるテスト"""
+        response = APIClient().post(f'/api/poker/tables/{db_table.id}/add-bot/', {'seat_number': 1}, format='json')
+        assert response.status_code == 400
+
+    def test_scheduled_bot_turn_advances_hand(self, db_table, client, monkeypatch):
+        """AIプレイヤーの手番はスケジューラが行動してハンドが進むテスト"""
+        monkeypatch.setattr(table_manager, 'BOT_THINK_SECONDS', 0)
+        token = self._start(client, db_table)
+        table = table_manager.get_table(db_table.id)
+
+        deadline = time.monotonic() + TIMEOUT
+        bot_acted = ActionLog.objects.filter(player__username='Bot', action__in=BOT_ACTIONS)
+        while not bot_acted.exists() and time.monotonic() < deadline:
+            with table_manager.table_lock(db_table.id):
+                state = table.get_state(viewer_player_id='Player1')
+                valid = get_valid_actions_dict(state, 'Player1') if state.current_player_id == 'Player1' else {}
+            if valid:
+                response = client.post(
+                    f'/api/poker/tables/{db_table.id}/action/',
+                    {'action': 'check' if 'check' in valid else 'call'},
+                    format='json', HTTP_X_PLAYER_TOKEN=token,
+                )
+                assert response.status_code == 200
+            time.sleep(0.05)
+
+        assert bot_acted.exists()
+
+    def test_invalid_bot_action_falls_back(self, db_table, client, monkeypatch):
+        """戦略が無効なアクションを選んでもフォールドなどで手番を進めるテスト"""
+        monkeypatch.setattr('poker.services.table_manager.decide_action', lambda valid_actions: ('raise', 10 ** 9))
+        table = self._start_until_bot_turn(client, db_table)
+
+        table_manager._run_bot_turn(db_table.id)
+        assert table.get_state().current_player_id != 'Bot'
+        assert table_manager.get_player_info_by_username(db_table.id, 'Bot') is not None
+
+    def test_stuck_bot_is_removed(self, db_table, client, monkeypatch):
+        """どのアクションも通らないAIプレイヤーは退席させるテスト"""
+        self._start_until_bot_turn(client, db_table)
+
+        def failing_action(*args, **kwargs):
+            raise PokerError('rejected')
+
+        monkeypatch.setattr(table_manager, 'apply_action', failing_action)
+        table_manager._run_bot_turn(db_table.id)
+        assert table_manager.get_player_info_by_username(db_table.id, 'Bot') is None
+        assert table_manager._seat_maps[db_table.id].is_free(2)
+        assert not TablePlayer.objects.get(table=db_table, username='Bot').is_active
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from poker.services.card_codec import (
+    CODE_TO_DICT, CODE_TO_DISPLAY, card_code, code_to_display, codes_to_mask,
+    display_to_code, mask_to_codes, masks_to_display, rank_of, suit_of,
+)
+
+
+def _domain_card(rank_value, suit_value):
+    """poker_domain の Card と同じ形（rank.value, suit.value）のオブジェクト"""
+    return SimpleNamespace(rank=SimpleNamespace(value=rank_value), suit=SimpleNamespace(value=suit_value))
+
+
+class TestCardCodec:
+    """カードコード変換に関するテスト"""
+
+    def test_round_trip(self):
+        """52枚すべてが表記とコードで相互に変換できるテスト"""
+        assert len(set(CODE_TO_DISPLAY)) == 52
+        for code in range(52):
+            assert display_to_code(code_to_display(code)) == code
+            assert CODE_TO_DICT[code]['display'] == code_to_display(code)
+
+    def test_domain_card(self):
+        """ドメインのカードが表記と同じコードになるテスト"""
+        assert card_code(_domain_card(2, 'clubs')) == display_to_code('2c') == 0
+        assert card_code(_domain_card(14, 'spades')) == display_to_code('As') == 51
+        assert CODE_TO_DICT[card_code(_domain_card(10, 'hearts'))] == {'rank': 'T', 'suit': 'h', 'display': 'Th'}
+
+    def test_rank_and_suit(self):
+        """コードからランク番号とスート番号を取り出せるテスト"""
+        code = display_to_code('Kd')
+        assert (rank_of(code), suit_of(code)) == (11, 1)
+
+    def test_mask(self):
+        """マスクとコードの並びを相互に変換できるテスト"""
+        codes = [display_to_code(c) for c in ('As', '2c', 'Th')]
+        mask = codes_to_mask(codes)
+        assert mask < 1 << 52
+        assert mask_to_codes(mask) == sorted(codes)
+
+    def test_masks_to_display(self):
+        """席ごとのマスクが表記の並びになるテスト"""
+        masks = {'1': codes_to_mask(display_to_code(c) for c in ('As', '2c')), '4': 0}
+        assert masks_to_display(masks) == {'1': ['2c', 'As'], '4': []}
+        assert mask_to_codes(0) == []
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+
+import pytest
+from django.db import IntegrityError
+
+from poker.models import GameHand, PokerTable
+from poker.services.db_writer import DBWriter
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+TIMEOUT = 5
+
+
+@pytest.fixture(autouse=True)
+def threaded_db_writes(settings):
+    """ライタースレッドを使う（conftest の inline_db_writes を上書き）"""
+    settings.POKER_DB_WRITER = True
+
+
+class RecordingWriter(DBWriter):
+    """1トランザクションにまとめた件数を記録するライター"""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def _next_batch(self):
+        batch = super()._next_batch()
+        self.batch_sizes.append(len(batch))
+        return batch
+
+
+class TestDBWriter:
+    """DBライタースレッドに関するテスト"""
+
+    def test_batches_queued_writes(self):
+        """書き込み中に溜まった書き込みを次の1トランザクションにまとめるテスト"""
+        writer = RecordingWriter()
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_write():
+            started.set()
+            release.wait(TIMEOUT)
+            return PokerTable.objects.create(name='first').id
+
+        first = writer.submit(blocking_write)
+        assert started.wait(TIMEOUT)
+        rest = [writer.submit(lambda i=i: PokerTable.objects.create(name=f'queued {i}').id) for i in range(3)]
+        release.set()
+
+        ids = [future.result(TIMEOUT) for future in [first] + rest]
+        assert writer.batch_sizes[:2] == [1, 3]
+        assert PokerTable.objects.filter(id__in=ids).count() == 4
+
+    def test_failed_write_rolls_back_alone(self):
+        """失敗した書き込みだけがセーブポイントで巻き戻り、同じバッチの他の書き込みはコミットされるテスト"""
+        table = PokerTable.objects.create(name='Writer Table')
+        writer = DBWriter()
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_write():
+            started.set()
+            release.wait(TIMEOUT)
+
+        def duplicate_hand():
+            GameHand.objects.create(table=table, hand_number=2, button_seat=1)
+            GameHand.objects.create(table=table, hand_number=1, button_seat=1)
+
+        writer.submit(blocking_write)
+        assert started.wait(TIMEOUT)
+        before = writer.submit(lambda: GameHand.objects.create(table=table, hand_number=1, button_seat=1))
+        failed = writer.submit(duplicate_hand)
+        after = writer.submit(lambda: GameHand.objects.create(table=table, hand_number=3, button_seat=1))
+        release.set()
+
+        before.result(TIMEOUT)
+        after.result(TIMEOUT)
+        assert isinstance(failed.exception(TIMEOUT), IntegrityError)
+        # 失敗した書き込みの途中まで（hand_number=2）も巻き戻る
+        assert sorted(GameHand.objects.filter(table=table).values_list('hand_number', flat=True)) == [1, 3]
+
+    def test_call_reraises(self):
+        """call() は書き込みの例外を呼び出し元に送出するテスト"""
+        def failing_write():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError, match='boom'):
+            DBWriter().call(failing_write)
+
+    def test_failed_submit_is_logged(self, caplog):
+        """結果を待たない書き込みの失敗がログに残るテスト"""
+        def failing_write():
+            raise ValueError('boom')
+
+        def logged():
+            return any(record.exc_info and record.exc_info[0] is ValueError for record in caplog.records)
+
+        with caplog.at_level(logging.ERROR, logger='poker.services.db_writer'):
+            DBWriter().submit(failing_write).exception(TIMEOUT)
+            # ログは Future の完了後にライタースレッドのコールバックで出る
+            deadline = time.monotonic() + TIMEOUT
+            while not logged() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert logged()
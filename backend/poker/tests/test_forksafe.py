@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pytest
+
+from poker import forksafe
+from poker.services.scheduler import TaskScheduler
+
+
+class Holder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rlock = threading.RLock()
+        self.cond = threading.Condition()
+        self.after_fork_calls = 0
+        forksafe.register(self)
+
+    def _after_fork(self):
+        self.after_fork_calls += 1
+
+
+class TestForkSafe:
+    """fork 後の再初期化に関するテスト"""
+
+    def test_reinit_replaces_locks(self):
+        """保持中のロックが新しいロックに置き換わり、_after_fork が呼ばれるテスト"""
+        holder = Holder()
+        holder.lock.acquire()
+        old_rlock = holder.rlock
+
+        forksafe.reinit(holder)
+
+        assert holder.lock.acquire(blocking=False)
+        assert holder.rlock is not old_rlock
+        assert isinstance(holder.cond, threading.Condition)
+        assert holder.after_fork_calls == 1
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork が使えない環境')
+    def test_lock_held_at_fork_is_usable_in_child(self):
+        """fork 時に別スレッドが持っていたロックを子プロセスで取得できるテスト"""
+        holder = Holder()
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with holder.lock:
+                acquired.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        acquired.wait()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                os._exit(0 if holder.lock.acquire(timeout=1) else 1)
+            _, status = os.waitpid(pid, 0)
+        finally:
+            release.set()
+            thread.join()
+        assert os.WEXITSTATUS(status) == 0
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork が使えない環境')
+    def test_scheduler_runs_pending_tasks_in_child(self):
+        """fork 前に予定したタスクが子プロセスのスケジューラスレッドで実行されるテスト"""
+        scheduler = TaskScheduler(name='forksafe-test')
+        done = threading.Event()
+        scheduler.schedule(0.2, 'task', done.set)
+
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if done.wait(2) else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
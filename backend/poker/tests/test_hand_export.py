@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, GameHand, PokerTable, TablePlayer
+from poker.services.card_codec import codes_to_mask, display_to_code
+from poker.services.hand_export import export_hands, filter_hands, iter_hand_records
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def hands():
+    """2テーブル x 3ハンド、各ハンドに3アクション"""
+    result = []
+    for name in ('Table A', 'Table B'):
+        table = PokerTable.objects.create(name=name)
+        player = TablePlayer.objects.create(table=table, username='Player1', seat_number=1, chips=1000)
+        for hand_number in range(1, 4):
+            hand = GameHand.objects.create(table=table, hand_number=hand_number, button_seat=1)
+            ActionLog.objects.create(table=table, hand=hand, action='deal')
+            ActionLog.objects.create(table=table, hand=hand, player=player, action='call', amount=20)
+            ActionLog.objects.create(table=table, hand=hand, player=player, action='win', amount=40)
+            result.append(hand)
+    return result
+
+
+def _read(chunks):
+    return [json.loads(line) for line in b''.join(chunks).splitlines()]
+
+
+class TestIterHandRecords:
+    """ハンドとアクションの結合に関するテスト"""
+
+    def test_actions_grouped_per_hand(self, hands):
+        """各ハンドに自分のアクションだけが順番通りに付くテスト"""
+        records = list(iter_hand_records(filter_hands(), chunk_size=2))
+        assert [r['id'] for r in records] == [h.id for h in hands]
+        for record in records:
+            assert [a['action'] for a in record['actions']] == ['deal', 'call', 'win']
+            assert record['actions'][0]['player'] is None
+            assert record['actions'][1]['player'] == 'Player1'
+
+    def test_hand_without_actions(self, hands):
+        """アクションのないハンドも空リストで出力されるテスト"""
+        hands[0].actions.all().delete()
+        records = list(iter_hand_records(filter_hands()))
+        assert records[0]['actions'] == []
+        assert len(records[1]['actions']) == 3
+
+    def test_filters(self, hands):
+        """テーブル・ハンド番号・時刻で絞り込めるテスト"""
+        table_id = hands[0].table_id
+        records = list(iter_hand_records(filter_hands(table_id=table_id, hand_from=2, hand_to=3)))
+        assert [(r['table_id'], r['hand_number']) for r in records] == [(table_id, 2), (table_id, 3)]
+
+        future = timezone.now() + timedelta(hours=1)
+        assert list(iter_hand_records(filter_hands(since=future))) == []
+
+    def test_hole_cards(self, hands):
+        """終了したハンドだけホールカードが表記で出力されるテスト"""
+        mask = codes_to_mask(display_to_code(c) for c in ('As', 'Kd'))
+        GameHand.objects.filter(id__in=[hands[0].id, hands[1].id]).update(hole_cards={'1': mask})
+        GameHand.objects.filter(id=hands[0].id).update(finished_at=timezone.now())
+
+        records = list(iter_hand_records(filter_hands()))
+        assert records[0]['hole_cards'] == {'1': ['Kd', 'As']}
+        assert records[1]['hole_cards'] == {}
+
+
+class TestExportEndpoint:
+    """エクスポートAPIに関するテスト"""
+
+    def test_ndjson_stream(self, hands):
+        """NDJSONがストリームで返るテスト"""
+        response = APIClient().get('/api/poker/hands/export/', {'table': hands[0].table_id})
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = _read(response.streaming_content)
+        assert [r['hand_number'] for r in records] == [1, 2, 3]
+
+    def test_gzip(self, hands):
+        """gzip指定で圧縮されたNDJSONが返るテスト"""
+        response = APIClient().get('/api/poker/hands/export/', {'gzip': 'true'})
+        assert response.status_code == 200
+        records = _read([gzip.decompress(b''.join(response.streaming_content))])
+        assert len(records) == 6
+
+    def test_invalid_range(self, hands):
+        """不正な絞り込み条件は400を返すテスト"""
+        response = APIClient().get('/api/poker/hands/export/', {'hand_from': 'abc'})
+        assert response.status_code == 400
+
+    def test_export_hands_matches_gzip(self, hands):
+        """圧縮あり・なしで同じ内容になるテスト"""
+        plain = b''.join(export_hands())
+        compressed = b''.join(export_hands(compress=True))
+        assert gzip.decompress(compressed) == plain
@@ -0,0 +1,138 @@
+import gzip
+import json
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+
+from config.middleware import CompressionMiddleware, choose_coding, make_etag, not_modified
+from poker.models import PokerTable
+from poker.services.table_manager import table_manager
+
+BODY = json.dumps({'players': [{'username': f'Player{i}', 'chips': 1000} for i in range(50)]}).encode()
+
+
+def _middleware(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+class TestCompressionMiddleware:
+    """応答の圧縮に関するテスト"""
+
+    def test_compresses_json(self, settings):
+        """閾値以上のJSONを gzip で圧縮し、強いETagに符号化方式を付けるテスト"""
+        settings.API_COMPRESS_MIN_BYTES = 100
+        response = HttpResponse(BODY, content_type='application/json')
+        response['ETag'] = make_etag('state', 1, 2)
+        request = RequestFactory().get('/api/poker/tables/1/state/', HTTP_ACCEPT_ENCODING='gzip')
+
+        result = _middleware(response)(request)
+        assert result['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(result.content) == BODY
+        assert result['ETag'] == '"state.1.2-gzip"'
+        assert 'Accept-Encoding' in result['Vary']
+
+    def test_skips_small_and_encoded(self, settings):
+        """閾値未満・圧縮済み・application/gzip・ストリーミングは圧縮しないテスト"""
+        settings.API_COMPRESS_MIN_BYTES = len(BODY) + 1
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        small = _middleware(HttpResponse(BODY, content_type='application/json'))(request)
+        assert not small.has_header('Content-Encoding')
+
+        settings.API_COMPRESS_MIN_BYTES = 100
+        export = _middleware(HttpResponse(gzip.compress(BODY), content_type='application/gzip'))(request)
+        assert not export.has_header('Content-Encoding')
+        stream = _middleware(StreamingHttpResponse(iter([BODY]), content_type='application/x-ndjson'))(request)
+        assert not stream.has_header('Content-Encoding')
+
+    def test_choose_coding(self):
+        """Accept-Encoding の q=0 は受け付けないものとして扱うテスト"""
+        assert choose_coding('gzip, deflate') == 'gzip'
+        assert choose_coding('gzip;q=0, deflate') is None
+        assert choose_coding('') is None
+
+    def test_not_modified_ignores_coding(self):
+        """If-None-Match の符号化方式の付加部分を除いて比べるテスト"""
+        etag = make_etag('todo', 1, 5)
+        factory = RequestFactory()
+        assert not_modified(factory.get('/', HTTP_IF_NONE_MATCH='"todo.1.5-gzip"'), etag) == '"todo.1.5-gzip"'
+        assert not_modified(factory.get('/', HTTP_IF_NONE_MATCH='"x", W/"todo.1.5"'), etag) == 'W/"todo.1.5"'
+        assert not_modified(factory.get('/', HTTP_IF_NONE_MATCH='"todo.1.4"'), etag) is None
+
+
+@pytest.mark.django_db
+class TestStateETag:
+    """state の ETag と 304 に関するテスト"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='ETag Table')
+        yield table
+        table_manager.remove_table(table.id)
+
+    def test_public_state(self, db_table):
+        """観戦の state は変更がなければ 304、変更後は新しいETagで 200 を返すテスト"""
+        client = APIClient()
+        url = f'/api/poker/tables/{db_table.id}/state/'
+        client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        first = client.get(url)
+        etag = first['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': 'Player2', 'seat_number': 2},
+            format='json',
+        )
+        changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert changed['ETag'] != etag
+
+    def test_player_state(self, db_table):
+        """トークン付きの state は見る人ごとにETagが変わり、同じ人なら 304 を返すテスト"""
+        client = APIClient()
+        tokens = [
+            client.post(
+                f'/api/poker/tables/{db_table.id}/join/',
+                {'username': f'Player{seat}', 'seat_number': seat},
+                format='json',
+            ).data['token']
+            for seat in (1, 2)
+        ]
+        url = f'/api/poker/tables/{db_table.id}/state/'
+        first = client.get(url, HTTP_X_PLAYER_TOKEN=tokens[0])
+        other = client.get(url, HTTP_X_PLAYER_TOKEN=tokens[1])
+        assert first['ETag'] != other['ETag']
+
+        response = client.get(url, HTTP_X_PLAYER_TOKEN=tokens[0], HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        assert response['ETag'] == first['ETag']
+
+    @pytest.mark.parametrize('accept_encoding, gzipped', [
+        ('gzip, deflate', True),
+        ('gzip;q=0, deflate', False),
+        ('deflate', False),
+    ])
+    def test_public_state_gzip(self, db_table, settings, accept_encoding, gzipped):
+        """観戦の共有 gzip は Accept-Encoding が gzip を受け付けるときだけ返すテスト"""
+        settings.API_COMPRESS_MIN_BYTES = 10 ** 6
+        client = APIClient()
+        client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        response = client.get(f'/api/poker/tables/{db_table.id}/state/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        assert response.status_code == 200
+        body = response.content
+        if gzipped:
+            assert response['Content-Encoding'] == 'gzip'
+            body = gzip.decompress(body)
+        else:
+            assert not response.has_header('Content-Encoding')
+        assert json.loads(body)['name'] == 'ETag Table'
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable, TablePlayer
+from poker.services.presence import PresenceTracker
+from poker.services.table_manager import table_manager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """最終アクセス時刻の記録に使う時計を差し替える"""
+    fake = FakeClock()
+    monkeypatch.setattr('poker.services.presence.time', SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def seated_table(db, settings, clock):
+    """2人が着席したテーブル"""
+    settings.POKER_IDLE_SECONDS = 60
+    db_table = PokerTable.objects.create(name='Idle Table')
+    client = APIClient()
+    tokens = {}
+    for seat, username in ((1, 'Alice'), (2, 'Bob')):
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': username, 'seat_number': seat},
+            format='json',
+        )
+        tokens[username] = response.data['token']
+    yield db_table, tokens
+    table_manager.remove_table(db_table.id)
+
+
+class TestPresenceTracker:
+    """最終アクセス時刻の追跡に関するテスト"""
+
+    def test_expired(self):
+        """最終アクセスが古いトークンだけ取り出され、取り出した後は追跡しないテスト"""
+        tracker = PresenceTracker()
+        tracker.track('a', now=10)
+        tracker.track('b', now=20)
+        tracker.touch('a', now=40)
+
+        assert tracker.expired(30) == [('b', 20)]
+        assert tracker.expired(30) == []
+        assert len(tracker) == 1
+        assert tracker.expired(40) == [('a', 40)]
+        assert len(tracker) == 0
+
+    def test_forget_and_unknown_token(self):
+        """forget したトークンは取り出されず、未登録トークンの touch は無視されるテスト"""
+        tracker = PresenceTracker()
+        tracker.track('a', now=10)
+        tracker.forget('a')
+        tracker.touch('unknown', now=10)
+        assert tracker.expired(100) == []
+        assert tracker.last_seen('unknown') is None
+
+
+class TestIdleReaper:
+    """無応答プレイヤーの自動退席に関するテスト"""
+
+    def test_idle_player_removed(self, seated_table, clock):
+        """リクエストのないプレイヤーだけ退席し、DBもまとめて非アクティブになるテスト"""
+        db_table, tokens = seated_table
+        clock.now += 50
+        response = APIClient().get(
+            f'/api/poker/tables/{db_table.id}/state/', HTTP_X_PLAYER_TOKEN=tokens['Bob'],
+        )
+        assert response.status_code == 200
+
+        clock.now += 30
+        removed = table_manager.reap_idle(now=clock.now)
+
+        assert removed == [(db_table.id, 'Alice')]
+        assert list(
+            TablePlayer.objects.filter(table=db_table, is_active=True).values_list('username', flat=True)
+        ) == ['Bob']
+        assert 1 in table_manager.free_seats(db_table.id)
+        assert table_manager.get_player_info_by_token(db_table.id, tokens['Alice']) is None
+        state = table_manager.get_table(db_table.id).get_state()
+        assert [p.player_id for p in state.players] == ['Bob']
+
+    def test_idle_player_folded_during_hand(self, seated_table, clock):
+        """ハンド中は手番でフォールドさせ、ハンドが終わってから退席させるテスト"""
+        db_table, tokens = seated_table
+        client = APIClient()
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/start/', HTTP_X_PLAYER_TOKEN=tokens['Bob'],
+        )
+        assert response.status_code == 200
+        table = table_manager.get_table(db_table.id)
+        idle = table.get_state().current_player_id
+        active = 'Bob' if idle == 'Alice' else 'Alice'
+
+        clock.now += 61
+        table_manager.touch(tokens[active])
+        removed = table_manager.reap_idle(now=clock.now)
+
+        # 2人なのでフォールドでハンドが終わり、そのまま退席する
+        assert removed == [(db_table.id, idle)]
+        assert [p.player_id for p in table.get_state().players] == [active]
+
+    def test_leave_stops_tracking(self, seated_table, clock):
+        """退出したプレイヤーは見回りの対象から外れるテスト"""
+        db_table, tokens = seated_table
+        response = APIClient().post(
+            f'/api/poker/tables/{db_table.id}/leave/', HTTP_X_PLAYER_TOKEN=tokens['Alice'],
+        )
+        assert response.status_code == 200
+
+        clock.now += 61
+        assert table_manager.reap_idle(now=clock.now) == [(db_table.id, 'Bob')]
+
+    def test_disabled(self, seated_table, settings, clock):
+        """POKER_IDLE_SECONDS が0なら誰も退席させないテスト"""
+        db_table, tokens = seated_table
+        settings.POKER_IDLE_SECONDS = 0
+        assert table_manager.reap_idle(now=clock.now + 3600) == []
+        assert TablePlayer.objects.filter(table=db_table, is_active=True).count() == 2
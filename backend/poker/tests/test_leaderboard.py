@@ -0,0 +1,111 @@
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable, TablePlayer
+from poker.services.leaderboard import Leaderboard
+from poker.services.table_manager import table_manager
+
+
+class TestLeaderboard:
+    """チップリーダーボードに関するテスト"""
+
+    def test_top_and_rank(self):
+        """チップの多い順に並び、同じチップ数は同順位になるテスト"""
+        board = Leaderboard()
+        board.update(1, 'Alice', 1500)
+        board.update(1, 'Bob', 800)
+        board.update(2, 'Carol', 1500)
+        board.update(2, 'Dave', 300)
+
+        assert board.top(3) == [
+            {'rank': 1, 'username': 'Alice', 'chips': 1500},
+            {'rank': 1, 'username': 'Carol', 'chips': 1500},
+            {'rank': 3, 'username': 'Bob', 'chips': 800},
+        ]
+        assert board.rank('Dave') == {'rank': 4, 'username': 'Dave', 'chips': 300}
+        assert board.rank('Eve') is None
+
+    def test_incremental_update(self):
+        """チップ更新で順位が入れ替わるテスト"""
+        board = Leaderboard()
+        board.update(1, 'Alice', 1000)
+        board.update(1, 'Bob', 1000)
+        board.update(1, 'Bob', 1200)
+        board.update(1, 'Alice', 800)
+        assert [e['username'] for e in board.top(10)] == ['Bob', 'Alice']
+        assert len(board) == 2
+
+    def test_multiple_tables_are_summed(self):
+        """同じユーザー名の複数テーブル分は合計されるテスト"""
+        board = Leaderboard()
+        board.update(1, 'Alice', 1000)
+        board.update(2, 'Alice', 500)
+        assert board.rank('Alice')['chips'] == 1500
+
+        board.remove(1, 'Alice')
+        assert board.rank('Alice')['chips'] == 500
+        board.remove(2, 'Alice')
+        assert board.rank('Alice') is None
+        assert len(board) == 0
+
+    def test_remove_table(self):
+        """テーブル削除でそのテーブルの分だけ外れるテスト"""
+        board = Leaderboard()
+        board.update(1, 'Alice', 1000)
+        board.update(1, 'Bob', 700)
+        board.update(2, 'Alice', 200)
+        board.remove_table(1)
+        assert board.top(10) == [{'rank': 1, 'username': 'Alice', 'chips': 200}]
+
+    def test_seed_keeps_live_values(self):
+        """再構築ではメモリ上の値を上書きしないテスト"""
+        board = Leaderboard()
+        board.update(1, 'Alice', 1300)
+        board.seed([(1, 'Alice', 1000), (2, 'Bob', 900)])
+        assert board.rank('Alice')['chips'] == 1300
+        assert board.rank('Bob')['chips'] == 900
+
+
+@pytest.mark.django_db
+class TestLeaderboardEndpoint:
+    """リーダーボードAPIに関するテスト"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Leaderboard Table', initial_chips=1000)
+        yield table
+        table_manager.remove_table(table.id)
+
+    def test_joined_players_listed(self, db_table):
+        """着席したプレイヤーが順位に載り、退出すると外れるテスト"""
+        client = APIClient()
+        tokens = {}
+        for seat_number, username in ((1, 'Player1'), (2, 'Player2')):
+            response = client.post(
+                f'/api/poker/tables/{db_table.id}/join/',
+                {'username': username, 'seat_number': seat_number},
+                format='json',
+            )
+            tokens[username] = response.data['token']
+
+        response = client.get('/api/poker/leaderboard/', {'username': 'Player2'})
+        assert response.status_code == 200
+        assert {e['username'] for e in response.data['top']} >= {'Player1', 'Player2'}
+        assert response.data['me']['chips'] == 1000
+
+        client.post(f'/api/poker/tables/{db_table.id}/leave/', HTTP_X_PLAYER_TOKEN=tokens['Player2'])
+        response = client.get('/api/poker/leaderboard/', {'username': 'Player2'})
+        assert response.data['me'] is None
+
+    def test_seeded_from_db(self, db_table):
+        """メモリに載っていないテーブルの着席者もDBから読み込まれるテスト"""
+        TablePlayer.objects.create(table=db_table, username='Sleeper', seat_number=3, chips=5000)
+        table_manager._leaderboard_seeded = False
+
+        response = APIClient().get('/api/poker/leaderboard/', {'username': 'Sleeper'})
+        assert response.data['me']['chips'] == 5000
+
+    def test_invalid_limit(self):
+        """limit が範囲外なら400を返すテスト"""
+        response = APIClient().get('/api/poker/leaderboard/', {'limit': 0})
+        assert response.status_code == 400
@@ -0,0 +1,140 @@
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable, TablePlayer
+from poker.services.matchmaking import SeatIndex
+from poker.services.table_manager import table_manager
+
+# 他のテストのテーブルと混ざらないステークス
+BIG_BLIND = 2000
+
+
+class TestSeatIndex:
+    """クイックシート用の索引に関するテスト"""
+
+    def test_fullest_table_first(self):
+        """空席の少ないバケットから選ぶテスト"""
+        index = SeatIndex()
+        index.update(1, 20, 5)
+        index.update(2, 20, 2)
+        index.update(3, 20, 4)
+        assert index.best_table(20) == 2
+
+    def test_full_and_other_stakes_ignored(self):
+        """満席のテーブルと別ステークスのテーブルは選ばないテスト"""
+        index = SeatIndex()
+        index.update(1, 20, 0)
+        index.update(2, 40, 1)
+        assert index.best_table(20) is None
+        assert index.best_table(40) == 2
+        assert index.best_table(100) is None
+
+    def test_update_moves_bucket(self):
+        """update で空席数が変わると別のバケットへ移るテスト"""
+        index = SeatIndex()
+        index.update(1, 20, 3)
+        index.update(2, 20, 2)
+        index.update(1, 20, 1)
+        assert index.best_table(20) == 1
+        index.update(1, 20, 0)
+        assert index.best_table(20) == 2
+
+    def test_remove(self):
+        """remove したテーブルは選ばれず、空のバケットも残らないテスト"""
+        index = SeatIndex()
+        index.update(1, 20, 2)
+        index.update(2, 20, 4)
+        index.remove(1)
+        assert index.best_table(20) == 2
+        index.remove(2)
+        index.remove(2)
+        assert index.best_table(20) is None
+        assert index._buckets[20] == {}
+
+    def test_exclude(self):
+        """exclude のテーブルを飛ばして次に埋まっているものを返すテスト"""
+        index = SeatIndex()
+        index.update(1, 20, 1)
+        index.update(2, 20, 1)
+        index.update(3, 20, 3)
+        assert index.best_table(20, exclude={1, 2}) == 3
+        assert index.best_table(20, exclude={1, 2, 3}) is None
+
+
+@pytest.mark.django_db
+class TestQuickSeat:
+    """クイックシートAPIに関するテスト"""
+
+    @pytest.fixture(autouse=True)
+    def cleanup_tables(self):
+        yield
+        for table_id in PokerTable.objects.values_list('id', flat=True):
+            table_manager.remove_table(table_id)
+
+    @pytest.fixture
+    def client(self):
+        return APIClient()
+
+    def _table(self, client, name, seated):
+        """seated 人が着席した BIG_BLIND のテーブル"""
+        table = PokerTable.objects.create(name=name, small_blind=BIG_BLIND // 2, big_blind=BIG_BLIND)
+        for seat_number, username in enumerate(seated, start=1):
+            response = client.post(
+                f'/api/poker/tables/{table.id}/join/',
+                {'seat_number': seat_number, 'username': username}, format='json',
+            )
+            assert response.status_code == 201
+        return table
+
+    def _quick_seat(self, client, username, big_blind=BIG_BLIND):
+        return client.post('/api/poker/quick-seat/', {'username': username, 'big_blind': big_blind}, format='json')
+
+    def test_fills_fullest_table(self, client):
+        """空席のあるテーブルのうち最も埋まっているものに座るテスト"""
+        self._table(client, 'Few', ['Player1'])
+        many = self._table(client, 'Many', ['Player2', 'Player3', 'Player4'])
+        self._table(client, 'Full', [f'Full{i}' for i in range(6)])
+
+        response = self._quick_seat(client, 'Newcomer')
+        assert response.status_code == 201
+        assert response.data['table_id'] == many.id
+        assert TablePlayer.objects.get(token=response.data['token']).seat_number == 4
+
+    def test_creates_table_when_none_fits(self, client):
+        """条件に合うテーブルがなければ新しく作って座るテスト"""
+        self._table(client, 'Other Stakes', ['Player1'])
+
+        response = self._quick_seat(client, 'Newcomer', big_blind=BIG_BLIND * 2)
+        assert response.status_code == 201
+        table = PokerTable.objects.get(id=response.data['table_id'])
+        assert table.big_blind == BIG_BLIND * 2
+        assert table.auto_start
+        assert table_manager.free_seats(table.id) == [2, 3, 4, 5, 6]
+
+    def test_retries_when_username_taken(self, client):
+        """最も埋まったテーブルに同名のプレイヤーがいれば次のテーブルに座るテスト"""
+        few = self._table(client, 'Few', ['Player1'])
+        self._table(client, 'Many', ['Player2', 'Player3', 'Newcomer'])
+
+        response = self._quick_seat(client, 'Newcomer')
+        assert response.status_code == 201
+        assert response.data['table_id'] == few.id
+
+    def test_retries_when_seat_taken(self, client, monkeypatch):
+        """席を同時参加に取られたら別のテーブルで再試行するテスト"""
+        few = self._table(client, 'Few', ['Player1'])
+        self._table(client, 'Many', ['Player2', 'Player3'])
+        reserve_seat = table_manager.reserve_seat
+        calls = []
+
+        def racing_reserve(table_id, username, seat_number):
+            calls.append(table_id)
+            if len(calls) == 1:
+                return 'Seat already taken'
+            return reserve_seat(table_id, username, seat_number)
+
+        monkeypatch.setattr(table_manager, 'reserve_seat', racing_reserve)
+        response = self._quick_seat(client, 'Newcomer')
+        assert response.status_code == 201
+        assert response.data['table_id'] == few.id
+        assert len(calls) == 2
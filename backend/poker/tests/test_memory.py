@@ -0,0 +1,106 @@
+import sys
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable
+from poker.services.memory import SnapshotStore, approx_size
+from poker.services.table_manager import table_manager
+
+
+class TestApproxSize:
+    """概算バイト数に関するテスト"""
+
+    def test_nested_containers(self):
+        """コンテナの中身まで数え、同じオブジェクトは1回だけ数えるテスト"""
+        shared = 'x' * 1000
+        value = {'a': [shared, shared], 'b': (shared,)}
+        expected = (
+            sys.getsizeof(value) + sys.getsizeof('a') + sys.getsizeof('b')
+            + sys.getsizeof(value['a']) + sys.getsizeof(value['b']) + sys.getsizeof(shared)
+        )
+        assert approx_size(value) == expected
+
+    def test_seen_is_shared_between_calls(self):
+        """seen を渡すと、前に数えたオブジェクトは数えないテスト"""
+        shared = [1, 2, 3]
+        seen = set()
+        first = approx_size({'x': shared}, seen)
+        second = approx_size({'y': shared}, seen)
+        assert second < first
+
+
+class TestSnapshotStore:
+    """tracemalloc スナップショットに関するテスト"""
+
+    def test_diff_finds_growth(self):
+        """2時点の差分で、増えた割り当て箇所が上位に出るテスト"""
+        store = SnapshotStore()
+        try:
+            base = store.take()
+            grown = [bytearray(1024) for _ in range(200)]  # noqa: F841
+            store.take()
+
+            diff = store.diff(base['id'], limit=5)
+            assert diff[0]['location'].startswith(__file__)
+            assert diff[0]['size_diff_bytes'] >= 200 * 1024
+            assert [s['id'] for s in store.list()] == [base['id'], base['id'] + 1]
+        finally:
+            store.stop()
+
+    def test_keeps_latest_snapshots(self):
+        """直近 MAX_SNAPSHOTS 件だけを保持するテスト"""
+        store = SnapshotStore()
+        try:
+            for _ in range(SnapshotStore.MAX_SNAPSHOTS + 2):
+                store.take()
+            assert len(store.list()) == SnapshotStore.MAX_SNAPSHOTS
+            assert store.diff(1) is None
+        finally:
+            store.stop()
+
+
+@pytest.mark.django_db
+class TestMemoryEndpoints:
+    """メモリのデバッグAPIに関するテスト"""
+
+    def test_disabled_by_default(self, settings):
+        """POKER_DEBUG_ENDPOINTS が無効なら404を返すテスト"""
+        settings.POKER_DEBUG_ENDPOINTS = False
+        assert APIClient().get('/api/poker/debug/memory/').status_code == 404
+
+    def test_memory_report(self, settings):
+        """メモリ上のテーブルごとの内訳を返すテスト"""
+        settings.POKER_DEBUG_ENDPOINTS = True
+        db_table = PokerTable.objects.create(name='Memory Table')
+        client = APIClient()
+        client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        try:
+            response = client.get('/api/poker/debug/memory/')
+        finally:
+            table_manager.remove_table(db_table.id)
+
+        assert response.status_code == 200
+        entry = next(t for t in response.data['tables'] if t['table_id'] == db_table.id)
+        assert entry['players'] == 1
+        assert entry['table_bytes'] > 0
+        assert entry['player_info_bytes'] > 0
+        assert entry['total_bytes'] >= entry['table_bytes'] + entry['player_info_bytes']
+
+    def test_snapshots(self, settings):
+        """スナップショットを取って差分を返し、DELETE で止めるテスト"""
+        settings.POKER_DEBUG_ENDPOINTS = True
+        client = APIClient()
+        base = client.post('/api/poker/debug/memory/snapshots/').data
+        client.post('/api/poker/debug/memory/snapshots/')
+
+        response = client.get(f"/api/poker/debug/memory/snapshots/?base={base['id']}&limit=3")
+        assert response.status_code == 200
+        assert len(response.data['diff']) <= 3
+
+        assert client.delete('/api/poker/debug/memory/snapshots/').status_code == 204
+        assert client.get('/api/poker/debug/memory/snapshots/').data == {'snapshots': []}
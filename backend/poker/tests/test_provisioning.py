@@ -0,0 +1,219 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, PokerTable, TablePlayer
+from poker.services.table_manager import table_manager
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def bulk_tables():
+    """API で一括作成した卓のID（インメモリ側も後始末する）"""
+    created = []
+    yield created
+    for table_id in created:
+        table_manager.remove_table(table_id)
+
+
+def _admin_client():
+    """一括作成・終了を使える管理者（is_staff）のクライアント"""
+    admin, _ = User.objects.get_or_create(username='admin', defaults={'is_staff': True})
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def _create(count=5, client=None, **template):
+    return (client or _admin_client()).post('/api/poker/tables/bulk/', {
+        'count': count, 'name_prefix': 'Cup', **template,
+    }, format='json')
+
+
+class TestBulkCreate:
+    """テーブル一括作成に関するテスト"""
+
+    def test_bulk_create_is_single_insert(self, bulk_tables, django_assert_max_num_queries):
+        """件数によらず1回の INSERT（と1トランザクション）で作るテスト"""
+        client = _admin_client()
+        with django_assert_max_num_queries(3):
+            response = _create(count=50, client=client, big_blind=50, small_blind=25)
+        assert response.status_code == 201
+        bulk_tables.extend(response.data['ids'])
+
+        assert response.data['count'] == 50
+        tables = PokerTable.objects.filter(id__in=response.data['ids']).order_by('id')
+        assert [t.name for t in tables[:2]] == ['Cup 1', 'Cup 2']
+        assert {t.big_blind for t in tables} == {50}
+
+    def test_registered_tables_are_joinable(self, bulk_tables):
+        """登録済みの卓はメモリ上にあり、すぐ参加できるテスト"""
+        response = _create(count=2)
+        bulk_tables.extend(response.data['ids'])
+        table_id = response.data['ids'][0]
+        assert table_manager.get_table(table_id) is not None
+        assert table_manager.free_seats(table_id) == [1, 2, 3, 4, 5, 6]
+
+        response = APIClient().post(
+            f'/api/poker/tables/{table_id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        assert response.status_code == 201
+
+    def test_without_register(self, bulk_tables):
+        """register=false ならメモリには載せないテスト"""
+        response = _create(count=2, register=False)
+        bulk_tables.extend(response.data['ids'])
+        assert table_manager.get_table(response.data['ids'][0]) is None
+
+    def test_count_limit(self):
+        """作成数の上限を超えると400を返すテスト"""
+        assert _create(count=501).status_code == 400
+        assert _create(count=0).status_code == 400
+
+
+class TestBulkClose:
+    """テーブル一括終了・削除に関するテスト"""
+
+    def test_close_by_prefix(self, bulk_tables):
+        """接頭辞が一致する卓と着席者を非アクティブにし、メモリから外すテスト"""
+        response = _create(count=3)
+        bulk_tables.extend(response.data['ids'])
+        table_id = response.data['ids'][0]
+        APIClient().post(
+            f'/api/poker/tables/{table_id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        other = PokerTable.objects.create(name='Other')
+
+        response = _admin_client().post('/api/poker/tables/bulk/close/', {'name_prefix': 'Cup'}, format='json')
+        assert response.data == {'closed': 3, 'players_removed': 1}
+        assert not PokerTable.objects.filter(name__startswith='Cup', is_active=True).exists()
+        assert not TablePlayer.objects.filter(is_active=True).exists()
+        assert table_manager.get_table(table_id) is None
+        assert PokerTable.objects.get(id=other.id).is_active
+
+    def test_purge_by_ids(self, bulk_tables):
+        """purge は関連行ごと削除するテスト"""
+        response = _create(count=3)
+        ids = response.data['ids']
+        bulk_tables.extend(ids)
+        ActionLog.objects.create(table_id=ids[0], action='deal')
+
+        response = _admin_client().post(
+            '/api/poker/tables/bulk/close/', {'ids': ids[:2], 'purge': True}, format='json',
+        )
+        assert response.data == {'purged': 2}
+        assert list(PokerTable.objects.values_list('id', flat=True)) == [ids[2]]
+        assert not ActionLog.objects.exists()
+
+    def test_requires_target(self):
+        """対象の指定がなければ400を返すテスト"""
+        response = _admin_client().post('/api/poker/tables/bulk/close/', {}, format='json')
+        assert response.status_code == 400
+
+    def test_requires_admin(self, bulk_tables):
+        """匿名・一般ユーザーは一括作成・終了できず、卓も消えないテスト"""
+        bulk_tables.extend(_create(count=2).data['ids'])
+        user = User.objects.create_user(username='player')
+        member = APIClient()
+        member.force_authenticate(user)
+
+        for client in (APIClient(), member):
+            response = client.post('/api/poker/tables/bulk/', {'count': 2, 'name_prefix': 'Cup'}, format='json')
+            assert response.status_code == 403
+            response = client.post('/api/poker/tables/bulk/close/', {'name_prefix': 'C', 'purge': True}, format='json')
+            assert response.status_code == 403
+        assert PokerTable.objects.filter(name__startswith='Cup', is_active=True).count() == 2
+
+
+class TestProvisionTablesCommand:
+    """provision_tables コマンドに関するテスト"""
+
+    def test_create_and_purge(self):
+        """作成と接頭辞指定での削除"""
+        call_command('provision_tables', 4, prefix='Load', big_blind=40)
+        assert PokerTable.objects.filter(name__startswith='Load', big_blind=40).count() == 4
+
+        call_command('provision_tables', prefix='Load', purge=True)
+        assert not PokerTable.objects.exists()
+
+    def test_close_and_purge_require_prefix(self):
+        """--close / --purge は --prefix を省略するとエラーになり、卓は残るテスト"""
+        call_command('provision_tables', 2)
+        for option in ('close', 'purge'):
+            with pytest.raises(CommandError, match='--prefix'):
+                call_command('provision_tables', **{option: True})
+            with pytest.raises(CommandError, match='--prefix'):
+                call_command('provision_tables', prefix='', **{option: True})
+        assert PokerTable.objects.filter(name__startswith='Table', is_active=True).count() == 2
+
+
+class TestClosedElsewhere:
+    """別プロセス（provision_tables）で終了・削除され、メモリに残った卓に関するテスト"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Closing', small_blind=1500, big_blind=3000)
+        response = APIClient().post(
+            f'/api/poker/tables/{table.id}/join/', {'username': 'Player1', 'seat_number': 1}, format='json',
+        )
+        assert response.status_code == 201
+        self.token = response.data['token']
+        yield table
+        table_manager.remove_table(table.id)
+
+    def _close_in_db(self, db_table):
+        # CLI と同じくDBだけを書き換え、このプロセスのメモリには触れない
+        PokerTable.objects.filter(id=db_table.id).update(is_active=False, status='finished')
+        assert table_manager.get_table(db_table.id) is not None
+
+    def test_join_and_state_rejected(self, db_table):
+        """終了済みの卓への参加と状態取得は404になり、メモリからも外れるテスト"""
+        self._close_in_db(db_table)
+        client = APIClient()
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/join/', {'username': 'Player2', 'seat_number': 2}, format='json',
+        )
+        assert response.status_code == 404
+        assert table_manager.get_table(db_table.id) is None
+
+        response = client.get(f'/api/poker/tables/{db_table.id}/state/', HTTP_X_PLAYER_TOKEN=self.token)
+        assert response.status_code == 404
+        assert table_manager.get_or_create_table(db_table.id) is None
+        assert table_manager.get_table(db_table.id) is None
+
+    def test_public_state_rechecks_db(self, db_table, settings):
+        """観戦の共有応答は確認間隔を過ぎると終了・削除を検出して404にするテスト"""
+        client = APIClient()
+        url = f'/api/poker/tables/{db_table.id}/state/'
+        self._close_in_db(db_table)
+
+        settings.POKER_TABLE_RECHECK_SECONDS = 60
+        assert client.get(url).status_code == 200
+
+        settings.POKER_TABLE_RECHECK_SECONDS = 0
+        assert client.get(url).status_code == 404
+        assert table_manager.get_table(db_table.id) is None
+
+    def test_public_state_after_purge(self, db_table, settings):
+        """削除された卓も観戦の共有応答から外れるテスト"""
+        settings.POKER_TABLE_RECHECK_SECONDS = 0
+        PokerTable.objects.filter(id=db_table.id).delete()
+        assert APIClient().get(f'/api/poker/tables/{db_table.id}/state/').status_code == 404
+        assert table_manager.get_table(db_table.id) is None
+
+    def test_quick_seat_skips_closed(self, db_table):
+        """クイックシートは終了済みの卓を選ばず、新しい卓に座らせるテスト"""
+        self._close_in_db(db_table)
+        response = APIClient().post(
+            '/api/poker/quick-seat/', {'username': 'Player2', 'big_blind': 3000}, format='json',
+        )
+        assert response.status_code == 201
+        assert response.data['table_id'] != db_table.id
+        assert table_manager.get_table(db_table.id) is None
+        table_manager.remove_table(response.data['table_id'])
@@ -0,0 +1,161 @@
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, PokerTable
+from poker.services.table_manager import table_manager
+
+pytestmark = pytest.mark.django_db
+
+# エンドポイントごとのクエリ上限（2人着席のテーブル）
+# sync_to_db はテーブル1件 + 着席プレイヤーごとに1件を更新し、
+# start / action はさらに ActionLog を1回の bulk_create で書き込む
+QUERY_BUDGETS = {
+    'list': 1,
+    'retrieve': 1,
+    'join': 2,
+    'leave': 5,
+    'state': 1,
+    'public_state': 0,
+    'start': 7,
+    'action': 7,
+    'logs': 2,
+    'telemetry': 1,
+}
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def db_table():
+    """テスト用テーブル（インメモリ側も後始末する）"""
+    table = PokerTable.objects.create(name='Budget Table')
+    yield table
+    table_manager.remove_table(table.id)
+
+
+@pytest.fixture
+def tokens(api_client, db_table):
+    """2人着席させてトークンを返す"""
+    result = {}
+    for seat_number, username in ((1, 'Player1'), (2, 'Player2')):
+        response = api_client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': username, 'seat_number': seat_number},
+            format='json',
+        )
+        assert response.status_code == 201
+        result[seat_number] = response.data['token']
+    return result
+
+
+def _auth(token):
+    return {'HTTP_X_PLAYER_TOKEN': token}
+
+
+class TestTableQueryBudget:
+    """テーブル一覧・詳細のクエリ数に関するテスト"""
+
+    def test_list_is_single_query(self, api_client, tokens, django_assert_max_num_queries):
+        """テーブル数が増えても一覧は1クエリで返るテスト"""
+        for i in range(5):
+            PokerTable.objects.create(name=f'Extra {i}')
+        with django_assert_max_num_queries(QUERY_BUDGETS['list']):
+            response = api_client.get('/api/poker/tables/')
+        assert response.status_code == 200
+        counts = {row['name']: row['player_count'] for row in response.data}
+        assert counts['Budget Table'] == 2
+        assert counts['Extra 0'] == 0
+
+    def test_retrieve(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """テーブル詳細のクエリ数のテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['retrieve']):
+            response = api_client.get(f'/api/poker/tables/{db_table.id}/')
+        assert response.status_code == 200
+        assert response.data['player_count'] == 2
+
+
+class TestSeatQueryBudget:
+    """着席・退出のクエリ数に関するテスト"""
+
+    def test_join(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """ロード済みテーブルへの着席のクエリ数のテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['join']):
+            response = api_client.post(
+                f'/api/poker/tables/{db_table.id}/join/',
+                {'username': 'Player3', 'seat_number': 3},
+                format='json',
+            )
+        assert response.status_code == 201
+
+    def test_leave(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """退出のクエリ数のテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['leave']):
+            response = api_client.post(
+                f'/api/poker/tables/{db_table.id}/leave/', **_auth(tokens[1]),
+            )
+        assert response.status_code == 200
+
+
+class TestGameQueryBudget:
+    """ゲーム進行のクエリ数に関するテスト"""
+
+    def test_state(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """プレイヤー視点の状態取得のクエリ数のテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['state']):
+            response = api_client.get(
+                f'/api/poker/tables/{db_table.id}/state/', **_auth(tokens[1]),
+            )
+        assert response.status_code == 200
+
+    def test_public_state(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """観戦者向けの状態取得はDBに触れないテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['public_state']):
+            response = api_client.get(f'/api/poker/tables/{db_table.id}/state/')
+        assert response.status_code == 200
+
+    def test_start(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """ゲーム開始のクエリ数のテスト"""
+        with django_assert_max_num_queries(QUERY_BUDGETS['start']):
+            response = api_client.post(
+                f'/api/poker/tables/{db_table.id}/start/', **_auth(tokens[1]),
+            )
+        assert response.status_code == 200
+
+    def test_action(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """アクション実行（ハンド終了まで）のクエリ数のテスト"""
+        response = api_client.post(
+            f'/api/poker/tables/{db_table.id}/start/', **_auth(tokens[1]),
+        )
+        seat_number = response.data['state']['current_player_seat']
+
+        with django_assert_max_num_queries(QUERY_BUDGETS['action']):
+            response = api_client.post(
+                f'/api/poker/tables/{db_table.id}/action/',
+                {'action': 'fold'},
+                format='json',
+                **_auth(tokens[seat_number]),
+            )
+        assert response.status_code == 200
+
+    def test_logs(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """ログ件数が増えてもクエリ数が変わらないテスト"""
+        player = db_table.table_players.get(seat_number=1)
+        for _ in range(20):
+            ActionLog.objects.create(table=db_table, player=player, action='check')
+
+        with django_assert_max_num_queries(QUERY_BUDGETS['logs']):
+            response = api_client.get(f'/api/poker/tables/{db_table.id}/logs/')
+        assert response.status_code == 200
+        assert len(response.data['logs']) == 20
+
+    def test_telemetry(self, api_client, db_table, tokens, django_assert_max_num_queries):
+        """計測値はメモリから返すテスト"""
+        api_client.post(f'/api/poker/tables/{db_table.id}/start/', **_auth(tokens[1]))
+
+        with django_assert_max_num_queries(QUERY_BUDGETS['telemetry']):
+            response = api_client.get(f'/api/poker/tables/{db_table.id}/telemetry/')
+        assert response.status_code == 200
+        assert response.data['sync_ms']['count'] >= 1
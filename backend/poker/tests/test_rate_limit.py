@@ -0,0 +1,142 @@
+import secrets
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable
+from poker.services.table_manager import table_manager
+from poker.throttles import TokenBucket, metrics, reset_rate_limits
+
+
+class TestTokenBucket:
+    """トークンバケットに関するテスト"""
+
+    def test_burst_then_wait(self):
+        """burst 個までは通り、その後は待ち秒数を返すテスト"""
+        bucket = TokenBucket(rate=2, burst=3)
+        assert [bucket.take('a', now=0) for _ in range(3)] == [0, 0, 0]
+        assert bucket.take('a', now=0) == pytest.approx(0.5)
+
+    def test_refill(self):
+        """時間経過でトークンが補充されるテスト"""
+        bucket = TokenBucket(rate=2, burst=3)
+        for _ in range(3):
+            bucket.take('a', now=0)
+        assert bucket.take('a', now=0.5) == 0
+        assert bucket.take('a', now=0.5) > 0
+
+    def test_keys_are_independent(self):
+        """キーごとに別のバケットになるテスト"""
+        bucket = TokenBucket(rate=1, burst=1)
+        assert bucket.take('a', now=0) == 0
+        assert bucket.take('b', now=0) == 0
+        assert bucket.take('a', now=0) > 0
+
+    def test_prune_full_buckets(self):
+        """キー数が上限に達すると満タンのバケットが捨てられるテスト"""
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.MAX_KEYS = 2
+        bucket.take('a', now=0)
+        bucket.take('b', now=0)
+        bucket.take('c', now=10)
+        assert set(bucket._buckets) == {'c'}
+
+
+@pytest.mark.django_db
+class TestRateLimitedEndpoints:
+    """APIのレート制限に関するテスト"""
+
+    @pytest.fixture(autouse=True)
+    def small_budgets(self, settings):
+        settings.POKER_RATE_LIMITS = {
+            'read': {'rate': 0.01, 'burst': 2},
+            'write': {'rate': 0.01, 'burst': 2},
+        }
+        reset_rate_limits()
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Rate Limit Table')
+        yield table
+        table_manager.remove_table(table.id)
+
+    def test_reads_throttled_with_retry_after(self):
+        """読み取り予算を超えると429とRetry-Afterを返すテスト"""
+        client = APIClient()
+        assert client.get('/api/poker/tables/').status_code == 200
+        assert client.get('/api/poker/tables/').status_code == 200
+        response = client.get('/api/poker/tables/')
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+        assert metrics.snapshot() == {'read.allowed': 2, 'read.throttled': 1}
+
+    def test_reads_and_writes_have_separate_budgets(self, db_table):
+        """ポーリングで読み取り予算を使い切ってもアクションは通るテスト"""
+        client = APIClient()
+        response = client.post(
+            f'/api/poker/tables/{db_table.id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        token = response.data['token']
+        for _ in range(3):
+            response = client.get(f'/api/poker/tables/{db_table.id}/state/', HTTP_X_PLAYER_TOKEN=token)
+        assert response.status_code == 429
+
+        # 1人では開始できないが、レート制限ではなくゲームのエラーになる
+        response = client.post(f'/api/poker/tables/{db_table.id}/start/', HTTP_X_PLAYER_TOKEN=token)
+        assert response.status_code == 400
+
+    def test_tokens_are_independent(self, db_table):
+        """着席中のプレイヤーのトークンごとに別の予算になるテスト"""
+        client = APIClient()
+        tokens = [
+            client.post(
+                f'/api/poker/tables/{db_table.id}/join/',
+                {'username': f'Player{seat}', 'seat_number': seat},
+                format='json',
+            ).data['token']
+            for seat in (1, 2)
+        ]
+        for _ in range(2):
+            client.get('/api/poker/tables/', HTTP_X_PLAYER_TOKEN=tokens[0])
+        assert client.get('/api/poker/tables/', HTTP_X_PLAYER_TOKEN=tokens[0]).status_code == 429
+        assert client.get('/api/poker/tables/', HTTP_X_PLAYER_TOKEN=tokens[1]).status_code == 200
+
+    def test_random_tokens_share_ip_budget(self):
+        """未知のトークンを毎回変えても、IPごとの予算で制限されるテスト"""
+        client = APIClient()
+        statuses = [
+            client.get('/api/poker/tables/', HTTP_X_PLAYER_TOKEN=secrets.token_hex(16)).status_code
+            for _ in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+
+
+@pytest.mark.django_db
+class TestLoadShedding:
+    """過負荷時の負荷制御に関するテスト"""
+
+    def test_polls_shed_when_queued_too_long(self, settings):
+        """キュー待ちが長いとポーリングは503で断られるテスト"""
+        settings.POKER_SHED_QUEUE_MS = 500
+        response = APIClient().get('/api/poker/tables/', HTTP_X_REQUEST_START=f't={time.time() - 2:.3f}')
+        assert response.status_code == 503
+        assert response['Retry-After'] == '1'
+        assert metrics.snapshot()['shed.queue'] == 1
+
+    def test_writes_admitted_when_queued_too_long(self, settings):
+        """キュー待ちが長くても書き込みは通るテスト"""
+        settings.POKER_SHED_QUEUE_MS = 500
+        response = APIClient().post(
+            '/api/poker/tables/', {'name': 'Busy Table'}, format='json',
+            HTTP_X_REQUEST_START=f't={time.time() - 2:.3f}',
+        )
+        assert response.status_code == 201
+        table_manager.remove_table(response.data['id'])
+
+    def test_fresh_polls_admitted(self):
+        """待ち時間が短ければポーリングも通るテスト"""
+        response = APIClient().get('/api/poker/tables/', HTTP_X_REQUEST_START=f't={time.time():.3f}')
+        assert response.status_code == 200
@@ -0,0 +1,103 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable
+from poker.renderers import COMPACT_KEYS, CompactJSONRenderer, to_compact
+from poker.services.card_codec import CODE_TO_DICT, display_to_code
+from poker.services.table_manager import table_manager
+
+# クライアント共通処理（リポジトリ直下の poker_compact.py）
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+import poker_compact  # noqa: E402
+
+
+def _card(display):
+    return CODE_TO_DICT[display_to_code(display)]
+
+
+STATE = {
+    'table_id': 1,
+    'name': 'Compact Table',
+    'phase': 'flop',
+    'hand_number': 3,
+    'version': 12,
+    'pot': 60,
+    'current_bet': 20,
+    'community_cards': [_card('Ah'), _card('Td'), _card('2c')],
+    'players': [
+        {
+            'seat': 1, 'username': 'Player1', 'chips': 980, 'is_folded': False,
+            'is_all_in': False, 'is_active': True, 'hole_cards': [_card('Ks'), _card('Kd')],
+        },
+        {
+            'seat': 2, 'username': 'Player2', 'chips': 960, 'is_folded': False,
+            'is_all_in': False, 'is_active': True, 'hole_cards': [{'hidden': True}, {'hidden': True}],
+        },
+    ],
+    'button_seat': 1,
+    'current_player_seat': 2,
+    'settings': {'max_players': 6, 'small_blind': 10, 'big_blind': 20, 'ante': 0},
+    'valid_actions': {'fold': {}, 'call': {'amount': 20}, 'raise': {'min': 40, 'max': 960}},
+}
+
+
+class TestCompactFormat:
+    """コンパクト形式とクライアント側の展開に関するテスト"""
+
+    def test_key_tables_match(self):
+        """クライアントの EXPANDED_KEYS がサーバーの COMPACT_KEYS の逆引きと一致するテスト"""
+        assert poker_compact.EXPANDED_KEYS == {short: key for key, short in COMPACT_KEYS.items()}
+
+    def test_round_trip(self):
+        """to_compact したstateをクライアントで展開すると元に戻るテスト"""
+        compact = to_compact(STATE)
+        assert compact['cc'] == [display_to_code('Ah'), display_to_code('Td'), display_to_code('2c')]
+        assert compact['pl'][1]['hc'] == [-1, -1]
+        assert poker_compact.expand_compact(compact) == STATE
+
+    def test_round_trip_through_renderer(self):
+        """レンダラーのJSON出力を読み込んで展開しても元に戻るテスト"""
+        body = CompactJSONRenderer().render({'message': 'ok', 'state': STATE})
+        assert poker_compact.expand_compact(json.loads(body)) == {'message': 'ok', 'state': STATE}
+
+
+@pytest.mark.django_db
+class TestContentNegotiation:
+    """Accept ヘッダーによる state の形式選択に関するテスト"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Negotiation Table')
+        client = APIClient()
+        for seat_number in (1, 2):
+            response = client.post(
+                f'/api/poker/tables/{table.id}/join/',
+                {'seat_number': seat_number, 'username': f'Player{seat_number}'}, format='json',
+            )
+            assert response.status_code == 201
+        yield table
+        table_manager.remove_table(table.id)
+
+    def test_compact_state(self, db_table):
+        """compact のメディアタイプを受け付けるとコンパクト形式で返し、展開すると通常の形式と一致するテスト"""
+        client = APIClient()
+        url = f'/api/poker/tables/{db_table.id}/state/'
+        plain = client.get(url, HTTP_ACCEPT='application/json')
+        compact = client.get(url, HTTP_ACCEPT=poker_compact.COMPACT_MEDIA_TYPE)
+
+        assert plain.status_code == 200 and compact.status_code == 200
+        assert compact['Content-Type'].startswith(poker_compact.COMPACT_MEDIA_TYPE)
+        body = json.loads(compact.content)
+        assert {'ph', 'pl', 'v'} <= set(body)
+        assert poker_compact.expand_compact(body) == json.loads(plain.content)
+
+    def test_default_is_json(self, db_table):
+        """Accept ヘッダーがなければ通常のJSONで返すテスト"""
+        response = APIClient().get(f'/api/poker/tables/{db_table.id}/state/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/json')
+        assert 'phase' in json.loads(response.content)
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from poker.models import ActionLog, GameHand, PokerTable, TablePlayer
+from poker.services.archive import archive_hands
+from poker.services.card_codec import codes_to_mask, display_to_code
+from poker.services.replay import build_frames, replay_cache
+
+pytestmark = pytest.mark.django_db
+
+# (username, action, amount, details)
+ACTIONS = [
+    (None, 'deal', 0, {'hand_number': 1}),
+    ('Alice', 'post_blind', 10, {'seat': 1}),
+    ('Bob', 'post_blind', 20, {'seat': 2}),
+    ('Alice', 'call', 10, {'seat': 1, 'phase': 'preflop'}),
+    ('Bob', 'check', 0, {'seat': 2, 'phase': 'preflop'}),
+    ('Alice', 'bet', 40, {'seat': 1, 'phase': 'flop'}),
+    ('Bob', 'fold', 0, {'seat': 2, 'phase': 'flop'}),
+    ('Alice', 'win', 80, {'seat': 1}),
+]
+BOARD = ['Ah', 'Kd', '7c']
+HOLE_CARDS = {'1': ['Qs', 'Ac'], '2': ['9d', 'Th']}
+
+
+@pytest.fixture(autouse=True)
+def clear_replay_cache():
+    replay_cache.clear()
+    yield
+    replay_cache.clear()
+
+
+@pytest.fixture
+def table():
+    return PokerTable.objects.create(name='Replay Table')
+
+
+def _create_hand(table, hand_number=1, finished=True):
+    players = {
+        name: TablePlayer.objects.get_or_create(
+            table=table, username=name, defaults={'seat_number': seat, 'chips': 1000},
+        )[0]
+        for seat, name in ((1, 'Alice'), (2, 'Bob'))
+    }
+    hand = GameHand.objects.create(
+        table=table, hand_number=hand_number, button_seat=1, total_pot=80,
+        community_cards=[display_to_code(c) for c in BOARD], winner_seats=[1],
+        hole_cards={seat: codes_to_mask(display_to_code(c) for c in cards) for seat, cards in HOLE_CARDS.items()},
+        finished_at=timezone.now() if finished else None,
+    )
+    for username, action, amount, details in ACTIONS:
+        ActionLog.objects.create(
+            table=table, hand=hand, player=players.get(username),
+            action=action, amount=amount, details=details,
+        )
+    return hand
+
+
+class TestBuildFrames:
+    """フレーム組み立てに関するテスト"""
+
+    def test_frames(self):
+        """ポット・ストリートのベット・フォールド・ボードが1手ずつ進むテスト"""
+        frames = build_frames(BOARD, [
+            {'action': a, 'player': u, 'amount': am, 'details': d} for u, a, am, d in ACTIONS
+        ])
+        assert len(frames) == len(ACTIONS)
+        assert [f['pot'] for f in frames] == [0, 10, 30, 40, 40, 80, 80, 0]
+        assert frames[3]['bets'] == {'1': 20, '2': 20}
+        assert frames[5]['phase'] == 'flop'
+        assert frames[5]['bets'] == {'1': 40}
+        assert frames[5]['community_cards'] == BOARD
+        assert frames[4]['community_cards'] == []
+        assert frames[6]['folded'] == [2]
+        assert frames[7]['phase'] == 'finished'
+        assert frames[7]['username'] == 'Alice'
+
+
+class TestReplayEndpoint:
+    """リプレイAPIに関するテスト"""
+
+    def test_one_query_then_cached(self, table, django_assert_num_queries):
+        """初回は1クエリ、2回目以降はキャッシュから返るテスト"""
+        _create_hand(table)
+        url = f'/api/poker/tables/{table.id}/hands/1/replay/'
+        client = APIClient()
+
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.data['hand_number'] == 1
+        assert len(response.data['frames']) == len(ACTIONS)
+        assert response.data['hole_cards'] == HOLE_CARDS
+
+        with django_assert_num_queries(0):
+            assert client.get(url).data == response.data
+
+    def test_unfinished_hand_not_cached(self, table):
+        """進行中のハンドはキャッシュされないテスト"""
+        _create_hand(table, finished=False)
+        client = APIClient()
+        response = client.get(f'/api/poker/tables/{table.id}/hands/1/replay/')
+        assert replay_cache.get((table.id, 1)) is None
+        assert response.data['hole_cards'] == {}
+
+    def test_archived_hand(self, table):
+        """アーカイブ済みのハンドも再現できるテスト"""
+        hand = _create_hand(table)
+        finished_at = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        GameHand.objects.filter(id=hand.id).update(finished_at=finished_at)
+        archive_hands(30, now=finished_at + timedelta(days=40))
+        assert not GameHand.objects.exists()
+
+        response = APIClient().get(f'/api/poker/tables/{table.id}/hands/1/replay/')
+        assert response.status_code == 200
+        assert [f['pot'] for f in response.data['frames']] == [0, 10, 30, 40, 40, 80, 80, 0]
+        assert response.data['hole_cards'] == HOLE_CARDS
+
+    def test_not_found(self, table):
+        """存在しないハンドは404を返すテスト"""
+        response = APIClient().get(f'/api/poker/tables/{table.id}/hands/99/replay/')
+        assert response.status_code == 404
@@ -0,0 +1,45 @@
+import threading
+
+from poker.services.scheduler import TaskScheduler
+
+
+class TestTaskScheduler:
+    """遅延タスクスケジューラに関するテスト"""
+
+    def test_runs_in_due_order(self):
+        """実行時刻の順にタスクが実行されるテスト"""
+        scheduler = TaskScheduler()
+        done = threading.Event()
+        order = []
+
+        scheduler.schedule(0.05, 'second', lambda: (order.append('second'), done.set()))
+        scheduler.schedule(0.01, 'first', lambda: order.append('first'))
+
+        assert done.wait(2)
+        assert order == ['first', 'second']
+
+    def test_same_key_replaces(self):
+        """同じキーで再登録すると前の予定が置き換わるテスト"""
+        scheduler = TaskScheduler()
+        done = threading.Event()
+        calls = []
+
+        scheduler.schedule(0.01, 'auto_start', lambda: calls.append('old'))
+        scheduler.schedule(0.03, 'auto_start', lambda: (calls.append('new'), done.set()))
+
+        assert done.wait(2)
+        assert calls == ['new']
+
+    def test_cancel(self):
+        """取り消したタスクは実行されないテスト"""
+        scheduler = TaskScheduler()
+        done = threading.Event()
+        calls = []
+
+        scheduler.schedule(0.01, 'cancelled', lambda: calls.append('cancelled'))
+        scheduler.cancel('cancelled')
+        scheduler.schedule(0.03, 'marker', done.set)
+
+        assert done.wait(2)
+        assert calls == []
+        assert not scheduler.is_scheduled('cancelled')
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable, TablePlayer
+from poker.services.seats import SeatMap
+from poker.services.table_manager import table_manager
+
+
+def _parallel_join(table_id, requests):
+    """requests の (seat_number, username) を同時に join APIへ送り、成功したものを返す"""
+    barrier = threading.Barrier(len(requests))
+    succeeded = []
+
+    def join(seat_number, username):
+        try:
+            barrier.wait()
+            response = APIClient().post(
+                f'/api/poker/tables/{table_id}/join/',
+                {'username': username, 'seat_number': seat_number},
+                format='json',
+            )
+            if response.status_code == 201:
+                succeeded.append((seat_number, username))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=join, args=request) for request in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return succeeded
+
+
+class TestSeatMap:
+    """空席ビットマップに関するテスト"""
+
+    def test_reserve_and_release(self):
+        """席の確保と解放のテスト"""
+        seat_map = SeatMap(max_players=6)
+        assert seat_map.reserve(2, 'Player1') is None
+        assert seat_map.free_seats() == [1, 3, 4, 5, 6]
+        assert seat_map.free_count == 5
+
+        seat_map.release(2, 'Player1')
+        assert seat_map.free_count == 6
+        assert seat_map.reserve(2, 'Player1') is None
+
+    @pytest.mark.parametrize('seat_number, username, message', [
+        (3, 'Player2', 'Seat already taken'),
+        (4, 'Player1', 'Username already taken at this table'),
+        (7, 'Player3', 'Seat number must be between 1 and 6'),
+    ])
+    def test_reserve_conflicts(self, seat_number, username, message):
+        """席・ユーザー名の重複と範囲外の席が拒否されるテスト"""
+        seat_map = SeatMap(max_players=6)
+        seat_map.reserve(3, 'Player1')
+        assert seat_map.reserve(seat_number, username) == message
+
+
+@pytest.mark.django_db(transaction=True)
+class TestParallelJoin:
+    """100件の同時参加で二重着席が起きないことのテスト（join API経由）"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Parallel Table', auto_start=False)
+        yield table
+        table_manager.remove_table(table.id)
+
+    def _assert_consistent(self, db_table, succeeded):
+        """DBとメモリ上の席が一致し、どの席も1人だけであることを確かめる"""
+        active = list(TablePlayer.objects.filter(table=db_table, is_active=True).values_list('seat_number', 'username'))
+        seats = [seat for seat, _ in active]
+        assert len(seats) == len(set(seats))
+        assert sorted(active) == sorted(succeeded)
+
+        seat_map = table_manager._seat_maps[db_table.id]
+        assert seat_map.free_count == db_table.max_players - len(active)
+        assert all(not seat_map.is_free(seat) for seat in seats)
+        assert seat_map.usernames == {username for _, username in active}
+
+    def test_same_seat(self, db_table):
+        """同じ席への同時参加は1件だけ成功するテスト"""
+        succeeded = _parallel_join(db_table.id, [(1, f'Player{i}') for i in range(100)])
+        assert len(succeeded) == 1
+        self._assert_consistent(db_table, succeeded)
+
+    def test_random_seats(self, db_table):
+        """異なるユーザーの同時参加で席数ぶんだけ成功し、席が重複しないテスト"""
+        succeeded = _parallel_join(db_table.id, [(i % 6 + 1, f'Player{i}') for i in range(100)])
+        assert sorted(seat for seat, _ in succeeded) == [1, 2, 3, 4, 5, 6]
+        self._assert_consistent(db_table, succeeded)
+
+    def test_same_username(self, db_table):
+        """同じユーザー名の同時参加は1件だけ成功するテスト"""
+        succeeded = _parallel_join(db_table.id, [(i % 6 + 1, 'Player1') for i in range(100)])
+        assert len(succeeded) == 1
+        self._assert_consistent(db_table, succeeded)
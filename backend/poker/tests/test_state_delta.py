@@ -0,0 +1,137 @@
+import copy
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.models import PokerTable
+from poker.services.state_delta import diff_state, apply_patch
+from poker.services.table_manager import table_manager
+
+
+@pytest.fixture
+def base_state():
+    """フロップ中の state dict を作成するフィクスチャ"""
+    return {
+        'table_id': 1,
+        'version': 3,
+        'phase': 'flop',
+        'pot': 60,
+        'community_cards': [
+            {'rank': 'K', 'suit': 'h', 'display': 'Kh'},
+            {'rank': 'Q', 'suit': 'c', 'display': 'Qc'},
+            {'rank': '9', 'suit': 's', 'display': '9s'},
+        ],
+        'players': [
+            {'seat': 1, 'username': 'Player1', 'chips': 980, 'current_bet': 0},
+            {'seat': 2, 'username': 'Player2', 'chips': 980, 'current_bet': 0},
+        ],
+        'button_seat': 1,
+        'current_player_seat': 1,
+    }
+
+
+class TestDiffState:
+    """state の差分計算に関するテスト"""
+
+    def test_no_change(self, base_state):
+        """変更がなければ空のパッチになるテスト"""
+        assert diff_state(base_state, copy.deepcopy(base_state)) == {}
+
+    def test_single_player_bet(self, base_state):
+        """1人のベットは該当プレイヤーの変更フィールドのみになるテスト"""
+        new = copy.deepcopy(base_state)
+        new['version'] = 4
+        new['pot'] = 100
+        new['players'][0]['chips'] = 940
+        new['players'][0]['current_bet'] = 40
+        new['current_player_seat'] = 2
+
+        patch = diff_state(base_state, new)
+        assert patch == {
+            'version': 4,
+            'pot': 100,
+            'players': {'0': {'chips': 940, 'current_bet': 40}},
+            'current_player_seat': 2,
+        }
+        assert apply_patch(base_state, patch) == new
+
+    def test_card_list_replaced(self, base_state):
+        """カードが増えた場合はリスト全体を置き換えるテスト"""
+        new = copy.deepcopy(base_state)
+        new['community_cards'].append({'rank': '2', 'suit': 'd', 'display': '2d'})
+
+        patch = diff_state(base_state, new)
+        assert patch == {'community_cards': new['community_cards']}
+        assert apply_patch(base_state, patch) == new
+
+    def test_player_joined_and_key_removed(self, base_state):
+        """人数の変化とキーの削除が反映されるテスト"""
+        new = copy.deepcopy(base_state)
+        new['players'].append({'seat': 3, 'username': 'Player3', 'chips': 1000, 'current_bet': 0})
+        del new['current_player_seat']
+
+        patch = diff_state(base_state, new)
+        assert patch['players'] == new['players']
+        assert patch['_removed'] == ['current_player_seat']
+        assert apply_patch(base_state, patch) == new
+
+
+@pytest.mark.django_db
+class TestSinceVersionEpoch:
+    """since_version の差分取得とテーブル復元時のエポックに関するテスト（API経由）"""
+
+    @pytest.fixture
+    def db_table(self):
+        table = PokerTable.objects.create(name='Delta Table')
+        yield table
+        table_manager.remove_table(table.id)
+
+    @pytest.fixture
+    def client(self, db_table):
+        client = APIClient()
+        for seat_number in (1, 2):
+            response = client.post(
+                f'/api/poker/tables/{db_table.id}/join/',
+                {'seat_number': seat_number, 'username': f'Player{seat_number}'}, format='json',
+            )
+            assert response.status_code == 201
+        client.credentials(HTTP_X_PLAYER_TOKEN=response.data['token'])
+        return client
+
+    def _state(self, client, db_table, **params):
+        response = client.get(f'/api/poker/tables/{db_table.id}/state/', params)
+        assert response.status_code == 200
+        return response.data
+
+    def test_patch_with_same_epoch(self, client, db_table):
+        """同じエポックのバージョンを渡すと差分を返すテスト"""
+        base = self._state(client, db_table)
+        table_manager.mark_changed(db_table.id, db_table)
+
+        result = self._state(client, db_table, since_version=base['version'], epoch=base['epoch'])
+        assert result['since_version'] == base['version']
+        assert result['patch'] == {'version': base['version'] + 1}
+
+    def test_missing_epoch_returns_full_state(self, client, db_table):
+        """epoch を省略すると全体を返すテスト"""
+        base = self._state(client, db_table)
+        result = self._state(client, db_table, since_version=base['version'])
+        assert 'patch' not in result
+        assert result['epoch'] == base['epoch']
+
+    def test_restored_table_returns_full_state(self, client, db_table):
+        """テーブルを復元し直してバージョンが同じ番号に戻っても、古いエポックには全体を返すテスト"""
+        base = self._state(client, db_table)
+
+        # 再起動と同じくメモリから消してDBから復元し、バージョンを元の番号まで進める
+        table_manager.remove_table(db_table.id)
+        table_manager.get_or_create_table(db_table.id)
+        while table_manager.get_state_version(db_table.id) < base['version']:
+            table_manager.mark_changed(db_table.id, db_table)
+        assert table_manager.get_state_version(db_table.id) == base['version']
+
+        result = self._state(client, db_table, since_version=base['version'], epoch=base['epoch'])
+        assert 'patch' not in result
+        assert result['epoch'] != base['epoch']
+        assert result['version'] == base['version']
+        assert [p['username'] for p in result['players']] == ['Player1', 'Player2']
@@ -0,0 +1,51 @@
+from poker.services.telemetry import TableTelemetry, TelemetryRegistry, summarize
+
+
+class TestTableTelemetry:
+    """ゲーム進行の計測に関するテスト"""
+
+    def test_summarize(self):
+        """件数・平均・パーセンタイル・最大を計算するテスト"""
+        assert summarize([]) == {'count': 0, 'avg': None, 'p50': None, 'p90': None, 'max': None}
+        summary = summarize(float(i) for i in range(1, 11))
+        assert summary == {'count': 10, 'avg': 5.5, 'p50': 5.0, 'p90': 9.0, 'max': 10.0}
+
+    def test_think_time_per_player(self):
+        """手番が来てからアクションまでの時間をプレイヤーごとに記録するテスト"""
+        telemetry = TableTelemetry()
+        telemetry.turn_changed('Alice', now=10.0)
+        telemetry.turn_changed('Alice', now=11.0)  # 同じ手番のままなら開始時刻は変えない
+        telemetry.record_action('Alice', action_ms=0.5, now=12.5)
+        telemetry.turn_changed('Bob', now=12.5)
+        telemetry.record_action('Bob', action_ms=0.7, now=13.0)
+        telemetry.turn_changed('Bob', now=14.0)  # 次のストリートも続けて Bob の番
+        telemetry.record_action('Bob', action_ms=0.7, now=14.5)
+
+        snapshot = telemetry.snapshot()
+        assert snapshot['think_ms']['count'] == 3
+        assert snapshot['players']['Alice']['avg'] == 2500.0
+        assert snapshot['players']['Bob']['avg'] == 500.0
+        assert snapshot['action_ms']['max'] == 0.7
+
+    def test_ring_buffer_is_bounded(self):
+        """直近 WINDOW 件だけを保持するテスト"""
+        telemetry = TableTelemetry()
+        for i in range(TableTelemetry.WINDOW + 50):
+            telemetry.hand_started(float(i))
+            telemetry.hand_finished(float(i) + 2)
+        assert telemetry.snapshot()['hand_seconds']['count'] == TableTelemetry.WINDOW
+
+    def test_action_out_of_turn_has_no_think_time(self):
+        """手番でないプレイヤーのアクションは考慮時間に数えないテスト"""
+        telemetry = TableTelemetry()
+        telemetry.turn_changed('Alice', now=1.0)
+        telemetry.record_action('Bob', action_ms=0.3, now=2.0)
+        assert telemetry.snapshot()['think_ms']['count'] == 0
+
+    def test_registry(self):
+        """テーブル削除で計測値も消えるテスト"""
+        registry = TelemetryRegistry()
+        assert registry.get(1) is registry.get(1)
+        registry.remove(1)
+        assert registry.peek(1) is None
+        assert registry.table_ids() == []
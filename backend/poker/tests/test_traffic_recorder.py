@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from poker.services.table_manager import table_manager
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def traffic_log(settings, tmp_path):
+    path = tmp_path / 'traffic.ndjson'
+    settings.POKER_TRAFFIC_LOG = str(path)
+    return path
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+class TestTrafficRecorder:
+    """トラフィック記録ミドルウェアに関するテスト"""
+
+    def test_records_with_anonymized_tokens(self, traffic_log):
+        """トークンを別名に置き換えて、作成・参加の対応付けと一緒に記録するテスト"""
+        client = APIClient()
+        response = client.post('/api/poker/tables/', {'name': 'Recorded Table'}, format='json')
+        table_id = response.data['id']
+        response = client.post(
+            f'/api/poker/tables/{table_id}/join/',
+            {'username': 'Player1', 'seat_number': 1},
+            format='json',
+        )
+        token = response.data['token']
+        client.get(f'/api/poker/tables/{table_id}/state/?since_version=0', HTTP_X_PLAYER_TOKEN=token)
+        table_manager.remove_table(table_id)
+
+        create, join, state = _read(traffic_log)
+        assert create['m'] == 'POST'
+        assert create['r'] == {'id': table_id}
+        assert join['b'] == {'username': 'Player1', 'seat_number': 1}
+        assert join['s'] == 201
+
+        assert state['k'] == join['r']['k']
+        assert token not in traffic_log.read_text(encoding='utf-8')
+        assert state['q'] == 'since_version=0'
+        assert state['t'] >= join['t'] >= create['t']
+        assert state['d'] >= 0
+
+    def test_other_paths_not_recorded(self, traffic_log):
+        """ポーカーAPI以外のリクエストは記録しないテスト"""
+        APIClient().get('/api/todos/')
+        assert not traffic_log.exists() or traffic_log.read_text() == ''
+
+    def test_disabled_by_default(self, settings, tmp_path):
+        """POKER_TRAFFIC_LOG が空なら何も書かないテスト"""
+        settings.POKER_TRAFFIC_LOG = ''
+        APIClient().get('/api/poker/tables/')
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+import pytest
+
+from poker.models import PokerTable, TablePlayer
+from poker.services.table_manager import table_manager
+
+
+@pytest.mark.django_db
+class TestWarmUp:
+    """起動時の全テーブル一括復元（warm_up）に関するテスト"""
+
+    @pytest.fixture
+    def seeded(self):
+        """アクティブなテーブル2つと、復元しないテーブル・プレイヤーを作る"""
+        first = PokerTable.objects.create(name='Warm 1', big_blind=40, small_blind=20)
+        second = PokerTable.objects.create(name='Warm 2')
+        closed = PokerTable.objects.create(name='Closed', is_active=False)
+        players = [
+            TablePlayer.objects.create(table=first, username='Player1', seat_number=2, chips=750),
+            TablePlayer.objects.create(table=first, username='Player2', seat_number=5, chips=1250),
+            TablePlayer.objects.create(table=second, username='Player3', seat_number=1, chips=1000, is_bot=True),
+        ]
+        TablePlayer.objects.create(table=first, username='Gone', seat_number=3, chips=500, is_active=False)
+        TablePlayer.objects.create(table=closed, username='Closed1', seat_number=1, chips=1000)
+
+        tables = [first, second, closed]
+        # 他のテストが同じIDのテーブルをメモリに残していても、ここからは未復元の状態にする
+        for table in tables:
+            table_manager.remove_table(table.id)
+        yield tables, players
+        for table in tables:
+            table_manager.remove_table(table.id)
+
+    def test_restores_seats_tokens_and_chips(self, seeded):
+        """アクティブなテーブルの席・トークン・チップを復元し、2回目は何も復元しないテスト"""
+        (first, second, closed), players = seeded
+
+        restored, _ = table_manager.warm_up()
+        assert restored == 2
+        assert table_manager.get_table(closed.id) is None
+
+        for player in players:
+            info = table_manager.get_player_info_by_token(player.table_id, player.token)
+            assert info is not None
+            assert (info.username, info.seat_number, info.db_id, info.is_bot) == (
+                player.username, player.seat_number, player.id, player.is_bot,
+            )
+            assert table_manager.is_seated_token(player.token)
+
+        chips = {p.player_id: p.chips.amount for p in table_manager.get_table(first.id).get_state().players}
+        assert chips == {'Player1': 750, 'Player2': 1250}
+        assert table_manager.free_seats(first.id) == [1, 3, 4, 6]
+        assert table_manager.free_seats(second.id) == [2, 3, 4, 5, 6]
+
+        restored, _ = table_manager.warm_up()
+        assert restored == 0
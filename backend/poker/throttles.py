@@ -0,0 +1,136 @@
+"""プレイヤーごとのレート制限（トークンバケット）
+
+着席中のプレイヤーの X-Player-Token（それ以外はIP）ごとに、読み取り（state / logs / 一覧）と
+書き込み（action / start）で別々のバケットを持つ。超過時は DRF の Throttled
+により 429 と Retry-After を返す。
+"""
+import sys
+import time
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from . import forksafe
+
+
+class TokenBucket:
+    """キーごとのトークンバケット（rate 個/秒で補充、最大 burst 個）"""
+
+    # これを超えたら満タンのバケットを捨てる
+    MAX_KEYS = 10000
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, List[float]] = {}  # key -> [残りトークン, 最終更新時刻]
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """1トークン消費できれば 0、できなければ次に使えるまでの秒数を返す"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_KEYS:
+                    self._prune(now)
+                bucket = self._buckets[key] = [float(self.burst), now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def _prune(self, now: float):
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+
+
+class RateLimitMetrics:
+    """レート制限と負荷制御の件数"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = Lock()
+        forksafe.register(self)
+
+    def record(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+metrics = RateLimitMetrics()
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = Lock()
+forksafe.register(sys.modules[__name__])
+
+
+def get_bucket(scope: str) -> TokenBucket:
+    bucket = _buckets.get(scope)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(scope)
+            if bucket is None:
+                limits = settings.POKER_RATE_LIMITS[scope]
+                bucket = _buckets[scope] = TokenBucket(limits['rate'], limits['burst'])
+    return bucket
+
+
+def reset_rate_limits():
+    """バケットを捨てて設定を読み直す（テスト・設定変更用）"""
+    with _buckets_lock:
+        _buckets.clear()
+    metrics.reset()
+
+
+class PokerRateThrottle(BaseThrottle):
+    """scope ごとのトークンバケットで制限する"""
+    scope: str = ''
+
+    def __init__(self):
+        self.wait_seconds = 0.0
+
+    def get_ident(self, request):
+        # 未知のトークンでキーを作るとリクエストごとに満タンのバケットになるので、着席中のものだけ使う
+        from .services.table_manager import table_manager
+
+        token = request.headers.get('X-Player-Token')
+        if token and table_manager.is_seated_token(token):
+            return f'token:{token}'
+        return f'ip:{super().get_ident(request)}'
+
+    def allow_request(self, request, view):
+        self.wait_seconds = get_bucket(self.scope).take(self.get_ident(request))
+        allowed = self.wait_seconds == 0
+        metrics.record(f'{self.scope}.{"allowed" if allowed else "throttled"}')
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class PokerReadThrottle(PokerRateThrottle):
+    scope = 'read'
+
+
+class PokerWriteThrottle(PokerRateThrottle):
+    scope = 'write'
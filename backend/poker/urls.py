@@ -1,10 +1,21 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PokerTableViewSet
+from .views import (
+    PokerTableViewSet, QuickSeatView, HandExportView, PlayerStatsView, LeaderboardView,
+    MetricsView, TelemetryView, MemoryView, MemorySnapshotView,
+)
 
 router = DefaultRouter()
 router.register(r'tables', PokerTableViewSet, basename='poker-table')
 
 urlpatterns = [
+    path('quick-seat/', QuickSeatView.as_view(), name='poker-quick-seat'),
+    path('hands/export/', HandExportView.as_view(), name='poker-hand-export'),
+    path('metrics/', MetricsView.as_view(), name='poker-metrics'),
+    path('telemetry/', TelemetryView.as_view(), name='poker-telemetry'),
+    path('debug/memory/', MemoryView.as_view(), name='poker-debug-memory'),
+    path('debug/memory/snapshots/', MemorySnapshotView.as_view(), name='poker-debug-memory-snapshots'),
+    path('leaderboard/', LeaderboardView.as_view(), name='poker-leaderboard'),
+    path('players/<str:username>/stats/', PlayerStatsView.as_view(), name='poker-player-stats'),
     path('', include(router.urls)),
 ]
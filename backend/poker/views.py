@@ -1,62 +1,96 @@
+import hashlib
+import secrets
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Count, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
 
-from poker_domain import (
-    Chips, Fold, Check, Call, Bet, Raise,
-    GamePhase, EventType, PokerError,
-)
+from config.middleware import choose_coding, make_etag, not_modified_response
+from poker_domain import Chips, PokerError
 from .models import PokerTable as PokerTableModel, TablePlayer, ActionLog as ActionLogModel
 from .serializers import (
     PokerTableSerializer, TablePlayerSerializer, JoinTableSerializer,
-    ActionSerializer, ActionLogSerializer
+    QuickSeatSerializer, AddBotSerializer, ActionSerializer, ActionLogSerializer,
+    HandExportQuerySerializer, LeaderboardQuerySerializer, TelemetryQuerySerializer,
+    BulkCreateTablesSerializer, BulkCloseTablesSerializer, MemorySnapshotQuerySerializer,
 )
-from .services.table_manager import table_manager, PlayerInfo
+from .services.db_writer import db_writer
+from .services.memory import memory_report, snapshots as memory_snapshots
+from .services.provisioning import close_tables, create_tables, forget_tables, purge_tables, select_tables
+from .services.replay import replay_cache, replay_hand
+from .services.table_manager import AUTO_START_PHASES, table_manager, PlayerInfo, get_valid_actions_dict
 from .authentication import get_player_from_request
+from .renderers import STATE_RENDERER_CLASSES
+from .throttles import PokerReadThrottle, PokerWriteThrottle, metrics as rate_limit_metrics
 
 
-def _build_action(action_str: str, amount: int, state, username: str):
-    """アクション文字列をドメインのActionオブジェクトに変換"""
-    if action_str == 'fold':
-        return Fold()
-    elif action_str == 'check':
-        return Check()
-    elif action_str == 'call':
-        return Call()
-    elif action_str == 'bet':
-        return Bet(amount=amount)
-    elif action_str == 'raise':
-        return Raise(amount=amount)
-    elif action_str == 'all_in':
-        # all_in は新ドメインに直接存在しないため、適切なアクションに変換
-        player_state = next(
-            (p for p in state.players if p.player_id == username), None
-        )
-        if not player_state:
-            return Fold()
-        player_chips = player_state.chips.amount
-        player_current_bet = player_state.current_bet.amount
-        table_current_bet = state.current_bet.amount
-
-        if table_current_bet == 0:
-            return Bet(amount=player_chips)
-        else:
-            total = player_chips + player_current_bet
-            if total > table_current_bet:
-                return Raise(amount=total)
-            else:
-                return Call()
-    else:
-        raise ValueError(f"Unknown action: {action_str}")
+def _open_table(db_table):
+    """開いている卓のインメモリテーブル（終了済みの卓はメモリから外して None）
+
+    provision_tables --close / --purge は別プロセスで動くので、ワーカーのメモリに残った卓はここで外す。
+    """
+    if not db_table.is_active:
+        forget_tables([db_table.id])
+        return None
+    return table_manager.get_or_create_table(db_table.id)
+
+
+def _seat_player(db_table, table, username: str, seat_number: int, is_bot: bool = False):
+    """席を確保してプレイヤーを着席させ (TablePlayer, None) を返す（失敗時は (None, エラー)）"""
+    with table_manager.table_lock(db_table.id):
+        # 空席ビットマップで席とユーザー名を確保
+        error = table_manager.reserve_seat(db_table.id, username, seat_number)
+        if error:
+            return None, error
+
+        # インメモリテーブルに先に追加（DBプレイヤー作成前に行い、復元時の重複を防ぐ）
+        try:
+            table.add_player(
+                player_id=username,
+                chips=Chips(db_table.initial_chips),
+            )
+        except PokerError as e:
+            table_manager.release_seat(db_table.id, username, seat_number)
+            return None, str(e)
+
+        # プレイヤー作成（重複はユニーク制約で検出）
+        try:
+            player = db_writer.call(lambda: TablePlayer.objects.create(
+                table=db_table,
+                username=username,
+                seat_number=seat_number,
+                chips=db_table.initial_chips,
+                is_bot=is_bot,
+            ))
+        except IntegrityError:
+            table.remove_player(player_id=username)
+            table_manager.release_seat(db_table.id, username, seat_number)
+            return None, 'Seat or username already taken'
+
+        # プレイヤー情報を登録
+        table_manager.add_player_info(db_table.id, PlayerInfo(
+            username=username,
+            seat_number=seat_number,
+            token=player.token,
+            db_id=player.id,
+            is_bot=is_bot,
+        ), chips=db_table.initial_chips)
+        table_manager.mark_changed(db_table.id, db_table)
 
+    # ハンド中でなければ自動開始を予約（前のハンドの終了後に人数が揃った場合も含む）
+    if table.get_state().phase.value in AUTO_START_PHASES:
+        table_manager.schedule_auto_start(db_table.id, db_table)
 
-def _extract_winner_id(result):
-    """ActionResultからSHOWDOWNイベントの勝者IDを取得"""
-    for event in result.events:
-        if event.event_type == EventType.SHOWDOWN:
-            return event.payload.get('winner_id')
-    return None
+    return player, None
 
 
 class PokerTableViewSet(viewsets.ModelViewSet):
@@ -65,6 +99,40 @@ class PokerTableViewSet(viewsets.ModelViewSet):
     serializer_class = PokerTableSerializer
     permission_classes = [AllowAny]
 
+    # レート制限の対象（ポーリングとアクションで別の予算）
+    READ_ACTIONS = ('list', 'retrieve', 'state', 'logs', 'replay', 'telemetry')
+    WRITE_ACTIONS = ('start', 'do_action')
+    # 管理者（is_staff）だけが使える一括作成・一括終了（purge はハンド履歴ごと削除する）
+    ADMIN_ACTIONS = ('bulk_create', 'bulk_close')
+
+    def get_permissions(self):
+        if self.action in self.ADMIN_ACTIONS:
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    def get_throttles(self):
+        if self.action in self.READ_ACTIONS:
+            return [PokerReadThrottle()]
+        if self.action in self.WRITE_ACTIONS:
+            return [PokerWriteThrottle()]
+        return super().get_throttles()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # 参加人数を返すのは一覧と詳細だけ（state やアクションでは集計のJOINを避ける）
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(
+                active_player_count=Count('table_players', filter=Q(table_players__is_active=True)),
+            )
+        return queryset
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # 無応答プレイヤーの検出用に最終アクセス時刻を記録
+        token = request.headers.get('X-Player-Token')
+        if token:
+            table_manager.touch(token)
+
     def create(self, request, *args, **kwargs):
         """テーブル作成"""
         serializer = self.get_serializer(data=request.data)
@@ -73,6 +141,48 @@ class PokerTableViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer):
+        db_writer.call(serializer.save)
+
+    def perform_update(self, serializer):
+        db_writer.call(serializer.save)
+
+    def perform_destroy(self, instance):
+        db_writer.call(instance.delete)
+        table_manager.remove_table(instance.id)
+        replay_cache.discard_table(instance.id)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """テンプレートの設定でテーブルを一括作成"""
+        serializer = BulkCreateTablesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        template = dict(serializer.validated_data)
+        count = template.pop('count')
+        name_prefix = template.pop('name_prefix')
+        register = template.pop('register')
+
+        tables = create_tables(count, name_prefix, template, register=register)
+        return Response({
+            'count': len(tables),
+            'ids': [t.id for t in tables],
+            'registered': register,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='bulk/close')
+    def bulk_close(self, request):
+        """テーブルを一括終了（purge=true なら削除）"""
+        serializer = BulkCloseTablesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table_ids = list(select_tables(
+            serializer.validated_data.get('ids'), serializer.validated_data.get('name_prefix'),
+        ).values_list('id', flat=True))
+
+        if serializer.validated_data['purge']:
+            return Response({'purged': purge_tables(table_ids)})
+        tables, players = close_tables(table_ids)
+        return Response({'closed': tables, 'players_removed': players})
+
     @action(detail=True, methods=['post'])
     def join(self, request, pk=None):
         """テーブルに参加"""
@@ -83,57 +193,51 @@ class PokerTableViewSet(viewsets.ModelViewSet):
         username = serializer.validated_data['username']
         seat_number = serializer.validated_data['seat_number']
 
-        # 席番号チェック
-        if seat_number > db_table.max_players:
+        table = _open_table(db_table)
+        if not table:
             return Response(
-                {'error': f'Seat number must be between 1 and {db_table.max_players}'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Table not found'},
+                status=status.HTTP_404_NOT_FOUND
             )
 
-        # 席が空いているかチェック
-        if TablePlayer.objects.filter(table=db_table, seat_number=seat_number, is_active=True).exists():
-            return Response(
-                {'error': 'Seat already taken'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        player, error = _seat_player(db_table, table, username, seat_number)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': 'Joined successfully',
+            'token': player.token,
+            'player': TablePlayerSerializer(player).data,
+        }, status=status.HTTP_201_CREATED)
 
-        # ユーザー名重複チェック
-        if TablePlayer.objects.filter(table=db_table, username=username, is_active=True).exists():
+    @action(detail=True, methods=['post'], url_path='add-bot')
+    def add_bot(self, request, pk=None):
+        """サーバー内のAIプレイヤーを着席させる"""
+        db_table = self.get_object()
+        serializer = AddBotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        table = _open_table(db_table)
+        if not table:
             return Response(
-                {'error': 'Username already taken at this table'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Table not found'},
+                status=status.HTTP_404_NOT_FOUND
             )
 
-        # インメモリテーブルに先に追加（DBプレイヤー作成前に行い、復元時の重複を防ぐ）
-        table = table_manager.get_or_create_table(db_table.id)
-        if table:
-            try:
-                table.add_player(
-                    player_id=username,
-                    chips=Chips(db_table.initial_chips),
-                )
-            except PokerError as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        seat_number = serializer.validated_data.get('seat_number')
+        if seat_number is None:
+            free_seats = table_manager.free_seats(db_table.id)
+            if not free_seats:
+                return Response({'error': 'No seat available'}, status=status.HTTP_400_BAD_REQUEST)
+            seat_number = free_seats[0]
+        username = serializer.validated_data.get('username') or f'AI_{seat_number}_{secrets.token_hex(2)}'
 
-        # プレイヤー作成
-        player = TablePlayer.objects.create(
-            table=db_table,
-            username=username,
-            seat_number=seat_number,
-            chips=db_table.initial_chips,
-        )
-
-        # プレイヤー情報を登録
-        table_manager.add_player_info(db_table.id, PlayerInfo(
-            username=username,
-            seat_number=seat_number,
-            token=player.token,
-            db_id=player.id,
-        ))
+        player, error = _seat_player(db_table, table, username, seat_number, is_bot=True)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            'message': 'Joined successfully',
-            'token': player.token,
+            'message': 'Bot added',
             'player': TablePlayerSerializer(player).data,
         }, status=status.HTTP_201_CREATED)
 
@@ -152,24 +256,34 @@ class PokerTableViewSet(viewsets.ModelViewSet):
         # インメモリテーブルから削除
         table = table_manager.get_table(db_table.id)
         if table:
-            try:
-                table.remove_player(player_id=player.username)
-            except PokerError:
-                pass
-            state = table.get_state()
-            table_manager.sync_to_db(db_table.id, state)
+            with table_manager.table_lock(db_table.id):
+                try:
+                    table.remove_player(player_id=player.username)
+                except PokerError:
+                    pass
+                table_manager.release_seat(db_table.id, player.username, player.seat_number)
+                state = table.get_state()
+                table_manager.sync_to_db(db_table.id, state)
+                table_manager.mark_changed(db_table.id, db_table)
+        else:
+            table_manager.release_seat(db_table.id, player.username, player.seat_number)
 
         # DBから削除（非アクティブ化）
-        player.is_active = False
-        player.save()
+        db_writer.call(lambda: TablePlayer.objects.filter(id=player.id).update(is_active=False))
 
         return Response({'message': 'Left the table'})
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], renderer_classes=STATE_RENDERER_CLASSES)
     def state(self, request, pk=None):
         """テーブル状態取得"""
+        # トークンなしの観戦は共有済みのエンコード結果をそのまま返す
+        if not request.headers.get('X-Player-Token') and 'since_version' not in request.query_params:
+            response = _public_state_response(request, pk)
+            if response is not None:
+                return response
+
         db_table = self.get_object()
-        table = table_manager.get_or_create_table(db_table.id)
+        table = _open_table(db_table)
 
         if not table:
             return Response(
@@ -185,16 +299,50 @@ class PokerTableViewSet(viewsets.ModelViewSet):
             if info:
                 viewer_username = info.username
 
+        since_version = request.query_params.get('since_version')
+        if since_version is not None:
+            try:
+                since_version = int(since_version)
+            except ValueError:
+                return Response(
+                    {'error': 'since_version must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # バージョンが変わっていなければ状態を組み立てずに 304 を返す
+        etag = state_etag(
+            db_table.id, table_manager.get_state_epoch(db_table.id), table_manager.get_state_version(db_table.id),
+            request.accepted_renderer.format, viewer_username,
+        )
+        not_modified = not_modified_response(request, etag, STATE_VARY)
+        if not_modified is not None:
+            return not_modified
+
         state = table.get_state(viewer_player_id=viewer_username)
         state_dict = table_manager.game_state_to_dict(db_table.id, state, db_table)
 
+        # since_version 指定時は差分のみ返す（履歴から外れているか epoch が違えば全体を返す）
+        response_dict = state_dict
+        if since_version is not None:
+            patch = table_manager.state_patch(
+                db_table.id, since_version, state_dict, viewer_username, request.query_params.get('epoch'),
+            )
+            if patch is not None:
+                response_dict = {
+                    'version': state_dict['version'],
+                    'since_version': since_version,
+                    'patch': patch,
+                }
+
         # 自分の番なら有効なアクションを追加
         if viewer_username and state.current_player_id == viewer_username:
-            state_dict['valid_actions'] = _get_valid_actions_dict(state, viewer_username)
+            response_dict['valid_actions'] = get_valid_actions_dict(state, viewer_username)
 
-        return Response(state_dict)
+        response = Response(response_dict, headers={'ETag': etag})
+        patch_vary_headers(response, STATE_VARY)
+        return response
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], renderer_classes=STATE_RENDERER_CLASSES)
     def start(self, request, pk=None):
         """ゲーム開始"""
         db_table = self.get_object()
@@ -206,7 +354,7 @@ class PokerTableViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        table = table_manager.get_or_create_table(db_table.id)
+        table = _open_table(db_table)
         if not table:
             return Response(
                 {'error': 'Table not found'},
@@ -214,25 +362,17 @@ class PokerTableViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            result = table.start_game()
+            result, hand_number = table_manager.start_hand(db_table.id, db_table)
         except PokerError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        # ハンド番号をインクリメント
-        hand_number = table_manager.increment_hand_number(db_table.id)
-
-        # ゲームハンド作成
-        hand = table_manager.create_game_hand(db_table.id, result.state)
-
-        # DB同期
-        table_manager.sync_to_db(db_table.id, result.state)
+        table_manager.cancel_auto_start(db_table.id)
 
         # viewer用のstate取得
         viewer_state = table.get_state(viewer_player_id=player.username)
         state_dict = table_manager.game_state_to_dict(db_table.id, viewer_state, db_table)
 
         if viewer_state.current_player_id == player.username:
-            state_dict['valid_actions'] = _get_valid_actions_dict(viewer_state, player.username)
+            state_dict['valid_actions'] = get_valid_actions_dict(viewer_state, player.username)
 
         return Response({
             'message': 'Game started',
@@ -240,7 +380,7 @@ class PokerTableViewSet(viewsets.ModelViewSet):
             'state': state_dict,
         })
 
-    @action(detail=True, methods=['post'], url_path='action')
+    @action(detail=True, methods=['post'], url_path='action', renderer_classes=STATE_RENDERER_CLASSES)
     def do_action(self, request, pk=None):
         """アクション実行"""
         db_table = self.get_object()
@@ -255,55 +395,28 @@ class PokerTableViewSet(viewsets.ModelViewSet):
         serializer = ActionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        table = table_manager.get_or_create_table(db_table.id)
+        table = _open_table(db_table)
         if not table:
             return Response(
                 {'error': 'Table not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 現在の状態を取得（all_inの変換に必要）
-        current_state = table.get_state(viewer_player_id=player.username)
-
-        # アクションオブジェクトを構築
         try:
-            action_obj = _build_action(
-                action_str=serializer.validated_data['action'],
-                amount=serializer.validated_data.get('amount', 0),
-                state=current_state,
-                username=player.username,
+            table_manager.apply_action(
+                db_table.id, db_table, player.username,
+                serializer.validated_data['action'],
+                serializer.validated_data.get('amount', 0),
             )
-        except ValueError as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        # アクション処理
-        try:
-            result = table.action(player_id=player.username, action=action_obj)
-        except PokerError as e:
+        except (ValueError, PokerError) as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # DB同期
-        table_manager.sync_to_db(db_table.id, result.state)
-
-        # ゲーム終了時（SHOWDOWN）
-        if result.state.phase == GamePhase.SHOWDOWN:
-            try:
-                hand = GameHand.objects.filter(
-                    table=db_table,
-                    hand_number=table_manager.get_hand_number(db_table.id),
-                ).first()
-                if hand:
-                    winner_id = _extract_winner_id(result)
-                    table_manager.update_game_hand(hand, result.state, winner_id)
-            except Exception:
-                pass
-
         # viewer用のstate取得
         viewer_state = table.get_state(viewer_player_id=player.username)
         state_dict = table_manager.game_state_to_dict(db_table.id, viewer_state, db_table)
 
         if viewer_state.current_player_id == player.username:
-            state_dict['valid_actions'] = _get_valid_actions_dict(viewer_state, player.username)
+            state_dict['valid_actions'] = get_valid_actions_dict(viewer_state, player.username)
 
         return Response({
             'message': 'Action processed',
@@ -316,43 +429,262 @@ class PokerTableViewSet(viewsets.ModelViewSet):
         db_table = self.get_object()
 
         # DBからログ取得
-        logs = ActionLogModel.objects.filter(table=db_table).order_by('-created_at')[:100]
+        logs = ActionLogModel.objects.filter(table=db_table).select_related('player').order_by('-created_at')[:100]
         return Response({
             'logs': ActionLogSerializer(logs, many=True).data,
         })
 
+    @action(detail=True, methods=['get'])
+    def telemetry(self, request, pk=None):
+        """ゲーム進行の計測値（ハンド所要時間・考慮時間・処理時間）"""
+        db_table = self.get_object()
+        return Response(table_manager.table_telemetry(db_table.id))
+
+    @action(detail=True, methods=['get'], url_path=r'hands/(?P<hand_number>\d+)/replay',
+            renderer_classes=STATE_RENDERER_CLASSES)
+    def replay(self, request, pk=None, hand_number=None):
+        """ハンドをアクションログから1手ずつ再現"""
+        # テーブル自体は読まず、ハンドとアクションを1クエリで取得する
+        try:
+            table_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        replay = replay_hand(table_id, int(hand_number))
+        if replay is None:
+            return Response({'error': 'Hand not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(replay)
+
 
-def _get_valid_actions_dict(state, username: str) -> dict:
-    """GameStateからvalid_actionsのdictを構築"""
-    player_state = next(
-        (p for p in state.players if p.player_id == username), None
+class QuickSeatView(APIView):
+    """クイックシート: 条件に合うテーブルの空席に自動で着席"""
+    permission_classes = [AllowAny]
+
+    # 同時参加で席を取り損ねた場合や、同名のプレイヤーが既に座っていた場合の再試行回数
+    MAX_ATTEMPTS = 5
+    RETRY_ERRORS = (
+        'Seat already taken', 'Username already taken at this table', 'Seat or username already taken',
     )
-    if not player_state:
-        return {}
 
-    actions = {}
-    to_call = state.current_bet.amount - player_state.current_bet.amount
-    player_chips = player_state.chips.amount
+    def post(self, request):
+        serializer = QuickSeatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        username = serializer.validated_data['username']
+        big_blind = serializer.validated_data['big_blind']
+
+        table_manager.ensure_warmed_up()
+
+        error = 'No seat available'
+        # 一度試したテーブルは再試行で選ばない（同名のプレイヤーがいるテーブルを選び続けないため）
+        tried = set()
+        for _ in range(self.MAX_ATTEMPTS):
+            table_id = table_manager.find_quick_seat_table(big_blind, exclude=tried)
+            if table_id is None:
+                # 条件に合うテーブルがなければ新規作成
+                db_table = db_writer.call(lambda: PokerTableModel.objects.create(
+                    name=f'Quick {big_blind // 2}/{big_blind}',
+                    small_blind=big_blind // 2,
+                    big_blind=big_blind,
+                    auto_start=True,
+                ))
+                table = table_manager.register_table(db_table)
+            else:
+                db_table = PokerTableModel.objects.filter(id=table_id).first()
+                table = _open_table(db_table) if db_table is not None else None
+                if table is None:
+                    # 別プロセスで終了・削除された卓（索引からも外れる）
+                    tried.add(table_id)
+                    forget_tables([table_id])
+                    continue
+
+            tried.add(db_table.id)
+            free_seats = table_manager.free_seats(db_table.id)
+            if not free_seats:
+                continue
+            player, error = _seat_player(db_table, table, username, free_seats[0])
+            if player:
+                return Response({
+                    'message': 'Joined successfully',
+                    'table_id': db_table.id,
+                    'token': player.token,
+                    'player': TablePlayerSerializer(player).data,
+                }, status=status.HTTP_201_CREATED)
+            if error not in self.RETRY_ERRORS:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'error': error}, status=status.HTTP_409_CONFLICT)
+
+
+class HandExportView(APIView):
+    """ハンド履歴をアクション付きでNDJSONストリームとして返す"""
+    permission_classes = [AllowAny]
 
-    actions['fold'] = {}
+    def get(self, request):
+        serializer = HandExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        compress = params.pop('gzip')
+
+        # アーカイブ（numpy）を読むので、起動時ではなく初回の呼び出しで読み込む
+        from .services.hand_export import export_hands
+
+        stream = export_hands(
+            compress=compress,
+            table_id=params.get('table'),
+            since=params.get('since'),
+            until=params.get('until'),
+            hand_from=params.get('hand_from'),
+            hand_to=params.get('hand_to'),
+        )
+        if compress:
+            response = StreamingHttpResponse(stream, content_type='application/gzip')
+            response['Content-Disposition'] = 'attachment; filename="hands.ndjson.gz"'
+        else:
+            response = StreamingHttpResponse(stream, content_type='application/x-ndjson')
+        return response
+
+
+class PlayerStatsView(APIView):
+    """プレイヤー統計（全テーブル・アーカイブ済みを含む全ハンド）"""
+    permission_classes = [AllowAny]
+
+    def get(self, request, username):
+        from .services.analytics import player_stats
+
+        stats = player_stats(username)
+        if stats is None:
+            return Response(
+                {'error': 'No hand history for this player'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(stats)
 
-    if to_call == 0:
-        actions['check'] = {}
-        actions['bet'] = {'min': state.big_blind.amount, 'max': player_chips}
-    else:
-        actions['call'] = {'amount': min(to_call, player_chips)}
-        min_raise_to = state.current_bet.amount * 2
-        if player_chips + player_state.current_bet.amount > state.current_bet.amount:
-            actions['raise'] = {
-                'min': min(min_raise_to, player_chips + player_state.current_bet.amount),
-                'max': player_chips + player_state.current_bet.amount,
-            }
 
-    if player_chips > 0:
-        actions['all_in'] = {'amount': player_chips}
+class LeaderboardView(APIView):
+    """着席中の全プレイヤーのチップ合計ランキング"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        serializer = LeaderboardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        username = serializer.validated_data.get('username')
 
-    return actions
+        response = {
+            'players': table_manager.leaderboard_size(),
+            'top': table_manager.leaderboard_top(serializer.validated_data['limit']),
+        }
+        if username:
+            response['me'] = table_manager.leaderboard_rank(username)
+        return Response(response)
 
 
-# GameHand のインポート（ファイル内で使用）
-from .models import GameHand
+class TelemetryView(APIView):
+    """全テーブルのゲーム進行の計測値（遅いテーブル・考慮時間の長いプレイヤー）"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        serializer = TelemetryQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(table_manager.telemetry_overview(serializer.validated_data['limit']))
+
+
+class MetricsView(APIView):
+    """レート制限・負荷制御の件数"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response({'rate_limit': rate_limit_metrics.snapshot()})
+
+
+class DebugView(APIView):
+    """POKER_DEBUG_ENDPOINTS が有効なときだけ応答するデバッグ用ビュー（無効なら404）"""
+    permission_classes = [AllowAny]
+
+    def initial(self, request, *args, **kwargs):
+        if not settings.POKER_DEBUG_ENDPOINTS:
+            raise NotFound()
+        super().initial(request, *args, **kwargs)
+
+
+class MemoryView(DebugView):
+    """メモリ上のテーブル・PlayerInfo・キャッシュ済み応答などの概算バイト数"""
+
+    def get(self, request):
+        return Response(memory_report(table_manager))
+
+
+class MemorySnapshotView(DebugView):
+    """tracemalloc のスナップショット（POST で取得、GET ?base=ID で差分、DELETE で停止）"""
+
+    def get(self, request):
+        serializer = MemorySnapshotQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        base = serializer.validated_data.get('base')
+        if base is None:
+            return Response({'snapshots': memory_snapshots.list()})
+
+        diff = memory_snapshots.diff(
+            base, serializer.validated_data.get('to'), serializer.validated_data['limit'],
+        )
+        if diff is None:
+            return Response({'error': 'Snapshot not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'base': base, 'diff': diff})
+
+    def post(self, request):
+        return Response(memory_snapshots.take(), status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        memory_snapshots.stop()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# state の応答は形式・圧縮・見る人（ホールカード）で変わる
+STATE_VARY = ('Accept', 'Accept-Encoding', 'X-Player-Token')
+
+
+def state_etag(table_id: int, epoch: str, version: int, fmt: str, viewer: Optional[str] = None) -> str:
+    """state の強いETag（テーブル・エポック・stateバージョン・形式・見る人から作る）
+
+    エポックはテーブルの復元ごとに変わるので、再起動でバージョンが巻き戻っても古いETagとは一致しない。
+    """
+    viewer_tag = hashlib.blake2s(viewer.encode(), digest_size=4).hexdigest() if viewer else 'public'
+    return make_etag('state', table_id, epoch, version, fmt, viewer_tag)
+
+
+def _public_state_response(request, pk):
+    """メモリ上のテーブルの公開stateを共有バッファから返す（なければ None）"""
+    renderer = request.accepted_renderer
+    if renderer.format not in ('json', 'compact', 'msgpack'):
+        return None
+    try:
+        table_id = int(pk)
+    except (TypeError, ValueError):
+        return None
+
+    cached = table_manager.get_public_response(table_id, renderer)
+    if cached is None:
+        return None
+    # 別プロセスで終了・削除された卓は外し、通常の経路（get_object）で404にする
+    if not table_manager.is_open(table_id):
+        forget_tables([table_id])
+        return None
+    epoch, version, body, gzip_body = cached
+
+    etag = state_etag(table_id, epoch, version, renderer.format)
+    not_modified = not_modified_response(request, etag, STATE_VARY)
+    if not_modified is not None:
+        return not_modified
+
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f'{content_type}; charset={renderer.charset}'
+    # br を選んだクライアントには未圧縮で返し、CompressionMiddleware に圧縮させる
+    if choose_coding(request.headers.get('Accept-Encoding', '')) == 'gzip':
+        response = HttpResponse(gzip_body, content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+        response['ETag'] = f'{etag[:-1]}-gzip"'
+    else:
+        response = HttpResponse(body, content_type=content_type)
+        response['ETag'] = etag
+    patch_vary_headers(response, STATE_VARY)
+    return response
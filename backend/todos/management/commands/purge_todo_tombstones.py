@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from todos.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = '古い削除済みTodo（差分同期用のトゥームストーン）をDBから消す'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TODO_TOMBSTONE_DAYS,
+            help='この日数より前に削除されたTodoを対象にする',
+        )
+
+    def handle(self, *args, **options):
+        # 消した位置を記録し、それより前のカーソルの差分同期だけを 410 にする
+        deleted, cutoff = purge_tombstones(options['days'])
+        self.stdout.write(f'purged {deleted} tombstones deleted before {cutoff:%Y-%m-%d %H:%M}')
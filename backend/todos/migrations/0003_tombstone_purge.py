@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0002_todo_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TombstonePurge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purged_at', models.DateTimeField(auto_now_add=True)),
+                ('purged_through', models.DateTimeField()),
+                ('count', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['-purged_at'],
+            },
+        ),
+    ]
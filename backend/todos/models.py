@@ -1,4 +1,12 @@
 from django.db import models
+from django.utils import timezone
+
+
+class LiveTodoManager(models.Manager):
+    """削除済み（トゥームストーン）を除くTodo"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Todo(models.Model):
@@ -6,9 +14,39 @@ class Todo(models.Model):
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # 削除時刻（差分同期で削除を伝えるため、行は TODO_TOMBSTONE_DAYS の間残す）
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveTodoManager()
+    all_objects = models.Manager()
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # 差分同期（updated_since）のキーセット
+            models.Index(fields=['updated_at', 'id'], name='todos_updated_idx'),
+            # 一覧のキーセットページング
+            models.Index(fields=['-created_at', '-id'], name='todos_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def soft_delete(self):
+        """トゥームストーンにする（updated_at も進むので差分同期に削除として出る）"""
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at', 'updated_at'])
+
+
+class TombstonePurge(models.Model):
+    """トゥームストーンを消した記録（差分同期のカーソルの期限切れ判定に使う）"""
+    purged_at = models.DateTimeField(auto_now_add=True)
+    # 消したトゥームストーンの updated_at の最大値。これより前のカーソルは削除を取りこぼしている
+    purged_through = models.DateTimeField()
+    count = models.IntegerField()
+
+    class Meta:
+        ordering = ['-purged_at']
+
+    def __str__(self):
+        return f'{self.count} tombstones through {self.purged_through}'
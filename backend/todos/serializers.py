@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Todo
+from .sync import decode_cursor
 
 
 class TodoSerializer(serializers.ModelSerializer):
@@ -7,3 +8,15 @@ class TodoSerializer(serializers.ModelSerializer):
         model = Todo
         fields = ['id', 'title', 'completed', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class TodoChangesQuerySerializer(serializers.Serializer):
+    """差分同期の条件（updated_since は前回の応答の cursor）"""
+    updated_since = serializers.CharField()
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500, default=100)
+
+    def validate_updated_since(self, value):
+        try:
+            return decode_cursor(value)
+        except (ValueError, OverflowError, OSError):
+            raise serializers.ValidationError('Invalid cursor')
@@ -0,0 +1,109 @@
+"""Todoの差分同期（?updated_since=<cursor>）
+
+カーソルは (updated_at, id) のキーセットを "<updated_at のUNIXマイクロ秒>-<id>" で表したもの。
+updated_at, id の順にインデックス（todos_updated_idx）を引き、カーソルより後の行を返す。
+
+updated_at は書き込みの直前に決まるため、並行した書き込みではコミットの順と前後することがある。
+直近 TODO_SYNC_SETTLE_SECONDS 以内の行は返すがカーソルはその手前で止め、次の呼び出しでもう一度返す
+（クライアントはIDで上書きするので重複は害がない）。
+
+カーソルの期限切れはカーソルの古さではなく、トゥームストーンを消した位置（purge_watermark）で判定する。
+消したトゥームストーンより前のカーソルだけが削除を取りこぼすので、更新のない一覧のカーソルはいつまでも使える。
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import TombstonePurge, Todo
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    updated_at, todo_id = cursor
+    return f'{int(updated_at.timestamp() * 1_000_000)}-{todo_id}'
+
+
+def decode_cursor(value: str) -> Cursor:
+    """カーソル文字列を (updated_at, id) にする（不正な形式は ValueError）"""
+    micros, _, todo_id = value.partition('-')
+    updated_at = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+    return updated_at, int(todo_id)
+
+
+def settled_before(now: Optional[datetime] = None) -> datetime:
+    """この時刻以前の updated_at は後から割り込まれない"""
+    now = now or timezone.now()
+    return now - timedelta(seconds=settings.TODO_SYNC_SETTLE_SECONDS)
+
+
+def purge_watermark() -> Optional[datetime]:
+    """これまでに消したトゥームストーンの updated_at の最大値（まだ消していなければ None）"""
+    return TombstonePurge.objects.aggregate(latest=Max('purged_through'))['latest']
+
+
+def sync_start_cursor(latest: Optional[datetime]) -> str:
+    """全件を読んだクライアントが差分同期を始めるカーソル（最新の updated_at の確定待ちの分だけ手前）
+
+    全件には消したトゥームストーンの分も反映済みなので、purge_watermark より手前には戻さない。
+    """
+    start = datetime.fromtimestamp(0, tz=dt_timezone.utc) if latest is None else settled_before(latest)
+    watermark = purge_watermark()
+    if watermark is not None and start < watermark:
+        start = watermark
+    return encode_cursor((start, 0))
+
+
+def is_expired(cursor: Cursor) -> bool:
+    """カーソルより後のトゥームストーンを消してしまっているか（削除を取りこぼすので全件の読み直しが必要）"""
+    watermark = purge_watermark()
+    return watermark is not None and cursor[0] < watermark
+
+
+def purge_tombstones(days: int) -> Tuple[int, datetime]:
+    """days 日より前に削除されたトゥームストーンを消し、(消した件数, 基準時刻) を返す"""
+    cutoff = timezone.now() - timedelta(days=days)
+    with transaction.atomic():
+        tombstones = Todo.all_objects.filter(deleted_at__lt=cutoff)
+        through = tombstones.aggregate(latest=Max('updated_at'))['latest']
+        if through is None:
+            return 0, cutoff
+        deleted, _ = tombstones.delete()
+        TombstonePurge.objects.create(purged_through=through, count=deleted)
+    return deleted, cutoff
+
+
+def changes_since(cursor: Cursor, limit: int) -> dict:
+    """カーソルより後に作成・更新・削除されたTodo（updated_at, id の順に最大 limit 件）
+
+    {'changed': [Todo], 'deleted': [id], 'cursor': Cursor, 'has_more': bool} を返す。
+    """
+    updated_at, todo_id = cursor
+    rows = list(
+        Todo.all_objects
+        .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=todo_id))
+        .order_by('updated_at', 'id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    settled = settled_before()
+    next_cursor = cursor
+    for row in rows:
+        if row.updated_at > settled:
+            break
+        next_cursor = (row.updated_at, row.id)
+    if has_more and next_cursor == cursor and rows:
+        # 1ページ全部が確定待ちのときは進めないと先へ行けない
+        next_cursor = (rows[-1].updated_at, rows[-1].id)
+
+    return {
+        'changed': [row for row in rows if row.deleted_at is None],
+        'deleted': [row.id for row in rows if row.deleted_at is not None],
+        'cursor': next_cursor,
+        'has_more': has_more,
+    }
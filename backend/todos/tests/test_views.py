@@ -0,0 +1,167 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+
+from todos.models import Todo
+from todos.sync import encode_cursor
+from todos.views import TodoViewSet
+
+pytestmark = pytest.mark.django_db
+
+list_view = TodoViewSet.as_view({'get': 'list'})
+detail_view = TodoViewSet.as_view({'get': 'retrieve'})
+destroy_view = TodoViewSet.as_view({'delete': 'destroy'})
+
+
+def test_list_not_modified():
+    """一覧は変更がなければ 304、追加・削除後は 200 を返す"""
+    Todo.objects.create(title='first')
+    factory = RequestFactory()
+    etag = list_view(factory.get('/api/todos/'))['ETag']
+
+    assert list_view(factory.get('/api/todos/', HTTP_IF_NONE_MATCH=etag)).status_code == 304
+
+    Todo.objects.create(title='second')
+    assert list_view(factory.get('/api/todos/', HTTP_IF_NONE_MATCH=etag)).status_code == 200
+
+    Todo.objects.filter(title='second').delete()
+    Todo.objects.filter(title='first').delete()
+    assert list_view(factory.get('/api/todos/', HTTP_IF_NONE_MATCH=etag)).status_code == 200
+
+
+def test_detail_not_modified():
+    """詳細は updated_at が変わるまで 304 を返す"""
+    todo = Todo.objects.create(title='first')
+    factory = RequestFactory()
+    etag = detail_view(factory.get(f'/api/todos/{todo.id}/'), pk=todo.id)['ETag']
+
+    response = detail_view(factory.get(f'/api/todos/{todo.id}/', HTTP_IF_NONE_MATCH=etag), pk=todo.id)
+    assert response.status_code == 304
+
+    todo.completed = True
+    todo.save()
+    response = detail_view(factory.get(f'/api/todos/{todo.id}/', HTTP_IF_NONE_MATCH=etag), pk=todo.id)
+    assert response.status_code == 200
+
+
+def test_list_keyset_pagination():
+    """一覧は作成日時の新しい順にカーソルでページングされる"""
+    for i in range(5):
+        Todo.objects.create(title=f'todo {i}')
+    factory = RequestFactory()
+
+    first = list_view(factory.get('/api/todos/', {'limit': 3})).data
+    assert [t['title'] for t in first['results']] == ['todo 4', 'todo 3', 'todo 2']
+    second = list_view(factory.get(first['next'])).data
+    assert [t['title'] for t in second['results']] == ['todo 1', 'todo 0']
+    assert second['next'] is None
+    assert first['sync_cursor']
+
+
+def test_changes_feed(settings):
+    """updated_since 以降の作成・更新と、削除のトゥームストーンだけを返す"""
+    settings.TODO_SYNC_SETTLE_SECONDS = 0
+    kept = Todo.objects.create(title='kept')
+    updated = Todo.objects.create(title='updated')
+    removed = Todo.objects.create(title='removed')
+    factory = RequestFactory()
+    cursor = list_view(factory.get('/api/todos/')).data['sync_cursor']
+    cursor = list_view(factory.get('/api/todos/', {'updated_since': cursor})).data['cursor']
+
+    updated.completed = True
+    updated.save()
+    added = Todo.objects.create(title='added')
+    assert destroy_view(factory.delete(f'/api/todos/{removed.id}/'), pk=removed.id).status_code == 204
+
+    feed = list_view(factory.get('/api/todos/', {'updated_since': cursor})).data
+    assert [t['id'] for t in feed['changed']] == [updated.id, added.id]
+    assert feed['deleted'] == [removed.id]
+    assert feed['has_more'] is False
+    assert kept.id not in [t['id'] for t in feed['changed']]
+
+    empty = list_view(factory.get('/api/todos/', {'updated_since': feed['cursor']})).data
+    assert empty['changed'] == [] and empty['deleted'] == []
+    assert not Todo.objects.filter(id=removed.id).exists()
+
+
+def test_changes_feed_pages(settings):
+    """limit ごとに has_more と次のカーソルで続きを読める"""
+    settings.TODO_SYNC_SETTLE_SECONDS = 0
+    for i in range(3):
+        Todo.objects.create(title=f'todo {i}')
+    factory = RequestFactory()
+    start = encode_cursor((timezone.now() - timedelta(hours=1), 0))
+
+    first = list_view(factory.get('/api/todos/', {'updated_since': start, 'limit': 2})).data
+    assert first['has_more'] is True
+    second = list_view(factory.get('/api/todos/', {'updated_since': first['cursor'], 'limit': 2})).data
+    assert second['has_more'] is False
+    assert [t['title'] for t in first['changed'] + second['changed']] == ['todo 0', 'todo 1', 'todo 2']
+
+
+def test_changes_feed_invalid_cursor():
+    """不正なカーソルは400、消したトゥームストーンより前のカーソルは410"""
+    factory = RequestFactory()
+    assert list_view(factory.get('/api/todos/', {'updated_since': 'abc'})).status_code == 400
+    assert list_view(factory.get('/api/todos/', {'updated_since': '0-0'})).status_code == 200
+
+    removed = Todo.objects.create(title='removed')
+    removed.soft_delete()
+    Todo.all_objects.filter(id=removed.id).update(deleted_at=timezone.now() - timedelta(days=40))
+    call_command('purge_todo_tombstones', days=30, stdout=StringIO())
+    assert list_view(factory.get('/api/todos/', {'updated_since': '0-0'})).status_code == 410
+
+
+def test_changes_feed_empty_list(settings):
+    """空の一覧のカーソルでも差分同期を続けられる"""
+    settings.TODO_SYNC_SETTLE_SECONDS = 0
+    factory = RequestFactory()
+    cursor = list_view(factory.get('/api/todos/')).data['sync_cursor']
+
+    for _ in range(2):
+        response = list_view(factory.get('/api/todos/', {'updated_since': cursor}))
+        assert response.status_code == 200
+        assert response.data['changed'] == [] and response.data['deleted'] == []
+        cursor = response.data['cursor']
+
+    added = Todo.objects.create(title='added')
+    feed = list_view(factory.get('/api/todos/', {'updated_since': cursor})).data
+    assert [t['id'] for t in feed['changed']] == [added.id]
+
+
+def test_changes_feed_idle_list(settings):
+    """保持期間より長く更新のない一覧のカーソルも、トゥームストーンを消した後も410にならない"""
+    settings.TODO_SYNC_SETTLE_SECONDS = 0
+    settings.TODO_TOMBSTONE_DAYS = 30
+    kept = Todo.objects.create(title='kept')
+    removed = Todo.objects.create(title='removed')
+    Todo.all_objects.update(updated_at=timezone.now() - timedelta(days=60))
+    factory = RequestFactory()
+
+    cursor = list_view(factory.get('/api/todos/')).data['sync_cursor']
+    for _ in range(2):
+        response = list_view(factory.get('/api/todos/', {'updated_since': cursor}))
+        assert response.status_code == 200
+        cursor = response.data['cursor']
+
+    # カーソルより後に削除されたトゥームストーンを消すと、そのカーソルは削除を取りこぼすので期限切れになる
+    removed.soft_delete()
+    deleted_at = timezone.now() - timedelta(days=40)
+    Todo.all_objects.filter(id=removed.id).update(updated_at=deleted_at, deleted_at=deleted_at)
+    call_command('purge_todo_tombstones', stdout=StringIO())
+    assert not Todo.all_objects.filter(id=removed.id).exists()
+    assert list_view(factory.get('/api/todos/', {'updated_since': cursor})).status_code == 410
+
+    # 読み直した一覧のカーソルは、更新がないまま何度ポーリングしても使える
+    response = list_view(factory.get('/api/todos/'))
+    assert [t['id'] for t in response.data['results']] == [kept.id]
+    cursor = response.data['sync_cursor']
+    for _ in range(2):
+        response = list_view(factory.get('/api/todos/', {'updated_since': cursor}))
+        assert response.status_code == 200
+        assert response.data['changed'] == [] and response.data['deleted'] == []
+        cursor = response.data['cursor']
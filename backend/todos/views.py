@@ -1,8 +1,78 @@
-from rest_framework import viewsets
+from django.db.models import Count, Max, Q
+from rest_framework import status, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from config.middleware import make_etag, not_modified_response
 from .models import Todo
-from .serializers import TodoSerializer
+from .serializers import TodoChangesQuerySerializer, TodoSerializer
+from .sync import changes_since, encode_cursor, is_expired, sync_start_cursor
+
+
+def _timestamp(value):
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+class TodoCursorPagination(CursorPagination):
+    """作成日時の新しい順のキーセットページング"""
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 500
 
 
 class TodoViewSet(viewsets.ModelViewSet):
     queryset = Todo.objects.all()
     serializer_class = TodoSerializer
+    pagination_class = TodoCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        if 'updated_since' in request.query_params:
+            return self.changes(request)
+
+        # 一覧のETagは件数と最新の updated_at から作る（作成・更新・削除のどれでも updated_at が進む）
+        summary = Todo.all_objects.aggregate(
+            count=Count('id', filter=Q(deleted_at__isnull=True)), latest=Max('updated_at'),
+        )
+        etag = make_etag(
+            'todos', summary['count'], _timestamp(summary['latest']), request.accepted_renderer.format,
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        # 全ページを読んだ後はこのカーソルから差分同期する
+        response.data['sync_cursor'] = sync_start_cursor(summary['latest'])
+        response['ETag'] = etag
+        return response
+
+    def changes(self, request):
+        """?updated_since=<cursor> 以降に作成・更新・削除されたTodo"""
+        serializer = TodoChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        cursor = serializer.validated_data['updated_since']
+        if is_expired(cursor):
+            return Response(
+                {'error': 'Cursor expired, reload the full list'},
+                status=status.HTTP_410_GONE
+            )
+
+        result = changes_since(cursor, serializer.validated_data['limit'])
+        return Response({
+            'changed': TodoSerializer(result['changed'], many=True).data,
+            'deleted': result['deleted'],
+            'cursor': encode_cursor(result['cursor']),
+            'has_more': result['has_more'],
+        })
+
+    def retrieve(self, request, *args, **kwargs):
+        todo = self.get_object()
+        etag = make_etag('todo', todo.id, _timestamp(todo.updated_at), request.accepted_renderer.format)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return Response(self.get_serializer(todo).data, headers={'ETag': etag})
+
+    def perform_destroy(self, instance):
+        # 差分同期で削除を伝えるため、行はトゥームストーンとして残す
+        instance.soft_delete()
@@ -1,32 +1,93 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import axios from 'axios';
 import './App.css';
 
 const API_URL = '/api/todos/';
+// 差分同期（?updated_since=）の間隔
+const SYNC_INTERVAL_MS = 5000;
+
+// 一覧と同じ並び（作成日時の新しい順）
+const byNewest = (a, b) =>
+  b.created_at.localeCompare(a.created_at) || b.id - a.id;
+
+// 変更・削除を反映した新しい一覧を返す
+const applyChanges = (todos, changed, deleted) => {
+  const map = new Map(todos.map(todo => [todo.id, todo]));
+  deleted.forEach(id => map.delete(id));
+  changed.forEach(todo => map.set(todo.id, todo));
+  return Array.from(map.values()).sort(byNewest);
+};
+
+// 全件をページ順に読み、{ todos, cursor }（差分同期を始めるカーソル）を返す
+const loadAll = async () => {
+  const todos = [];
+  let url = API_URL;
+  let cursor = null;
+  while (url) {
+    const response = await axios.get(url);
+    todos.push(...response.data.results);
+    cursor = cursor || response.data.sync_cursor;
+    // next は絶対URLなので、プロキシ越しでも同じオリジンに送るようパスだけ使う
+    url = response.data.next && response.data.next.replace(/^https?:\/\/[^/]+/, '');
+  }
+  return { todos, cursor };
+};
 
 function App() {
   const [todos, setTodos] = useState([]);
   const [newTodo, setNewTodo] = useState('');
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // 差分同期のカーソル（null なら全件を読み直す）
+  const cursorRef = useRef(null);
+  // 前回の同期が終わるまで次を始めない
+  const syncingRef = useRef(false);
 
-  useEffect(() => {
-    fetchTodos();
-  }, []);
-
-  const fetchTodos = async () => {
+  const fetchTodos = useCallback(async () => {
+    if (syncingRef.current) return;
+    syncingRef.current = true;
     try {
+      if (cursorRef.current !== null) {
+        try {
+          // 前回のカーソル以降の作成・更新・削除だけを取り込む
+          let hasMore = true;
+          while (hasMore) {
+            const response = await axios.get(API_URL, {
+              params: { updated_since: cursorRef.current }
+            });
+            const { changed, deleted, cursor, has_more } = response.data;
+            if (changed.length || deleted.length) {
+              setTodos(prev => applyChanges(prev, changed, deleted));
+            }
+            cursorRef.current = cursor;
+            hasMore = has_more;
+          }
+          setError(null);
+          return;
+        } catch (err) {
+          // カーソルが古すぎる（削除の記録が消えている）ときは全件を読み直す
+          if (!err.response || err.response.status !== 410) throw err;
+        }
+      }
       setLoading(true);
-      const response = await axios.get(API_URL);
-      setTodos(response.data);
+      const { todos: all, cursor } = await loadAll();
+      setTodos(all);
+      cursorRef.current = cursor;
       setError(null);
     } catch (err) {
       setError('Todoの読み込みに失敗しました');
       console.error('Error fetching todos:', err);
     } finally {
+      syncingRef.current = false;
       setLoading(false);
     }
-  };
+  }, []);
+
+  useEffect(() => {
+    fetchTodos();
+    const timer = setInterval(fetchTodos, SYNC_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, [fetchTodos]);
 
   const addTodo = async (e) => {
     e.preventDefault();
@@ -37,7 +98,7 @@ function App() {
         title: newTodo,
         completed: false
       });
-      setTodos([response.data, ...todos]);
+      setTodos(prev => applyChanges(prev, [response.data], []));
       setNewTodo('');
       setError(null);
     } catch (err) {
@@ -51,9 +112,7 @@ function App() {
       const response = await axios.patch(`${API_URL}${id}/`, {
         completed: !completed
       });
-      setTodos(todos.map(todo =>
-        todo.id === id ? response.data : todo
-      ));
+      setTodos(prev => applyChanges(prev, [response.data], []));
       setError(null);
     } catch (err) {
       setError('Todoの更新に失敗しました');
@@ -64,7 +123,7 @@ function App() {
   const deleteTodo = async (id) => {
     try {
       await axios.delete(`${API_URL}${id}/`);
-      setTodos(todos.filter(todo => todo.id !== id));
+      setTodos(prev => applyChanges(prev, [], [id]));
       setError(null);
     } catch (err) {
       setError('Todoの削除に失敗しました');
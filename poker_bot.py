@@ -3,11 +3,12 @@
 ポーカーボットスクリプト
 
 使い方:
-  python3 poker_bot.py [URL] [--auto-join TABLE_ID] [--name NAME] [--seat SEAT]
+  python3 poker_bot.py [URL] [--auto-join TABLE_ID | --quick] [--name NAME] [--seat SEAT]
 
 例:
   python3 poker_bot.py http://localhost
   python3 poker_bot.py http://localhost --auto-join 1 --name Bot1 --seat 1
+  python3 poker_bot.py http://localhost --quick --name Bot1
 """
 
 import argparse
@@ -18,6 +19,12 @@ import time
 import urllib.request
 import urllib.error
 
+from poker_compact import COMPACT_MEDIA_TYPE, apply_patch, expand_compact
+
+
+# 429 / 503 を受けたときの再試行回数
+MAX_RETRIES = 3
+
 
 class PokerBot:
     def __init__(self, base_url: str, name: str = None, min_players: int = 2):
@@ -27,30 +34,45 @@ class PokerBot:
         self.token = None
         self.table_id = None
         self.seat = None
+        self.state = None  # 差分取得用のローカルstate
         self.running = True
         self.min_players = min_players
 
-    def _request(self, method: str, endpoint: str, data: dict = None, token: str = None) -> dict:
-        """HTTPリクエストを送信"""
+    def _request(self, method: str, endpoint: str, data: dict = None, token: str = None,
+                 compact: bool = False) -> dict:
+        """HTTPリクエストを送信（compact=True ならコンパクト形式で受信して展開）"""
         url = f"{self.api_url}{endpoint}"
         headers = {"Content-Type": "application/json"}
         if token:
             headers["X-Player-Token"] = token
+        if compact:
+            headers["Accept"] = COMPACT_MEDIA_TYPE
 
         req_data = json.dumps(data).encode() if data else None
-        req = urllib.request.Request(url, data=req_data, headers=headers, method=method)
 
-        try:
-            with urllib.request.urlopen(req, timeout=10) as response:
-                return json.loads(response.read().decode())
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode()
+        for attempt in range(MAX_RETRIES + 1):
+            req = urllib.request.Request(url, data=req_data, headers=headers, method=method)
             try:
-                return json.loads(error_body)
-            except:
-                return {"error": error_body}
-        except urllib.error.URLError as e:
-            return {"error": str(e)}
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    result = json.loads(response.read().decode())
+                    return expand_compact(result) if compact else result
+            except urllib.error.HTTPError as e:
+                # レート制限・過負荷なら Retry-After だけ待って再試行
+                if e.code in (429, 503) and attempt < MAX_RETRIES:
+                    time.sleep(float(e.headers.get("Retry-After") or 1))
+                    continue
+                return self._error_result(e, compact)
+            except urllib.error.URLError as e:
+                return {"error": str(e)}
+
+    def _error_result(self, e: urllib.error.HTTPError, compact: bool) -> dict:
+        """エラー応答の本文をdictにする"""
+        error_body = e.read().decode()
+        try:
+            result = json.loads(error_body)
+        except:
+            return {"error": error_body}
+        return expand_compact(result) if compact else result
 
     def get_tables(self) -> list:
         """テーブル一覧を取得"""
@@ -67,6 +89,21 @@ class PokerBot:
             self.token = result["token"]
             self.table_id = table_id
             self.seat = seat
+            self.state = None
+        return result
+
+    def quick_seat(self, big_blind: int = 20) -> dict:
+        """クイックシート: サーバーが選んだテーブルの空席に参加"""
+        result = self._request(
+            "POST",
+            "/quick-seat/",
+            {"username": self.name, "big_blind": big_blind}
+        )
+        if "token" in result:
+            self.token = result["token"]
+            self.table_id = result["table_id"]
+            self.seat = result["player"]["seat_number"]
+            self.state = None
         return result
 
     def leave_table(self) -> dict:
@@ -76,19 +113,36 @@ class PokerBot:
         return self._request("POST", f"/tables/{self.table_id}/leave/", token=self.token)
 
     def get_state(self) -> dict:
-        """ゲーム状態を取得"""
-        return self._request("GET", f"/tables/{self.table_id}/state/", token=self.token)
+        """ゲーム状態を取得（前回のstateがあれば差分のみ受信して適用）"""
+        endpoint = f"/tables/{self.table_id}/state/"
+        if self.state is not None:
+            # epoch が違えば（サーバー再起動など）サーバーは差分ではなく全体を返す
+            endpoint += f"?since_version={self.state['version']}&epoch={self.state['epoch']}"
+        result = self._request("GET", endpoint, token=self.token, compact=True)
+        if "error" in result:
+            return result
+
+        if "patch" in result:
+            base = dict(self.state)
+            base.pop("valid_actions", None)
+            state = apply_patch(base, result["patch"])
+            if "valid_actions" in result:
+                state["valid_actions"] = result["valid_actions"]
+        else:
+            state = result
+        self.state = state
+        return state
 
     def start_game(self) -> dict:
         """ゲーム開始"""
-        return self._request("POST", f"/tables/{self.table_id}/start/", token=self.token)
+        return self._request("POST", f"/tables/{self.table_id}/start/", token=self.token, compact=True)
 
     def do_action(self, action: str, amount: int = 0) -> dict:
         """アクションを実行"""
         data = {"action": action}
         if amount > 0:
             data["amount"] = amount
-        return self._request("POST", f"/tables/{self.table_id}/action/", data, token=self.token)
+        return self._request("POST", f"/tables/{self.table_id}/action/", data, token=self.token, compact=True)
 
     def decide_action(self, state: dict) -> tuple:
         """
@@ -325,6 +379,8 @@ def main():
     parser = argparse.ArgumentParser(description="ポーカーボット")
     parser.add_argument("url", nargs="?", default="http://localhost", help="サーバーURL")
     parser.add_argument("--auto-join", "-a", type=int, help="自動参加するテーブルID")
+    parser.add_argument("--quick", "-q", action="store_true", help="クイックシートで空いているテーブルに自動参加")
+    parser.add_argument("--big-blind", "-b", type=int, default=20, help="クイックシートのBB額 (デフォルト: 20)")
     parser.add_argument("--name", "-n", help="ボット名")
     parser.add_argument("--seat", "-s", type=int, help="席番号")
     parser.add_argument("--min-players", "-m", type=int, default=2, help="ゲーム開始に必要な最低人数 (デフォルト: 2)")
@@ -339,23 +395,28 @@ def main():
     print(f"ボット名: {bot.name}")
     print(f"最低人数: {bot.min_players}人")
 
-    # 自動参加モード
-    if args.auto_join:
-        table_id = args.auto_join
-        seat = args.seat or random.randint(1, 6)
+    if args.quick:
+        # クイックシートモード
+        print(f"\nクイックシートで参加中... (BB {args.big_blind})")
+        result = bot.quick_seat(args.big_blind)
     else:
-        # インタラクティブモード
-        table_id = select_table(bot)
-        if not table_id:
-            return
-
-        seat = select_seat(bot, table_id)
-        if not seat:
-            return
-
-    # テーブルに参加
-    print(f"\nテーブル {table_id} 席 {seat} に参加中...")
-    result = bot.join_table(table_id, seat)
+        # 自動参加モード
+        if args.auto_join:
+            table_id = args.auto_join
+            seat = args.seat or random.randint(1, 6)
+        else:
+            # インタラクティブモード
+            table_id = select_table(bot)
+            if not table_id:
+                return
+
+            seat = select_seat(bot, table_id)
+            if not seat:
+                return
+
+        # テーブルに参加
+        print(f"\nテーブル {table_id} 席 {seat} に参加中...")
+        result = bot.join_table(table_id, seat)
 
     if "error" in result:
         print(f"参加失敗: {result['error']}")
@@ -17,6 +17,12 @@ import time
 import urllib.request
 import urllib.error
 
+from poker_compact import COMPACT_MEDIA_TYPE, apply_patch, expand_compact
+
+
+# 429 / 503 を受けたときの再試行回数
+MAX_RETRIES = 3
+
 
 class PokerClient:
     def __init__(self, base_url: str):
@@ -25,29 +31,44 @@ class PokerClient:
         self.token = None
         self.table_id = None
         self.seat = None
+        self.state = None  # 差分取得用のローカルstate
         self.username = None
 
-    def _request(self, method: str, endpoint: str, data: dict = None, token: str = None) -> dict:
-        """HTTPリクエストを送信"""
+    def _request(self, method: str, endpoint: str, data: dict = None, token: str = None,
+                 compact: bool = False) -> dict:
+        """HTTPリクエストを送信（compact=True ならコンパクト形式で受信して展開）"""
         url = f"{self.api_url}{endpoint}"
         headers = {"Content-Type": "application/json"}
         if token:
             headers["X-Player-Token"] = token
+        if compact:
+            headers["Accept"] = COMPACT_MEDIA_TYPE
 
         req_data = json.dumps(data).encode() if data else None
-        req = urllib.request.Request(url, data=req_data, headers=headers, method=method)
 
-        try:
-            with urllib.request.urlopen(req, timeout=10) as response:
-                return json.loads(response.read().decode())
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode()
+        for attempt in range(MAX_RETRIES + 1):
+            req = urllib.request.Request(url, data=req_data, headers=headers, method=method)
             try:
-                return json.loads(error_body)
-            except:
-                return {"error": error_body}
-        except urllib.error.URLError as e:
-            return {"error": str(e)}
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    result = json.loads(response.read().decode())
+                    return expand_compact(result) if compact else result
+            except urllib.error.HTTPError as e:
+                # レート制限・過負荷なら Retry-After だけ待って再試行
+                if e.code in (429, 503) and attempt < MAX_RETRIES:
+                    time.sleep(float(e.headers.get("Retry-After") or 1))
+                    continue
+                return self._error_result(e, compact)
+            except urllib.error.URLError as e:
+                return {"error": str(e)}
+
+    def _error_result(self, e: urllib.error.HTTPError, compact: bool) -> dict:
+        """エラー応答の本文をdictにする"""
+        error_body = e.read().decode()
+        try:
+            result = json.loads(error_body)
+        except:
+            return {"error": error_body}
+        return expand_compact(result) if compact else result
 
     def get_tables(self) -> list:
         """テーブル一覧を取得"""
@@ -74,6 +95,7 @@ class PokerClient:
             self.token = result["token"]
             self.table_id = table_id
             self.seat = seat
+            self.state = None
             self.username = username
         return result
 
@@ -85,22 +107,40 @@ class PokerClient:
         self.token = None
         self.table_id = None
         self.seat = None
+        self.state = None
         return result
 
     def get_state(self) -> dict:
-        """ゲーム状態を取得"""
-        return self._request("GET", f"/tables/{self.table_id}/state/", token=self.token)
+        """ゲーム状態を取得（前回のstateがあれば差分のみ受信して適用）"""
+        endpoint = f"/tables/{self.table_id}/state/"
+        if self.state is not None:
+            # epoch が違えば（サーバー再起動など）サーバーは差分ではなく全体を返す
+            endpoint += f"?since_version={self.state['version']}&epoch={self.state['epoch']}"
+        result = self._request("GET", endpoint, token=self.token, compact=True)
+        if "error" in result:
+            return result
+
+        if "patch" in result:
+            base = dict(self.state)
+            base.pop("valid_actions", None)
+            state = apply_patch(base, result["patch"])
+            if "valid_actions" in result:
+                state["valid_actions"] = result["valid_actions"]
+        else:
+            state = result
+        self.state = state
+        return state
 
     def start_game(self) -> dict:
         """ゲーム開始"""
-        return self._request("POST", f"/tables/{self.table_id}/start/", token=self.token)
+        return self._request("POST", f"/tables/{self.table_id}/start/", token=self.token, compact=True)
 
     def do_action(self, action: str, amount: int = 0) -> dict:
         """アクションを実行"""
         data = {"action": action}
         if amount > 0:
             data["amount"] = amount
-        return self._request("POST", f"/tables/{self.table_id}/action/", data, token=self.token)
+        return self._request("POST", f"/tables/{self.table_id}/action/", data, token=self.token, compact=True)
 
     def get_logs(self) -> dict:
         """アクションログを取得"""
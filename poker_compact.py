@@ -0,0 +1,63 @@
+"""
+ポーカーAPIのコンパクト形式・差分（パッチ）を扱うクライアント共通処理
+
+poker_client.py / poker_bot.py から使う（標準ライブラリのみ）。
+EXPANDED_KEYS はサーバーの poker/renderers.py の COMPACT_KEYS の逆引きで、
+一致していることは backend/poker/tests/test_renderers.py で確認している。
+"""
+
+# state / start / action の応答はコンパクト形式（短いキー・整数カード）で受け取る
+COMPACT_MEDIA_TYPE = "application/vnd.poker.compact+json"
+
+CARD_RANKS = "23456789TJQKA"
+CARD_SUITS = "cdhs"
+EXPANDED_KEYS = {
+    "m": "message", "st": "state", "id": "table_id", "n": "name", "ph": "phase",
+    "h": "hand_number", "p": "pot", "b": "current_bet", "cc": "community_cards",
+    "pl": "players", "bt": "button_seat", "cp": "current_player_seat",
+    "cfg": "settings", "mp": "max_players", "sb": "small_blind", "bb": "big_blind",
+    "an": "ante", "va": "valid_actions", "s": "seat", "u": "username", "c": "chips",
+    "f": "is_folded", "ai": "is_all_in", "a": "is_active", "hc": "hole_cards",
+    "am": "amount", "mn": "min", "mx": "max", "v": "version", "sv": "since_version",
+    "pt": "patch", "ep": "epoch",
+}
+
+
+def expand_card(code: int) -> dict:
+    """整数カードコード（0〜51、-1は非公開）を通常のカードdictに戻す"""
+    if code < 0:
+        return {"hidden": True}
+    rank, suit = CARD_RANKS[code // 4], CARD_SUITS[code % 4]
+    return {"rank": rank, "suit": suit, "display": rank + suit}
+
+
+def expand_compact(data, key: str = None):
+    """コンパクト形式の応答を通常のキーに戻す"""
+    if isinstance(data, dict):
+        return {EXPANDED_KEYS.get(k, k): expand_compact(v, EXPANDED_KEYS.get(k, k)) for k, v in data.items()}
+    if isinstance(data, list):
+        if key in ("community_cards", "hole_cards"):
+            return [expand_card(c) for c in data]
+        return [expand_compact(v) for v in data]
+    return data
+
+
+def apply_patch(base: dict, patch: dict) -> dict:
+    """since_version の差分（パッチ）をローカルの state に適用"""
+    result = dict(base)
+    for key in patch.get("_removed", []):
+        result.pop(key, None)
+    for key, value in patch.items():
+        if key == "_removed":
+            continue
+        current = result.get(key)
+        if isinstance(value, dict) and isinstance(current, list):
+            items = list(current)
+            for index, item_patch in value.items():
+                items[int(index)] = apply_patch(items[int(index)], item_patch)
+            result[key] = items
+        elif isinstance(value, dict) and isinstance(current, dict):
+            result[key] = apply_patch(current, value)
+        else:
+            result[key] = value
+    return result